@@ -0,0 +1,156 @@
+"""Compare the threaded client path with the asyncio one.
+
+Both paths send the same requests with the same concurrency: the threaded path
+through a thread pool and the sync clients, the asyncio path from one event loop
+through the async clients. Wall time, peak thread count and peak Python memory
+are reported for each.
+
+Usage:
+    LLM_BACKEND=stub python -m ai.async_benchmark completions --requests 500 --concurrency 500
+    python -m ai.async_benchmark jira --items KAN-1,KAN-2,KAN-3 --concurrency 50
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import logging
+import threading
+import time
+import tracemalloc
+
+from ai.backends import create_llm_client, create_async_llm_client
+from ai.completion import create_chat_completion, create_chat_completion_async
+
+logger = logging.getLogger(__name__)
+
+
+def _completion_request(index: int) -> Dict[str, Any]:
+    return dict(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": "You are a QA engineer. Use TC_BENCH as the prefix."},
+            {"role": "user", "content": f"Generate EXACTLY 3 test cases for request {index}."}
+        ],
+        temperature=0.7,
+        max_tokens=800
+    )
+
+
+def _measure(run: Callable[[], Any]) -> Dict[str, Any]:
+    """Run ``run`` while sampling the thread count, returning timing and memory figures."""
+    peak_threads = threading.active_count()
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak_threads
+        while not done.wait(0.01):
+            peak_threads = max(peak_threads, threading.active_count())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    tracemalloc.start()
+    sampler.start()
+    started = time.perf_counter()
+    try:
+        results = run()
+    finally:
+        elapsed = time.perf_counter() - started
+        done.set()
+        sampler.join()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "seconds": round(elapsed, 3),
+        "succeeded": sum(1 for result in results if result),
+        "peak_threads": peak_threads - 1,  # Without the sampler
+        "peak_python_memory_mb": round(peak_memory / 2 ** 20, 2)
+    }
+
+
+def _run_threaded(count: int, concurrency: int, call: Callable[[int], Any]) -> List[Any]:
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(call, range(count)))
+
+
+async def _gather_bounded(count: int, concurrency: int, call: Callable[[int], Awaitable[Any]]) -> List[Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(index: int):
+        async with semaphore:
+            return await call(index)
+
+    return await asyncio.gather(*(bounded(index) for index in range(count)))
+
+
+def benchmark_completions(count: int, concurrency: int) -> Dict[str, Dict[str, Any]]:
+    """Send ``count`` distinct completions (bypassing the response cache) both ways."""
+    client = create_llm_client()
+    threaded = _measure(lambda: _run_threaded(
+        count, concurrency,
+        lambda index: create_chat_completion(client, use_cache=False, **_completion_request(index))["content"]
+    ))
+
+    async def run_all():
+        # Async clients belong to the loop they run on
+        async_client = create_async_llm_client()
+        try:
+            return await _gather_bounded(count, concurrency, lambda index: _complete_async(async_client, index))
+        finally:
+            await async_client.close()
+
+    asynchronous = _measure(lambda: asyncio.run(run_all()))
+    return {"threaded": threaded, "asyncio": asynchronous}
+
+
+async def _complete_async(client, index: int) -> str:
+    response = await create_chat_completion_async(client, use_cache=False, **_completion_request(index))
+    return response["content"]
+
+
+def benchmark_jira(item_ids: List[str], concurrency: int, jira_config: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, Any]]:
+    """Fetch the same Jira issues one by one, threaded and with asyncio."""
+    from jira.jira_client import fetch_issue
+    from jira import async_jira_client
+    from utils.async_http import AsyncClientPool
+
+    threaded = _measure(lambda: _run_threaded(
+        len(item_ids), concurrency, lambda index: fetch_issue(item_ids[index], jira_config)
+    ))
+
+    async def run_all():
+        async with AsyncClientPool() as pool:
+            return await _gather_bounded(
+                len(item_ids), concurrency,
+                lambda index: async_jira_client.fetch_issue(item_ids[index], pool, jira_config)
+            )
+
+    asynchronous = _measure(lambda: asyncio.run(run_all()))
+    return {"threaded": threaded, "asyncio": asynchronous}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(prog="python -m ai.async_benchmark",
+                                     description="Compare the threaded and asyncio client paths")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    completions = commands.add_parser("completions", help="Chat completions with the configured LLM backend")
+    completions.add_argument("--requests", type=int, default=200)
+    completions.add_argument("--concurrency", type=int, default=200)
+
+    jira = commands.add_parser("jira", help="Single-issue fetches from the configured Jira")
+    jira.add_argument("--items", required=True, help="Comma-separated issue keys")
+    jira.add_argument("--concurrency", type=int, default=50)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "completions":
+        results = benchmark_completions(args.requests, args.concurrency)
+    else:
+        results = benchmark_jira([part.strip() for part in args.items.split(",") if part.strip()], args.concurrency)
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
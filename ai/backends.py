@@ -0,0 +1,271 @@
+"""LLM backends selected with the LLM_BACKEND setting.
+
+Every generation path talks to a client with the OpenAI ``chat.completions.create``
+interface. ``get_llm_client`` returns either the real OpenAI client or a local stub
+that answers with well-formed test cases after a simulated delay, so the whole
+pipeline can be run and benchmarked without network access or an API key.
+"""
+from threading import BoundedSemaphore, Lock
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+
+from config.settings import (
+    LLM_BACKEND, OPENAI_API_KEY, STUB_LATENCY, STUB_TOKENS_PER_SECOND, STUB_JITTER, STUB_MAX_CONCURRENCY
+)
+
+logger = logging.getLogger(__name__)
+
+_COUNT_PATTERN = re.compile(r"EXACTLY (\d+)")
+_START_PATTERN = re.compile(r"starting at (\d+)")
+_SECTION_PATTERN = re.compile(r"TEST TYPE: (\w+) \| EXACTLY (\d+) test cases \| prefix (\w+)")
+_PREFIX_PATTERNS = [
+    re.compile(r"Use the prefix (\w+)"),
+    re.compile(r"Use (\w+) as the prefix"),
+    re.compile(r"Title: ([A-Z]+_[A-Z]+)_")
+]
+_PRIORITIES = ["High", "Medium", "Low"]
+_SUBJECTS = ["Login form", "Dashboard widgets", "Navigation menu", "Search field", "Data table",
+             "Settings page", "File upload", "Notifications", "User profile", "Report export"]
+
+
+def _message_text(messages: List[Dict[str, Any]]) -> str:
+    parts = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(part.get("text", "") for part in content if part.get("type") == "text")
+    return "\n".join(parts)
+
+
+class _StubCompletions:
+    def __init__(self, backend: "StubClient"):
+        self._backend = backend
+
+    def create(self, model: str, messages: List[Dict[str, Any]], stream: bool = False,
+               max_tokens: Optional[int] = None, response_format: Optional[Dict[str, Any]] = None, **kwargs):
+        return self._backend.complete(model, messages, stream, max_tokens, json_output=bool(response_format))
+
+
+class StubClient:
+    """Deterministic stand-in for the OpenAI client.
+
+    The answer depends only on the prompt: the requested number of test cases,
+    prefix and start number are read from it and filled into the
+    ``Title:/Scenario:/Steps`` format the parsers expect. Latency, output speed and
+    server concurrency are simulated, and answers longer than ``max_tokens`` are
+    cut off with finish_reason "length" like the real API.
+    """
+
+    # Only real endpoints have a quota to respect
+    rate_limited = False
+
+    def __init__(self, latency: float = STUB_LATENCY, tokens_per_second: float = STUB_TOKENS_PER_SECOND,
+                 jitter: float = STUB_JITTER, max_concurrency: int = STUB_MAX_CONCURRENCY):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        self._slots = BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+        self.chat = SimpleNamespace(completions=_StubCompletions(self))
+        self._lock = Lock()
+        self.requests = 0
+
+    def answer(self, messages: List[Dict[str, Any]], json_output: bool = False) -> str:
+        """Build the test cases requested by ``messages``, as text or as structured JSON."""
+        text = _message_text(messages)
+
+        # Combined prompts list one "TEST TYPE: x | EXACTLY n test cases | prefix P" line per type
+        sections = _SECTION_PATTERN.findall(text)
+        if sections:
+            return "\n\n".join(
+                f"TEST TYPE: {test_type}\n\n" + self._render(self._test_cases(prefix, 1, int(count)), False)
+                for test_type, count, prefix in sections
+            )
+
+        count_match = _COUNT_PATTERN.search(text)
+        start_match = _START_PATTERN.search(text)
+        count = int(count_match.group(1)) if count_match else 5
+        start = int(start_match.group(1)) if start_match else 1
+        prefix = "TC_STUB"
+        for pattern in _PREFIX_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                prefix = match.group(1)
+                break
+        return self._render(self._test_cases(prefix, start, count), json_output)
+
+    @staticmethod
+    def _test_cases(prefix: str, start: int, count: int) -> List[Dict[str, Any]]:
+        test_cases = []
+        for number in range(start, start + count):
+            subject = _SUBJECTS[number % len(_SUBJECTS)]
+            test_cases.append({
+                "title": f"{prefix}_{number:02d}_{subject.replace(' ', '_')}_Check",
+                "scenario": f"Verify the behaviour of the {subject.lower()} against the requirements",
+                "steps": ["Open the application and log in", f"Navigate to the {subject.lower()}",
+                          "Perform the action under test"],
+                "expected_result": f"No errors occur and the {subject.lower()} matches the requirements",
+                "priority": _PRIORITIES[number % len(_PRIORITIES)]
+            })
+        return test_cases
+
+    @staticmethod
+    def _render(test_cases: List[Dict[str, Any]], json_output: bool) -> str:
+        if json_output:
+            return json.dumps({"test_cases": test_cases}, indent=2)
+        return "\n\n".join(
+            f"Title: {test_case['title']}\n"
+            f"Scenario: {test_case['scenario']}\n"
+            f"Steps to reproduce:\n"
+            + "".join(f"{idx + 1}. {step}\n" for idx, step in enumerate(test_case['steps']))
+            + f"Expected Result: {test_case['expected_result']}\n"
+            f"Actual Result: [To be filled during execution]\n"
+            f"Priority: {test_case['priority']}"
+            for test_case in test_cases
+        )
+
+    def _prepare(self, model: str, messages: List[Dict[str, Any]], max_tokens: Optional[int],
+                 json_output: bool):
+        """Build the answer and its simulated timings: (content, finish_reason, latency, generation_time, usage)."""
+        content = self.answer(messages, json_output)
+        finish_reason = "stop"
+        if max_tokens and len(content) // 4 > max_tokens:
+            content = content[:max_tokens * 4]
+            finish_reason = "length"
+
+        # Seed the jitter from the prompt so repeated runs take the same time
+        seed = hashlib.sha256(json.dumps(messages, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        rng = random.Random(seed)
+        factor = 1 + rng.uniform(-self.jitter, self.jitter)
+        latency = self.latency * factor
+        generation_time = (len(content) / 4 / self.tokens_per_second) * factor if self.tokens_per_second > 0 else 0.0
+        usage = SimpleNamespace(prompt_tokens=len(_message_text(messages)) // 4,
+                                completion_tokens=len(content) // 4)
+        usage.total_tokens = usage.prompt_tokens + usage.completion_tokens
+
+        with self._lock:
+            self.requests += 1
+        return content, finish_reason, latency, generation_time, usage
+
+    @staticmethod
+    def _response(model: str, content: str, finish_reason: str, usage) -> Any:
+        return SimpleNamespace(
+            model=model,
+            usage=usage,
+            choices=[SimpleNamespace(index=0, finish_reason=finish_reason,
+                                     message=SimpleNamespace(role="assistant", content=content))]
+        )
+
+    def complete(self, model: str, messages: List[Dict[str, Any]], stream: bool = False,
+                 max_tokens: Optional[int] = None, json_output: bool = False):
+        content, finish_reason, latency, generation_time, usage = self._prepare(model, messages, max_tokens, json_output)
+
+        if stream:
+            return self._stream(model, content, finish_reason, latency, generation_time)
+
+        self._wait(latency + generation_time)
+        return self._response(model, content, finish_reason, usage)
+
+    def _wait(self, seconds: float) -> None:
+        if self._slots:
+            with self._slots:
+                time.sleep(seconds)
+        else:
+            time.sleep(seconds)
+
+    def _stream(self, model: str, content: str, finish_reason: str, latency: float,
+                generation_time: float) -> Iterator[Any]:
+        self._wait(latency)
+        pieces = [content[i:i + 16] for i in range(0, len(content), 16)] or [""]
+        delay = generation_time / len(pieces)
+        for piece in pieces:
+            if delay:
+                time.sleep(delay)
+            yield SimpleNamespace(model=model, choices=[SimpleNamespace(
+                index=0, delta=SimpleNamespace(content=piece), finish_reason=None)])
+        yield SimpleNamespace(model=model, choices=[SimpleNamespace(
+            index=0, delta=SimpleNamespace(content=None), finish_reason=finish_reason)])
+
+
+class _AsyncStubCompletions:
+    def __init__(self, backend: "AsyncStubClient"):
+        self._backend = backend
+
+    async def create(self, model: str, messages: List[Dict[str, Any]], stream: bool = False,
+                     max_tokens: Optional[int] = None, response_format: Optional[Dict[str, Any]] = None, **kwargs):
+        if stream:
+            raise ValueError("The async stub does not stream")
+        return await self._backend.complete_async(model, messages, max_tokens, json_output=bool(response_format))
+
+
+class AsyncStubClient(StubClient):
+    """``StubClient`` with the ``AsyncOpenAI`` interface; simulated delays wait on the event loop."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chat = SimpleNamespace(completions=_AsyncStubCompletions(self))
+        self._async_slots = None
+
+    async def complete_async(self, model: str, messages: List[Dict[str, Any]], max_tokens: Optional[int] = None,
+                             json_output: bool = False):
+        content, finish_reason, latency, generation_time, usage = self._prepare(model, messages, max_tokens, json_output)
+        if self.max_concurrency > 0:
+            if self._async_slots is None:
+                self._async_slots = asyncio.Semaphore(self.max_concurrency)
+            async with self._async_slots:
+                await asyncio.sleep(latency + generation_time)
+        else:
+            await asyncio.sleep(latency + generation_time)
+        return self._response(model, content, finish_reason, usage)
+
+    async def close(self) -> None:
+        pass
+
+
+def create_llm_client(backend: str = LLM_BACKEND):
+    """Create a client for ``backend`` ('openai' or 'stub')."""
+    if backend == "stub":
+        logger.info("Using the stub LLM backend")
+        return StubClient()
+    if backend != "openai":
+        raise ValueError(f"Unknown LLM backend: {backend}")
+
+    from openai import OpenAI
+    return OpenAI(api_key=OPENAI_API_KEY, max_retries=0)  # Retries are handled by ai.rate_limiter
+
+
+_client = None
+_client_lock = Lock()
+
+
+def get_llm_client():
+    """Return the process-wide client of the configured LLM backend."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = create_llm_client()
+        return _client
+
+
+def create_async_llm_client(backend: str = LLM_BACKEND):
+    """Create an asyncio client for ``backend`` ('openai' or 'stub').
+
+    The client is bound to the event loop it is first used on, so create one per
+    loop (e.g. per ``asyncio.run``) and close it with ``await client.close()``.
+    """
+    if backend == "stub":
+        return AsyncStubClient()
+    if backend != "openai":
+        raise ValueError(f"Unknown LLM backend: {backend}")
+
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=0)  # Retries are handled by ai.rate_limiter
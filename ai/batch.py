@@ -0,0 +1,406 @@
+"""Offline bulk generation through batch request files.
+
+A batch run has three steps that can happen hours apart:
+
+1. ``prepare``: fetch the items and write every generation prompt to a JSONL batch
+   request file, plus a manifest describing the items and test types.
+2. ``submit`` the file to the OpenAI Batch API (and later ``fetch`` its result file),
+   or answer it with ``run-local`` using the configured client.
+3. ``ingest`` the result file: rebuild each item's test cases, save the TXT and Excel
+   files and store the test case record in MongoDB.
+
+Usage:
+    python -m ai.batch prepare --source jira --items KAN-1,KAN-2 --types dashboard_functional --out nightly.jsonl
+    python -m ai.batch submit nightly.jsonl
+    python -m ai.batch fetch nightly.jsonl --out nightly.results.jsonl
+    python -m ai.batch ingest nightly.results.jsonl --manifest nightly.jsonl.manifest.json
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import argparse
+import json
+import logging
+import uuid
+
+from config.settings import BATCH_COMPLETION_WINDOW, BATCH_LOCAL_WINDOW, PIPELINE_FETCH_WORKERS
+from ai.completion import create_chat_completion
+from ai.concurrency import run_ordered
+from ai.preprocess import prepare_description
+from ai.generator import (
+    client, build_type_requests, merge_chunk_results, split_complete_test_cases
+)
+from utils.file_handler import save_item_files, format_test_cases_for_storage
+from utils.sources import fetch_source_item, iter_source_items
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+
+def make_custom_id(item_id: str, test_type: str, chunk_index: int) -> str:
+    """Build the id that ties a batch request line back to its item, type and chunk."""
+    return f"{item_id}::{test_type}::{chunk_index}"
+
+
+def parse_custom_id(custom_id: str) -> Tuple[str, str, int]:
+    item_id, test_type, chunk_index = custom_id.rsplit("::", 2)
+    return item_id, test_type, int(chunk_index)
+
+
+def manifest_path_for(request_path: str) -> str:
+    return f"{request_path}.manifest.json"
+
+
+def load_manifest(manifest_path: str) -> Dict[str, Any]:
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: Dict[str, Any], manifest_path: str) -> None:
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def _read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_batch_requests(items: List[Dict[str, str]], selected_types: List[str], request_path: str,
+                         source_type: str = "", chunk_size: Optional[int] = None) -> Dict[str, Any]:
+    """Write the generation prompts for ``items`` to a JSONL batch request file.
+
+    Args:
+        items (List[Dict[str, str]]): Items with 'item_id', 'summary' and 'description'
+        selected_types (List[str]): Test types to generate for every item
+        request_path (str): Path of the batch request file to write
+        source_type (str): 'jira' or 'azure', recorded in the manifest
+        chunk_size (Optional[int]): Test cases per request, defaults to GENERATION_CHUNK_SIZE
+
+    Returns:
+        Dict[str, Any]: The manifest, also written next to the request file
+    """
+    manifest = {
+        "batch_name": str(uuid.uuid4()),
+        "created_at": datetime.utcnow().isoformat(),
+        "source_type": source_type,
+        "selected_types": list(selected_types),
+        "request_path": request_path,
+        "request_count": 0,
+        "batch_id": None,
+        "items": {}
+    }
+
+    with open(request_path, "w", encoding="utf-8") as f:
+        for item in items:
+            chunk_counts = {}
+            description = prepare_description(item["description"])
+            for test_type in selected_types:
+                requests = build_type_requests(test_type, description, item["summary"], chunk_size)
+                if not requests:
+                    logger.warning(f"Skipping unknown test type: {test_type}")
+                    continue
+                chunk_counts[test_type] = len(requests)
+                for chunk_index, body in enumerate(requests):
+                    f.write(json.dumps({
+                        "custom_id": make_custom_id(item["item_id"], test_type, chunk_index),
+                        "method": "POST",
+                        "url": BATCH_ENDPOINT,
+                        "body": body
+                    }, ensure_ascii=False) + "\n")
+                    manifest["request_count"] += 1
+            manifest["items"][item["item_id"]] = {
+                "summary": item["summary"],
+                "chunk_counts": chunk_counts
+            }
+
+    save_manifest(manifest, manifest_path_for(request_path))
+    logger.info(f"Wrote {manifest['request_count']} requests for {len(items)} items to {request_path}")
+    return manifest
+
+
+def prepare_batch(source_type: str, item_ids: List[str], selected_types: List[str], request_path: str,
+                  config: Optional[Dict[str, Any]] = None, chunk_size: Optional[int] = None) -> Dict[str, Any]:
+    """Fetch Jira issues or Azure work items and write their batch request file.
+
+    Items that cannot be fetched are listed under 'failed_items' in the manifest.
+    """
+    sources = dict(iter_source_items(source_type, item_ids, config))
+    missing = [item_id for item_id in item_ids if not sources.get(item_id)]
+    for item_id, source in zip(missing, run_ordered(
+        missing,
+        lambda item_id: fetch_source_item(source_type, item_id, config),
+        max_workers=PIPELINE_FETCH_WORKERS
+    )):
+        sources[item_id] = source
+
+    items = []
+    failed_items = []
+    for item_id in item_ids:
+        source = sources[item_id]
+        if not source:
+            logger.error(f"Could not fetch {source_type} item {item_id}")
+            failed_items.append(item_id)
+            continue
+        items.append({"item_id": item_id, **source})
+
+    manifest = write_batch_requests(items, selected_types, request_path, source_type, chunk_size)
+    manifest["failed_items"] = failed_items
+    save_manifest(manifest, manifest_path_for(request_path))
+    return manifest
+
+
+def submit_batch(request_path: str, batch_client=None) -> Optional[str]:
+    """Upload a batch request file and start a batch job.
+
+    Returns:
+        Optional[str]: The batch id (also recorded in the manifest), or None on failure
+    """
+    batch_client = batch_client or client
+    try:
+        with open(request_path, "rb") as f:
+            input_file = batch_client.files.create(file=f, purpose="batch")
+        batch = batch_client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=BATCH_COMPLETION_WINDOW
+        )
+    except Exception as e:
+        logger.error(f"Error submitting batch {request_path}: {str(e)}")
+        return None
+
+    manifest_path = manifest_path_for(request_path)
+    try:
+        manifest = load_manifest(manifest_path)
+        manifest["batch_id"] = batch.id
+        save_manifest(manifest, manifest_path)
+    except FileNotFoundError:
+        logger.warning(f"No manifest found for {request_path}")
+
+    logger.info(f"Submitted batch {batch.id} for {request_path}")
+    return batch.id
+
+
+def download_batch_results(batch_id: str, result_path: str, batch_client=None) -> str:
+    """Download the result file of a finished batch.
+
+    Returns:
+        str: The batch status; the result file is only written once it is 'completed'
+    """
+    batch_client = batch_client or client
+    batch = batch_client.batches.retrieve(batch_id)
+    if batch.status != "completed" or not batch.output_file_id:
+        logger.info(f"Batch {batch_id} is {batch.status}")
+        return batch.status
+
+    content = batch_client.files.content(batch.output_file_id)
+    with open(result_path, "w", encoding="utf-8") as f:
+        f.write(content.text)
+    logger.info(f"Downloaded results of batch {batch_id} to {result_path}")
+    return batch.status
+
+
+def _answer_request(line: Dict[str, Any], answer_client) -> Dict[str, Any]:
+    try:
+        result = create_chat_completion(answer_client, **line["body"])
+    except Exception as e:
+        return {"id": f"local-{uuid.uuid4()}", "custom_id": line["custom_id"], "response": None,
+                "error": {"message": str(e)}}
+    return {
+        "id": f"local-{uuid.uuid4()}",
+        "custom_id": line["custom_id"],
+        "response": {
+            "status_code": 200,
+            "body": {
+                "model": line["body"].get("model"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": result["content"]},
+                    "finish_reason": result["finish_reason"]
+                }]
+            }
+        },
+        "error": None
+    }
+
+
+def run_batch_locally(request_path: str, result_path: str, answer_client=None) -> int:
+    """Answer a batch request file with a chat completion client instead of the Batch API.
+
+    The request file is read in windows of BATCH_LOCAL_WINDOW lines, so files with
+    thousands of requests never sit in memory at once. The result file uses the Batch
+    API output format, so it can be ingested the same way.
+
+    Returns:
+        int: Number of requests answered
+    """
+    answer_client = answer_client or client
+    answered = 0
+
+    def answer_window(window: List[Dict[str, Any]], out) -> None:
+        for result in run_ordered(window, lambda line: _answer_request(line, answer_client)):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    with open(result_path, "w", encoding="utf-8") as out:
+        window = []
+        for line in _read_jsonl(request_path):
+            window.append(line)
+            if len(window) >= BATCH_LOCAL_WINDOW:
+                answer_window(window, out)
+                answered += len(window)
+                window = []
+        if window:
+            answer_window(window, out)
+            answered += len(window)
+
+    logger.info(f"Answered {answered} requests from {request_path} locally")
+    return answered
+
+
+def _read_results(result_path: str) -> Dict[Tuple[str, str], Dict[int, Optional[str]]]:
+    """Collect the answer text of every result line keyed by (item_id, test_type) and chunk index."""
+    answers: Dict[Tuple[str, str], Dict[int, Optional[str]]] = {}
+    for line in _read_jsonl(result_path):
+        item_id, test_type, chunk_index = parse_custom_id(line["custom_id"])
+        response = line.get("response") or {}
+        text = None
+        if line.get("error") or response.get("status_code") != 200:
+            logger.error(f"Request {line['custom_id']} failed: {line.get('error') or response.get('status_code')}")
+        else:
+            choice = response["body"]["choices"][0]
+            text = (choice["message"].get("content") or "").strip()
+            if choice.get("finish_reason") == "length":
+                # No continuation requests offline: keep only the complete test cases
+                logger.warning(f"Answer for {line['custom_id']} was cut off by the token limit")
+                text, _ = split_complete_test_cases(text)
+        answers.setdefault((item_id, test_type), {})[chunk_index] = text or None
+    return answers
+
+
+def ingest_batch_results(result_path: str, manifest: Dict[str, Any], save_to_mongo: bool = True) -> Dict[str, Dict[str, Any]]:
+    """Turn a batch result file into saved test case files and MongoDB records.
+
+    Args:
+        result_path (str): Result file from the Batch API or ``run_batch_locally``
+        manifest (Dict[str, Any]): Manifest written when the request file was prepared
+        save_to_mongo (bool): Set to False to only write the TXT and Excel files
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Per item id, {'files', 'url_key', 'missing_types', 'error'}
+    """
+    answers = _read_results(result_path)
+    outcomes = {}
+    mongo_handler = None
+
+    for item_id, item in manifest["items"].items():
+        sections = []
+        missing_types = []
+        for test_type in manifest["selected_types"]:
+            chunk_count = item["chunk_counts"].get(test_type)
+            if not chunk_count:
+                continue
+            chunks = answers.get((item_id, test_type), {})
+            section = merge_chunk_results(test_type, [chunks.get(index) for index in range(chunk_count)])
+            if section:
+                sections.append(section)
+            else:
+                missing_types.append(test_type)
+
+        outcome = {"files": None, "url_key": None, "missing_types": missing_types, "error": None}
+        outcomes[item_id] = outcome
+        if not sections:
+            outcome["error"] = "No test cases in batch results"
+            logger.error(f"No test cases for {item_id} in {result_path}")
+            continue
+
+        test_cases = "\n\n" + "\n\n".join(sections)
+        files = save_item_files(item_id, test_cases)
+        if not files:
+            outcome["error"] = "Failed to save test case files"
+            continue
+        outcome["files"] = files
+
+        if save_to_mongo:
+            try:
+                if mongo_handler is None:
+                    from utils.mongo_handler import MongoHandler
+                    mongo_handler = MongoHandler()
+                outcome["url_key"] = mongo_handler.save_test_case({
+                    'files': {item_id: files},
+                    'test_cases': format_test_cases_for_storage(test_cases, item_id),
+                    'source_type': manifest.get("source_type"),
+                    'item_ids': [item_id],
+                    'batch_id': manifest.get("batch_id") or manifest.get("batch_name")
+                }, item_id)
+            except Exception as e:
+                outcome["error"] = str(e)
+                logger.error(f"Error saving batch results for {item_id}: {str(e)}")
+
+    succeeded = sum(1 for outcome in outcomes.values() if outcome["files"] and not outcome["error"])
+    logger.info(f"Ingested {result_path}: {succeeded}/{len(outcomes)} items saved")
+    return outcomes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(prog="python -m ai.batch", description="Offline bulk test case generation")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    prepare = commands.add_parser("prepare", help="Fetch items and write a batch request file")
+    prepare.add_argument("--source", choices=["jira", "azure"], required=True)
+    prepare.add_argument("--items", required=True, help="Comma-separated item ids")
+    prepare.add_argument("--types", required=True, help="Comma-separated test types")
+    prepare.add_argument("--out", required=True, help="Batch request file to write")
+
+    submit = commands.add_parser("submit", help="Submit a batch request file to the Batch API")
+    submit.add_argument("request_path")
+
+    fetch = commands.add_parser("fetch", help="Download the results of a submitted batch")
+    fetch.add_argument("request_path")
+    fetch.add_argument("--out", required=True, help="Result file to write")
+
+    run_local = commands.add_parser("run-local", help="Answer a batch request file with the configured client")
+    run_local.add_argument("request_path")
+    run_local.add_argument("--out", required=True, help="Result file to write")
+
+    ingest = commands.add_parser("ingest", help="Save the test cases from a batch result file")
+    ingest.add_argument("result_path")
+    ingest.add_argument("--manifest", required=True)
+    ingest.add_argument("--no-mongo", action="store_true", help="Only write the TXT and Excel files")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "prepare":
+        split = lambda value: [part.strip() for part in value.split(",") if part.strip()]
+        manifest = prepare_batch(args.source, split(args.items), split(args.types), args.out)
+        print(f"{manifest['request_count']} requests written to {args.out}")
+        return 0 if manifest["items"] else 1
+
+    if args.command == "submit":
+        batch_id = submit_batch(args.request_path)
+        print(batch_id or "Submission failed")
+        return 0 if batch_id else 1
+
+    if args.command == "fetch":
+        manifest = load_manifest(manifest_path_for(args.request_path))
+        if not manifest.get("batch_id"):
+            print("Batch has not been submitted")
+            return 1
+        status = download_batch_results(manifest["batch_id"], args.out)
+        print(f"Batch {manifest['batch_id']} is {status}")
+        return 0 if status == "completed" else 1
+
+    if args.command == "run-local":
+        print(f"{run_batch_locally(args.request_path, args.out)} requests answered")
+        return 0
+
+    outcomes = ingest_batch_results(args.result_path, load_manifest(args.manifest), not args.no_mongo)
+    for item_id, outcome in outcomes.items():
+        print(f"{item_id}: {outcome['error'] or outcome['files']}")
+    return 0 if any(outcome["files"] for outcome in outcomes.values()) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,217 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import logging
+import os
+import time
+
+from config.settings import (
+    LLM_CACHE_ENABLED, LLM_CACHE_MAX_BYTES, LLM_CACHE_BACKEND, LLM_CACHE_DIR, LLM_CACHE_TTL
+)
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(request: Dict[str, Any]) -> str:
+    """Build a content-addressed key for a chat completion request.
+
+    The key covers everything that changes the answer: model, system message,
+    prompt, temperature, token limit and any image data embedded in the messages.
+    """
+    canonical = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _entry_size(value: Dict[str, Any]) -> int:
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+class MemoryCacheTier:
+    """In-memory LRU tier bounded by the total size of the cached entries."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        size = _entry_size(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self.current_bytes += size
+        # Evict least recently used entries until we fit again
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCacheTier:
+    """Persistent tier storing one JSON file per key on local disk."""
+
+    def __init__(self, directory: str, ttl: int):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read cache entry {key}: {str(e)}")
+            return None
+
+        if time.time() - entry.get("created_at", 0) > self.ttl:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry.get("value")
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        path = self._path(key)
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"created_at": time.time(), "value": value}, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write cache entry {key}: {str(e)}")
+
+
+class MongoCacheTier:
+    """Persistent tier backed by a MongoDB collection with a TTL index."""
+
+    def __init__(self, ttl: int):
+        from utils.mongo_handler import MongoHandler
+
+        self.ttl = ttl
+        self.collection = MongoHandler().db.llm_cache
+        self.collection.create_index("created_at", expireAfterSeconds=ttl)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            entry = self.collection.find_one({"_id": key})
+        except Exception as e:
+            logger.warning(f"Could not read cache entry {key}: {str(e)}")
+            return None
+        if not entry:
+            return None
+        # The TTL monitor only runs periodically, so double-check expiry here
+        if entry["created_at"] < datetime.utcnow() - timedelta(seconds=self.ttl):
+            return None
+        return entry.get("value")
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        try:
+            self.collection.replace_one(
+                {"_id": key},
+                {"_id": key, "value": value, "created_at": datetime.utcnow()},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Could not write cache entry {key}: {str(e)}")
+
+
+class ResponseCache:
+    """Two-tier cache for LLM responses: in-memory LRU in front of an optional persistent tier."""
+
+    def __init__(self, max_bytes: int, persistent=None):
+        self.memory = MemoryCacheTier(max_bytes)
+        self.persistent = persistent
+        self._lock = Lock()
+        self._stats = {"hits": 0, "misses": 0, "memory_hits": 0, "persistent_hits": 0, "stores": 0}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self.memory.get(key)
+            if value is not None:
+                self._stats["hits"] += 1
+                self._stats["memory_hits"] += 1
+                return value
+
+        value = self.persistent.get(key) if self.persistent else None
+
+        with self._lock:
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            self._stats["persistent_hits"] += 1
+            # Promote to the memory tier for subsequent lookups
+            self.memory.set(key, value)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self.memory.set(key, value)
+            self._stats["stores"] += 1
+        if self.persistent:
+            self.persistent.set(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": (self._stats["hits"] / lookups) if lookups else 0.0,
+                "entries": len(self.memory),
+                "memory_bytes": self.memory.current_bytes,
+                "max_memory_bytes": self.memory.max_bytes,
+                "persistent_backend": LLM_CACHE_BACKEND or None
+            }
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache, or None when caching is disabled."""
+    global _response_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+
+    with _response_cache_lock:
+        if _response_cache is None:
+            persistent = None
+            try:
+                if LLM_CACHE_BACKEND == "disk":
+                    persistent = DiskCacheTier(LLM_CACHE_DIR, LLM_CACHE_TTL)
+                elif LLM_CACHE_BACKEND == "mongo":
+                    persistent = MongoCacheTier(LLM_CACHE_TTL)
+            except Exception as e:
+                logger.error(f"Could not initialise {LLM_CACHE_BACKEND} cache tier, using memory only: {str(e)}")
+            _response_cache = ResponseCache(LLM_CACHE_MAX_BYTES, persistent)
+        return _response_cache
@@ -0,0 +1,189 @@
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+import logging
+
+from ai.cache import get_response_cache, make_cache_key
+from ai.rate_limiter import rate_limiter, estimate_prompt_tokens
+from ai.telemetry import current_telemetry
+
+logger = logging.getLogger(__name__)
+
+
+def _record_usage(request: Dict[str, Any], content: str, usage=None, cached: bool = False) -> None:
+    """Add a completion to the telemetry of the running generation, estimating missing usage."""
+    telemetry = current_telemetry()
+    if not telemetry:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    telemetry.record_completion(
+        prompt_tokens if prompt_tokens is not None else estimate_prompt_tokens(request),
+        completion_tokens if completion_tokens is not None else len(content) // 4,
+        cached
+    )
+
+
+def _send(client, request: Dict[str, Any], on_response: Optional[Callable[[Any], Any]] = None):
+    """Send a request through the shared rate limiter, reading the rate limit headers when possible.
+
+    ``on_response`` runs while the request still holds its rate limit reservation, so a
+    stream consumed there counts as in flight until its last chunk, and errors raised
+    while reading it are retried like errors of the request itself. Clients without a
+    quota (the stub backend) are called directly.
+    """
+    completions = client.chat.completions
+    if not getattr(client, "rate_limited", True):
+        response = completions.create(**request)
+        return on_response(response) if on_response else response
+    raw_completions = getattr(completions, "with_raw_response", None)
+    if raw_completions is None:
+        return rate_limiter.call(request, lambda: completions.create(**request), on_response)
+    if on_response:
+        return rate_limiter.call(request, lambda: raw_completions.create(**request),
+                                 lambda raw: on_response(raw.parse()))
+    return rate_limiter.call(request, lambda: raw_completions.create(**request), lambda raw: raw.parse())
+
+
+def create_chat_completion(client, use_cache: bool = True, **request) -> Dict[str, Any]:
+    """Run a chat completion request, serving repeated requests from the response cache.
+
+    Args:
+        client: OpenAI client used on a cache miss
+        use_cache (bool): Set to False to bypass the cache for this request
+        **request: Arguments for ``client.chat.completions.create``
+
+    Returns:
+        Dict[str, Any]: {'content': str, 'finish_reason': str, 'cached': bool}
+    """
+    cache = get_response_cache() if use_cache else None
+    key = make_cache_key(request) if cache else None
+
+    if cache:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.info(f"Cache hit for {request.get('model')} request")
+            _record_usage(request, cached["content"], cached=True)
+            return {**cached, "cached": True}
+
+    response = _send(client, request)
+    choice = response.choices[0]
+    result = {
+        "content": (choice.message.content or "").strip(),
+        "finish_reason": choice.finish_reason
+    }
+    _record_usage(request, result["content"], getattr(response, "usage", None))
+
+    # Empty answers are never cached
+    if cache and result["content"]:
+        cache.set(key, result)
+
+    return {**result, "cached": False}
+
+
+async def _send_async(client, request: Dict[str, Any]):
+    """Async version of ``_send`` for ``AsyncOpenAI`` (or the async stub)."""
+    completions = client.chat.completions
+    if not getattr(client, "rate_limited", True):
+        return await completions.create(**request)
+    raw_completions = getattr(completions, "with_raw_response", None)
+    if raw_completions is None:
+        return await rate_limiter.call_async(request, lambda: completions.create(**request))
+    return await rate_limiter.call_async(request, lambda: raw_completions.create(**request), lambda raw: raw.parse())
+
+
+async def create_chat_completion_async(client, use_cache: bool = True, **request) -> Dict[str, Any]:
+    """Async version of ``create_chat_completion``, sharing its response cache and rate limiter.
+
+    Args:
+        client: ``AsyncOpenAI`` client (see ``ai.backends.create_async_llm_client``) used on a cache miss
+        use_cache (bool): Set to False to bypass the cache for this request
+        **request: Arguments for ``client.chat.completions.create``
+
+    Returns:
+        Dict[str, Any]: {'content': str, 'finish_reason': str, 'cached': bool}
+    """
+    cache = get_response_cache() if use_cache else None
+    key = make_cache_key(request) if cache else None
+
+    if cache:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.info(f"Cache hit for {request.get('model')} request")
+            _record_usage(request, cached["content"], cached=True)
+            return {**cached, "cached": True}
+
+    response = await _send_async(client, request)
+    choice = response.choices[0]
+    result = {
+        "content": (choice.message.content or "").strip(),
+        "finish_reason": choice.finish_reason
+    }
+    _record_usage(request, result["content"], getattr(response, "usage", None))
+
+    # Empty answers are never cached
+    if cache and result["content"]:
+        cache.set(key, result)
+
+    return {**result, "cached": False}
+
+
+def stream_chat_completion(client, on_delta: Callable[[str], None], use_cache: bool = True,
+                           on_retry: Optional[Callable[[], None]] = None, **request) -> Dict[str, Any]:
+    """Run a streaming chat completion, passing each piece of text to ``on_delta`` as it arrives.
+
+    A cache hit is replayed to ``on_delta`` as a single piece. The complete answer is
+    cached under the same key as the non-streaming request. When a stream fails after
+    some text was delivered and is retried, ``on_retry`` is called before the new
+    answer starts arriving.
+
+    Returns:
+        Dict[str, Any]: {'content': str, 'finish_reason': str, 'cached': bool}
+    """
+    cache = get_response_cache() if use_cache else None
+    key = make_cache_key(request) if cache else None
+
+    if cache:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.info(f"Cache hit for {request.get('model')} request")
+            _record_usage(request, cached["content"], cached=True)
+            on_delta(cached["content"])
+            return {**cached, "cached": True}
+
+    delivered = False
+
+    def consume(stream) -> SimpleNamespace:
+        nonlocal delivered
+        if delivered and on_retry:
+            on_retry()
+        delivered = False
+        parts = []
+        finish_reason = None
+        usage = None
+        for chunk in stream:
+            # With include_usage the last chunk carries the usage and no choices
+            usage = getattr(chunk, "usage", None) or usage
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            delta = choice.delta.content if choice.delta else None
+            if delta:
+                parts.append(delta)
+                delivered = True
+                on_delta(delta)
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+        return SimpleNamespace(content="".join(parts).strip(), finish_reason=finish_reason, usage=usage)
+
+    streamed = _send(client, {**request, "stream": True, "stream_options": {"include_usage": True}}, consume)
+    result = {
+        "content": streamed.content,
+        "finish_reason": streamed.finish_reason
+    }
+    _record_usage(request, result["content"], streamed.usage)
+
+    # Empty answers are never cached
+    if cache and result["content"]:
+        cache.set(key, result)
+
+    return {**result, "cached": False}
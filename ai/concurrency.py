@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional, Sequence, TypeVar
+import contextvars
+import logging
+
+from config.settings import GENERATION_MAX_WORKERS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def run_ordered(items: Sequence[T],
+                worker: Callable[[T], Optional[R]],
+                max_workers: Optional[int] = None,
+                on_complete: Optional[Callable[[T, Optional[R]], None]] = None) -> List[Optional[R]]:
+    """Run ``worker`` for every item with bounded concurrency.
+
+    Args:
+        items (Sequence[T]): Items to process (e.g. selected test types)
+        worker (Callable[[T], Optional[R]]): Function called once per item
+        max_workers (Optional[int]): Maximum calls in flight, defaults to GENERATION_MAX_WORKERS
+        on_complete (Optional[Callable]): Called with (item, result) as soon as each item finishes
+
+    Returns:
+        List[Optional[R]]: Results in the same order as ``items``; None for items that failed
+
+    Workers run in a copy of the caller's context, so context variables (such as the
+    generation telemetry collector) are visible inside them.
+    """
+    if not items:
+        return []
+
+    limit = max_workers or GENERATION_MAX_WORKERS
+    limit = max(1, min(limit, len(items)))
+    results: List[Optional[R]] = [None] * len(items)
+
+    def notify(item: T, result: Optional[R]) -> None:
+        if on_complete:
+            try:
+                on_complete(item, result)
+            except Exception as e:
+                logger.error(f"Completion callback failed for {item}: {str(e)}")
+
+    # Run inline when there is nothing to overlap
+    if limit == 1:
+        for idx, item in enumerate(items):
+            try:
+                results[idx] = worker(item)
+            except Exception as e:
+                logger.error(f"Error processing {item}: {str(e)}")
+            notify(item, results[idx])
+        return results
+
+    with ThreadPoolExecutor(max_workers=limit) as executor:
+        futures = {executor.submit(contextvars.copy_context().run, worker, item): idx
+                   for idx, item in enumerate(items)}
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                results[idx] = future.result()
+            except Exception as e:
+                logger.error(f"Error processing {items[idx]}: {str(e)}")
+            notify(items[idx], results[idx])
+
+    return results
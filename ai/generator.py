@@ -1,14 +1,30 @@
-from openai import OpenAI
-from config.settings import OPENAI_API_KEY
-from typing import Optional, List, Dict, Any
+from config.settings import (
+    GENERATION_CHUNK_SIZE, GENERATION_MAX_CONTINUATIONS, GENERATION_COMBINE_TYPES,
+    GENERATION_COMBINED_MAX_TOKENS, GENERATION_TOKENS_PER_TEST_CASE
+)
+from typing import Optional, List, Dict, Any, Callable, Tuple
+import json
 import logging
+import re
+
+from ai.backends import get_llm_client
+from ai.completion import create_chat_completion, stream_chat_completion
+from ai.concurrency import run_ordered
+from ai.preprocess import prepare_description
+from ai.telemetry import track_generation
+from utils.file_handler import TestCaseStreamParser, parse_traditional_format, extract_test_type_sections
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client once at module level
-client = OpenAI(api_key=OPENAI_API_KEY)
+# Client of the configured LLM backend (OpenAI or the local stub)
+client = get_llm_client()
+
+# Model used for text generation
+GENERATION_MODEL = "gpt-4o"
+# Bump whenever the prompts change, so stored results of the old prompts are not reused
+PROMPT_VERSION = "1"
 
 def get_test_type_config(test_type: str) -> dict:
     """Get the configuration for a specific test type"""
@@ -46,8 +62,526 @@ def get_test_type_config(test_type: str) -> dict:
     }
     return base_configs.get(test_type, {})
 
-def generate_test_case(description: str, summary: str = "", selected_types: List[str] = None) -> Optional[str]:
-    """Generate test cases based on user-selected types"""
+TEXT_FORMAT_INSTRUCTIONS = """Use this EXACT format for each test case:
+
+    Title: {prefix}_[Number]_[Brief_Title]
+    Scenario: [Detailed scenario description]
+    Steps to reproduce:
+    1. [Step 1]
+    2. [Step 2]
+    ...
+    Expected Result: [What should happen]
+    Actual Result: [To be filled during execution]
+    Priority: [High/Medium/Low]"""
+
+JSON_FORMAT_INSTRUCTIONS = """Answer with a JSON object with a "test_cases" array. For each test case give:
+    - "title": {prefix}_[Number]_[Brief_Title]
+    - "scenario": detailed scenario description
+    - "steps": list of steps, without numbering
+    - "expected_result": what should happen
+    - "priority": High, Medium or Low"""
+
+# JSON schema of the structured output mode
+TEST_CASE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "test_cases": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "scenario": {"type": "string"},
+                    "steps": {"type": "array", "items": {"type": "string"}},
+                    "expected_result": {"type": "string"},
+                    "priority": {"type": "string", "enum": ["High", "Medium", "Low"]}
+                },
+                "required": ["title", "scenario", "steps", "expected_result", "priority"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["test_cases"],
+    "additionalProperties": False
+}
+
+def _build_request(test_type: str, config: dict, description: str, summary: str,
+                   count: int, start_number: int = 1, existing_titles: Optional[List[str]] = None,
+                   structured: bool = False) -> Dict[str, Any]:
+    """Build the chat completion request for ``count`` test cases of one type.
+
+    With ``structured`` the answer is requested as JSON matching TEST_CASE_SCHEMA.
+    """
+    numbering = ""
+    if start_number > 1:
+        numbering = f"\n    Number the test cases starting at {start_number}."
+    if existing_titles:
+        numbering += "\n    These test cases already exist, do not repeat them:\n    " + "\n    ".join(existing_titles)
+
+    format_instructions = (JSON_FORMAT_INSTRUCTIONS if structured else TEXT_FORMAT_INSTRUCTIONS).format(prefix=config['prefix'])
+    prompt = f"""
+    Task Title: {summary}
+    Task Description: {description}
+
+    Generate EXACTLY {count} test cases for {config['description']}.{numbering}
+    
+    For each test case:
+    1. Use the prefix {config['prefix']}
+    2. Focus exclusively on {test_type} scenarios
+    3. Include detailed steps
+    4. Specify expected results
+    5. Do not mix with other test types
+
+    {format_instructions}
+    """
+
+    request = dict(
+        model=GENERATION_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": f"You are a QA engineer. Generate EXACTLY {count} {test_type} test cases. Use {config['prefix']} as the prefix."
+            },
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.7,
+        max_tokens=2000
+    )
+    if structured:
+        request["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {"name": "test_cases", "strict": True, "schema": TEST_CASE_SCHEMA}
+        }
+    return request
+
+def split_complete_test_cases(text: str) -> Tuple[str, List[str]]:
+    """Drop the last, cut-off test case from a truncated answer.
+
+    Returns:
+        Tuple[str, List[str]]: The text of the complete test cases and their titles
+    """
+    lines = text.split('\n')
+    title_lines = [idx for idx, line in enumerate(lines) if TestCaseStreamParser.TITLE_PATTERN.match(line.strip())]
+    if not title_lines:
+        return "", []
+    complete_lines = lines[:title_lines[-1]]
+    titles = [TestCaseStreamParser.TITLE_PATTERN.match(lines[idx].strip()).group(1).strip()
+              for idx in title_lines[:-1]]
+    return '\n'.join(complete_lines).strip(), titles
+
+def _renumber_test_cases(text: str, prefix: str) -> str:
+    """Number the ``prefix`` test case titles sequentially (e.g. after merging chunks)."""
+    counter = 0
+
+    def next_number(match):
+        nonlocal counter
+        counter += 1
+        return f"{match.group(1)}{prefix}_{counter:02d}"
+
+    pattern = re.compile(rf'^(\s*(?:\d+\.\s*)?(?:\*\*)?Title:(?:\*\*)?\s*){re.escape(prefix)}_\d+', re.MULTILINE)
+    return pattern.sub(next_number, text)
+
+def plan_chunks(total: int, chunk_size: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Split ``total`` test cases into (count, start_number) sub-requests of at most ``chunk_size``."""
+    chunk_size = GENERATION_CHUNK_SIZE if chunk_size is None else chunk_size
+    if chunk_size <= 0 or chunk_size >= total:
+        return [(total, 1)]
+    return [(min(chunk_size, total - start), start + 1) for start in range(0, total, chunk_size)]
+
+def merge_chunk_results(test_type: str, results: List[Optional[str]]) -> Optional[str]:
+    """Merge the chunk answers of one test type into a single TEST TYPE section.
+
+    Returns:
+        Optional[str]: Test cases prefixed with a TEST TYPE header, or None if every chunk was empty
+    """
+    test_cases = "\n\n".join(result for result in results if result)
+    if not test_cases:
+        return None
+
+    if len(results) > 1:
+        test_cases = _renumber_test_cases(test_cases, get_test_type_config(test_type)['prefix'])
+
+    # Add a section header for each test type to help with parsing
+    return f"TEST TYPE: {test_type}\n\n{test_cases}"
+
+def build_type_requests(test_type: str, description: str, summary: str,
+                        chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Build the chat completion requests for one test type without sending them.
+
+    Returns:
+        List[Dict[str, Any]]: One request per chunk, in chunk order (empty for unknown types)
+    """
+    config = get_test_type_config(test_type)
+    if not config:
+        return []
+    return [_build_request(test_type, config, description, summary, count, start_number)
+            for count, start_number in plan_chunks(config['count'], chunk_size)]
+
+def _generate_chunk(test_type: str, config: dict, description: str, summary: str,
+                    count: int, start_number: int, use_cache: bool = True,
+                    on_test_case: Optional[Callable[[str, Dict], None]] = None) -> Optional[str]:
+    """Request ``count`` test cases, continuing with follow-up requests while the answer is cut off."""
+    collected = []
+    titles: List[str] = []
+    remaining = count
+
+    for _ in range(GENERATION_MAX_CONTINUATIONS + 1):
+        request = _build_request(test_type, config, description, summary, remaining,
+                                 start_number + count - remaining, titles)
+
+        if on_test_case:
+            # Stream the answer and hand over each test case as soon as it is complete
+            logger.info(f"Streaming request to OpenAI for {remaining} {test_type} test cases")
+            stream = {'parser': TestCaseStreamParser(default_section=test_type), 'seen': 0, 'published': 0}
+
+            def publish(test_cases: List[Dict]) -> None:
+                for test_case in test_cases:
+                    stream['seen'] += 1
+                    # A retried answer starts over; its first test cases were already published
+                    if stream['seen'] > stream['published']:
+                        stream['published'] += 1
+                        on_test_case(test_type, test_case)
+
+            def on_delta(text: str) -> None:
+                publish(stream['parser'].feed(text))
+
+            def on_retry() -> None:
+                stream.update(parser=TestCaseStreamParser(default_section=test_type), seen=0)
+
+            response = stream_chat_completion(client, on_delta, use_cache=use_cache, on_retry=on_retry, **request)
+            # The pending test case of a truncated answer is incomplete, so only flush finished answers
+            if response['finish_reason'] != "length":
+                publish(stream['parser'].close())
+        else:
+            logger.info(f"Sending request to OpenAI for {remaining} {test_type} test cases")
+            response = create_chat_completion(client, use_cache=use_cache, **request)
+
+        text = response['content']
+        if not text:
+            break
+        if response['finish_reason'] != "length":
+            collected.append(text)
+            break
+
+        # The output hit the token limit: keep the complete test cases and ask for the rest
+        complete_text, complete_titles = split_complete_test_cases(text)
+        if not complete_titles:
+            # Not even one test case fits the token limit, keep what we have
+            collected.append(text)
+            break
+        collected.append(complete_text)
+        titles.extend(complete_titles)
+        remaining -= len(complete_titles)
+        if remaining <= 0:
+            break
+        logger.info(f"{test_type} output was truncated after {len(titles)} test cases, requesting the remaining {remaining}")
+
+    return "\n\n".join(collected) or None
+
+def _generate_for_type(test_type: str, description: str, summary: str, use_cache: bool = True,
+                       on_test_case: Optional[Callable[[str, Dict], None]] = None,
+                       chunk_size: Optional[int] = None) -> Optional[str]:
+    """Generate test cases for a single test type.
+
+    Large counts are split into sub-requests of ``chunk_size`` test cases that run
+    concurrently; their output is merged with sequentially renumbered titles.
+
+    Returns:
+        Optional[str]: Test cases prefixed with a TEST TYPE header, or None on failure
+    """
+    logger.info(f"Starting generation for test type: {test_type}")
+    config = get_test_type_config(test_type)
+    if not config:
+        logger.warning(f"Skipping unknown test type: {test_type}")
+        return None
+
+    chunks = plan_chunks(config['count'], chunk_size)
+
+    try:
+        results = run_ordered(
+            chunks,
+            lambda chunk: _generate_chunk(test_type, config, description, summary, chunk[0], chunk[1],
+                                          use_cache, on_test_case)
+        )
+        
+        test_cases = merge_chunk_results(test_type, results)
+        if not test_cases:
+            logger.warning(f"Received empty response for {test_type} test cases")
+            return None
+
+        logger.info(f"Generated {test_type} test cases successfully")
+        return test_cases
+
+    except Exception as e:
+        logger.error(f"Error generating {test_type} test cases: {str(e)}")
+        return None
+
+def _record_from_json(item: Dict[str, Any], section: str) -> Optional[Dict]:
+    """Convert one JSON test case into the record format used by the file writers."""
+    if not isinstance(item, dict) or not str(item.get("title") or "").strip():
+        return None
+    steps = item.get("steps") or []
+    if isinstance(steps, str):
+        steps = [step for step in steps.split("\n") if step.strip()]
+    return {
+        "Section": section,
+        "Title": str(item["title"]).strip(),
+        "Scenario": str(item.get("scenario") or "").strip(),
+        "Steps": [re.sub(r"^\d+\.\s*", "", str(step)).strip() for step in steps],
+        "Expected Result": str(item.get("expected_result") or "").strip(),
+        "Priority": str(item.get("priority") or "").strip()
+    }
+
+def parse_structured_test_cases(text: str, test_type: str, truncated: bool = False) -> List[Dict]:
+    """Parse a structured (JSON) answer into test case records.
+
+    The complete test cases of an answer cut off by the token limit are kept. An
+    answer that is not JSON at all is parsed as free text instead.
+    """
+    try:
+        items = json.loads(text).get("test_cases", [])
+    except (ValueError, AttributeError):
+        items = None
+
+    if items is None:
+        # Truncated JSON: decode the test case objects one by one until the cut
+        start = text.find("[")
+        items = []
+        if start != -1:
+            decoder = json.JSONDecoder()
+            position = start + 1
+            while True:
+                while position < len(text) and text[position] in " \t\r\n,":
+                    position += 1
+                try:
+                    item, position = decoder.raw_decode(text, position)
+                except ValueError:
+                    break
+                items.append(item)
+
+    records = [record for record in (_record_from_json(item, test_type) for item in items) if record]
+    if records or "Title:" not in text:
+        return records
+
+    logger.warning(f"Structured answer for {test_type} was not JSON, parsing it as text")
+    if truncated:
+        text, _ = split_complete_test_cases(text)
+    return parse_traditional_format(text, default_section=test_type)
+
+def _renumber_records(records: List[Dict], prefix: str) -> None:
+    """Number the ``prefix`` titles of merged chunk records sequentially."""
+    pattern = re.compile(rf"^{re.escape(prefix)}_\d+")
+    for number, record in enumerate(records, start=1):
+        record["Title"] = pattern.sub(f"{prefix}_{number:02d}", record["Title"])
+
+def _generate_chunk_records(test_type: str, config: dict, description: str, summary: str,
+                            count: int, start_number: int, use_cache: bool = True) -> List[Dict]:
+    """Request ``count`` structured test cases, continuing while the answer is cut off."""
+    records: List[Dict] = []
+    remaining = count
+
+    for _ in range(GENERATION_MAX_CONTINUATIONS + 1):
+        request = _build_request(test_type, config, description, summary, remaining,
+                                 start_number + count - remaining, [record["Title"] for record in records],
+                                 structured=True)
+        logger.info(f"Sending structured request to OpenAI for {remaining} {test_type} test cases")
+        response = create_chat_completion(client, use_cache=use_cache, **request)
+        if not response['content']:
+            break
+
+        truncated = response['finish_reason'] == "length"
+        chunk_records = parse_structured_test_cases(response['content'], test_type, truncated)
+        records.extend(chunk_records)
+        remaining -= len(chunk_records)
+        if not truncated or not chunk_records or remaining <= 0:
+            break
+        logger.info(f"{test_type} output was truncated after {len(records)} test cases, requesting the remaining {remaining}")
+
+    return records
+
+def _generate_records_for_type(test_type: str, description: str, summary: str, use_cache: bool = True,
+                               on_test_case: Optional[Callable[[str, Dict], None]] = None,
+                               chunk_size: Optional[int] = None) -> Optional[List[Dict]]:
+    """Generate structured test case records for a single test type."""
+    logger.info(f"Starting structured generation for test type: {test_type}")
+    config = get_test_type_config(test_type)
+    if not config:
+        logger.warning(f"Skipping unknown test type: {test_type}")
+        return None
+
+    chunks = plan_chunks(config['count'], chunk_size)
+
+    def generate_chunk(chunk: Tuple[int, int]) -> List[Dict]:
+        chunk_records = _generate_chunk_records(test_type, config, description, summary,
+                                                chunk[0], chunk[1], use_cache)
+        if on_test_case:
+            for record in chunk_records:
+                on_test_case(test_type, record)
+        return chunk_records
+
+    try:
+        records = [record for chunk_records in run_ordered(chunks, generate_chunk) if chunk_records
+                   for record in chunk_records]
+        if not records:
+            logger.warning(f"Received empty response for {test_type} test cases")
+            return None
+
+        if len(chunks) > 1:
+            _renumber_records(records, config['prefix'])
+
+        logger.info(f"Generated {len(records)} {test_type} test case records successfully")
+        return records
+
+    except Exception as e:
+        logger.error(f"Error generating {test_type} test cases: {str(e)}")
+        return None
+
+def _plan_type_groups(selected_types: List[str], token_budget: Optional[int] = None) -> List[List[str]]:
+    """Pack test types into groups whose expected output fits one completion.
+
+    Types are packed in order; a type whose expected output alone exceeds the budget
+    gets a group of its own and is generated with the regular (chunked) requests.
+    """
+    token_budget = GENERATION_COMBINED_MAX_TOKENS if token_budget is None else token_budget
+    groups: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for test_type in selected_types:
+        config = get_test_type_config(test_type)
+        expected_tokens = config.get('count', 0) * GENERATION_TOKENS_PER_TEST_CASE
+        if not config or expected_tokens > token_budget:
+            groups.append([test_type])
+            continue
+        if current and current_tokens + expected_tokens > token_budget:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(test_type)
+        current_tokens += expected_tokens
+    if current:
+        groups.append(current)
+    return groups
+
+def _build_combined_request(test_types: List[str], description: str, summary: str) -> Dict[str, Any]:
+    """Build one chat completion request for several test types with a section per type."""
+    type_lines = []
+    for test_type in test_types:
+        config = get_test_type_config(test_type)
+        type_lines.append(f"TEST TYPE: {test_type} | EXACTLY {config['count']} test cases | "
+                          f"prefix {config['prefix']} | {config['description']}")
+    type_list = "\n    ".join(type_lines)
+
+    prompt = f"""
+    Task Title: {summary}
+    Task Description: {description}
+
+    Generate test cases for each of these test types:
+    {type_list}
+
+    Start the test cases of each test type with a line "TEST TYPE: [test type]" and list only
+    that type's test cases below it.
+
+    For each test case:
+    1. Use the prefix of its test type
+    2. Include detailed steps
+    3. Specify expected results
+    4. Do not mix test types
+
+    {TEXT_FORMAT_INSTRUCTIONS.format(prefix="[Prefix]")}
+    """
+
+    return dict(
+        model=GENERATION_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": "You are a QA engineer. Generate the requested test cases for every test type, each type in its own TEST TYPE section."
+            },
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.7,
+        max_tokens=GENERATION_COMBINED_MAX_TOKENS
+    )
+
+def _generate_type_group(test_types: List[str], description: str, summary: str, use_cache: bool = True,
+                         on_test_case: Optional[Callable[[str, Dict], None]] = None,
+                         chunk_size: Optional[int] = None, telemetry=None) -> Dict[str, Optional[str]]:
+    """Generate a group of test types with one combined completion.
+
+    Types missing from the answer, or cut off by the token limit, are split back
+    into their own requests.
+
+    Returns:
+        Dict[str, Optional[str]]: Per test type, its TEST TYPE section or None on failure
+    """
+    if len(test_types) == 1:
+        test_type = test_types[0]
+        return {test_type: _generate_for_type(test_type, description, summary, use_cache, on_test_case, chunk_size)}
+
+    results: Dict[str, Optional[str]] = {}
+    try:
+        logger.info(f"Sending combined request to OpenAI for {test_types}")
+        response = create_chat_completion(client, use_cache=use_cache,
+                                          **_build_combined_request(test_types, description, summary))
+        sections = extract_test_type_sections(response['content']) if response['content'] else {}
+        # Tolerate decorated section names such as "**dashboard_ui**"
+        sections = {re.sub(r'[^\w]', '', name): text for name, text in sections.items()}
+        # The last section of an answer cut off by the token limit is incomplete
+        incomplete = list(sections)[-1] if sections and response['finish_reason'] == "length" else None
+        for test_type in test_types:
+            text = sections.get(test_type)
+            if not text or test_type == incomplete or 'Title:' not in text:
+                continue
+            results[test_type] = f"TEST TYPE: {test_type}\n\n{text}"
+            if on_test_case:
+                for test_case in parse_traditional_format(text, default_section=test_type):
+                    on_test_case(test_type, test_case)
+    except Exception as e:
+        logger.error(f"Error generating combined test cases for {test_types}: {str(e)}")
+
+    missing = [test_type for test_type in test_types if test_type not in results]
+    if missing:
+        logger.info(f"Combined answer lacks {missing}, requesting them separately")
+        if telemetry:
+            telemetry.record_fallback(len(missing))
+        fallback = run_ordered(
+            missing,
+            lambda test_type: _generate_for_type(test_type, description, summary, use_cache, on_test_case, chunk_size)
+        )
+        results.update(zip(missing, fallback))
+    return results
+
+def generate_test_case(description: str, summary: str = "", selected_types: List[str] = None,
+                       max_workers: Optional[int] = None,
+                       on_type_complete: Optional[Callable[[str, bool], None]] = None,
+                       use_cache: bool = True,
+                       on_test_case: Optional[Callable[[str, Dict], None]] = None,
+                       chunk_size: Optional[int] = None,
+                       combine_types: Optional[bool] = None) -> Optional[str]:
+    """Generate test cases based on user-selected types.
+
+    The per-type requests are issued concurrently (bounded by ``max_workers``) and the
+    output keeps the order of ``selected_types``. In combined mode several types share
+    one completion, so a long description is sent (and paid for) fewer times.
+
+    Args:
+        description (str): Task description
+        summary (str): Task title
+        selected_types (List[str]): Test types to generate
+        max_workers (Optional[int]): Maximum requests in flight, defaults to GENERATION_MAX_WORKERS
+        on_type_complete (Optional[Callable[[str, bool], None]]): Called with (test_type, success)
+            as soon as each type finishes
+        use_cache (bool): Set to False to bypass the LLM response cache
+        on_test_case (Optional[Callable[[str, Dict], None]]): When given, responses are streamed
+            and this is called with (test_type, test_case) for every test case as soon as it
+            has been received in full
+        chunk_size (Optional[int]): Test cases per sub-request, defaults to GENERATION_CHUNK_SIZE
+            (0 requests each type in one go)
+        combine_types (Optional[bool]): Ask for several types per completion, defaults to
+            GENERATION_COMBINE_TYPES
+
+    Returns:
+        Optional[str]: Combined test cases or None if nothing was generated
+    """
     if not description:
         logger.error("No description provided for test case generation")
         return None
@@ -59,75 +593,97 @@ def generate_test_case(description: str, summary: str = "", selected_types: List
     logger.info(f"Generating test cases for types: {selected_types}")
     logger.info(f"Summary: {summary}")
     logger.info(f"Description length: {len(description)} characters")
-    
-    all_test_cases = []
-    
-    for test_type in selected_types:
-        logger.info(f"Starting generation for test type: {test_type}")
-        config = get_test_type_config(test_type)
-        if not config:
-            logger.warning(f"Skipping unknown test type: {test_type}")
-            continue
+    # Cleaned (and for long descriptions condensed) once, shared by every type
+    description = prepare_description(description, use_cache=use_cache)
 
-        prompt = f"""
-        Task Title: {summary}
-        Task Description: {description}
+    def on_complete(test_type: str, result: Optional[str]) -> None:
+        logger.info(f"Completed generation for test type: {test_type}")
+        if on_type_complete:
+            on_type_complete(test_type, bool(result))
 
-        Generate EXACTLY {config['count']} test cases for {config['description']}.
-        
-        For each test case:
-        1. Use the prefix {config['prefix']}
-        2. Focus exclusively on {test_type} scenarios
-        3. Include detailed steps
-        4. Specify expected results
-        5. Do not mix with other test types
-
-        Use this EXACT format for each test case:
-
-        Title: {config['prefix']}_[Number]_[Brief_Title]
-        Scenario: [Detailed scenario description]
-        Steps to reproduce:
-        1. [Step 1]
-        2. [Step 2]
-        ...
-        Expected Result: [What should happen]
-        Actual Result: [To be filled during execution]
-        Priority: [High/Medium/Low]
-        """
-
-        try:
-            logger.info(f"Sending request to OpenAI for {test_type} test cases")
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are a QA engineer. Generate EXACTLY {config['count']} {test_type} test cases. Use {config['prefix']} as the prefix."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=2000
+    combine_types = GENERATION_COMBINE_TYPES if combine_types is None else combine_types
+    combined = combine_types and len(selected_types) > 1
+
+    with track_generation("combined" if combined else "per_type", selected_types) as telemetry:
+        if combined:
+            groups = _plan_type_groups(selected_types)
+            logger.info(f"Combined mode: {len(groups)} completions for {len(selected_types)} types")
+            by_type: Dict[str, Optional[str]] = {}
+
+            def on_group_complete(group: List[str], group_results: Optional[Dict[str, Optional[str]]]) -> None:
+                for test_type in group:
+                    on_complete(test_type, (group_results or {}).get(test_type))
+
+            for group_results in run_ordered(
+                groups,
+                lambda group: _generate_type_group(group, description, summary, use_cache, on_test_case,
+                                                   chunk_size, telemetry),
+                max_workers=max_workers,
+                on_complete=on_group_complete
+            ):
+                by_type.update(group_results or {})
+            results = [by_type.get(test_type) for test_type in selected_types]
+        else:
+            results = run_ordered(
+                selected_types,
+                lambda test_type: _generate_for_type(test_type, description, summary, use_cache, on_test_case, chunk_size),
+                max_workers=max_workers,
+                on_complete=on_complete
             )
-            
-            test_cases = response.choices[0].message.content.strip()
-            if test_cases:
-                logger.info(f"Generated {test_type} test cases successfully")
-                # Add a section header for each test type to help with parsing
-                test_cases_with_header = f"TEST TYPE: {test_type}\n\n{test_cases}"
-                all_test_cases.append(test_cases_with_header)
-            else:
-                logger.warning(f"Received empty response for {test_type} test cases")
-
-        except Exception as e:
-            logger.error(f"Error generating {test_type} test cases: {str(e)}")
-            continue
-        
-        logger.info(f"Completed generation for test type: {test_type}")
+    all_test_cases = [result for result in results if result]
 
     if not all_test_cases:
         logger.error("Failed to generate any test cases")
         return None
         
     logger.info(f"Successfully generated test cases for {len(all_test_cases)} test types")
-    return "\n\n" + "\n\n".join(all_test_cases)
\ No newline at end of file
+    return "\n\n" + "\n\n".join(all_test_cases)
+
+def generate_test_case_records(description: str, summary: str = "", selected_types: List[str] = None,
+                               max_workers: Optional[int] = None,
+                               on_type_complete: Optional[Callable[[str, bool], None]] = None,
+                               use_cache: bool = True,
+                               on_test_case: Optional[Callable[[str, Dict], None]] = None,
+                               chunk_size: Optional[int] = None) -> Optional[List[Dict]]:
+    """Generate test cases in structured output mode.
+
+    Same as ``generate_test_case``, but the model answers with JSON and the result
+    is a list of records ({'Section', 'Title', 'Scenario', 'Steps', 'Expected Result',
+    'Priority'}) that the Excel, TXT and MongoDB writers take without re-parsing.
+    ``on_test_case`` is called for each record once its chunk has been received.
+
+    Returns:
+        Optional[List[Dict]]: Test case records in the order of ``selected_types``, or None
+    """
+    if not description:
+        logger.error("No description provided for test case generation")
+        return None
+        
+    if not selected_types or len(selected_types) == 0:
+        logger.error("No test types selected for test case generation")
+        return None
+
+    logger.info(f"Generating structured test cases for types: {selected_types}")
+    description = prepare_description(description, use_cache=use_cache)
+
+    def on_complete(test_type: str, result: Optional[List[Dict]]) -> None:
+        logger.info(f"Completed generation for test type: {test_type}")
+        if on_type_complete:
+            on_type_complete(test_type, bool(result))
+
+    with track_generation("structured", selected_types):
+        results = run_ordered(
+            selected_types,
+            lambda test_type: _generate_records_for_type(test_type, description, summary, use_cache,
+                                                         on_test_case, chunk_size),
+            max_workers=max_workers,
+            on_complete=on_complete
+        )
+    records = [record for result in results if result for record in result]
+
+    if not records:
+        logger.error("Failed to generate any test cases")
+        return None
+
+    logger.info(f"Successfully generated {len(records)} structured test cases")
+    return records
@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from io import BytesIO
+from typing import Optional
+import base64
+import logging
+import mimetypes
+import os
+
+from PIL import Image, ImageOps
+
+from config.settings import IMAGE_MAX_EDGE, IMAGE_QUALITY, IMAGE_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Formats accepted by the OpenAI vision models
+SUPPORTED_MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "WEBP": "image/webp",
+    "GIF": "image/gif"
+}
+
+# EXIF tag holding the camera orientation
+EXIF_ORIENTATION = 0x0112
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    """An image ready to be embedded in a vision request."""
+    mime_type: str
+    base64_data: str
+    width: int
+    height: int
+    original_bytes: int
+    encoded_bytes: int
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime_type};base64,{self.base64_data}"
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+
+
+def _encode(image: Image.Image, image_format: str, quality: int) -> bytes:
+    buffer = BytesIO()
+    if image_format == "PNG":
+        image.save(buffer, format="PNG", optimize=True)
+    else:
+        image.convert("RGB").save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def _prepare(image_path: str, max_edge: int, quality: int) -> PreparedImage:
+    with open(image_path, "rb") as f:
+        original = f.read()
+
+    try:
+        with Image.open(BytesIO(original)) as image:
+            source_format = image.format
+            # Respect the camera orientation before measuring and resizing
+            rotated = image.getexif().get(EXIF_ORIENTATION, 1) != 1
+            image = ImageOps.exif_transpose(image)
+            resized = max_edge > 0 and max(image.size) > max_edge
+            if resized:
+                image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+            # Screenshots with transparency stay PNG, everything else becomes JPEG
+            output_format = "PNG" if _has_alpha(image) else "JPEG"
+            data = _encode(image, output_format, quality)
+            mime_type = SUPPORTED_MIME_TYPES[output_format]
+            width, height = image.size
+
+            # A small original in a supported format may already be the cheaper upload,
+            # unless its pixels still have to be rotated into the camera orientation
+            if not resized and not rotated and source_format in SUPPORTED_MIME_TYPES and len(original) <= len(data):
+                data = original
+                mime_type = SUPPORTED_MIME_TYPES[source_format]
+    except Exception as e:
+        # Not decodable by Pillow: send the file as it is and let the API judge it
+        logger.warning(f"Could not decode image {image_path}, sending it unchanged: {str(e)}")
+        data = original
+        mime_type = mimetypes.guess_type(image_path)[0] or "image/jpeg"
+        width = height = 0
+
+    return PreparedImage(
+        mime_type=mime_type,
+        base64_data=base64.b64encode(data).decode("utf-8"),
+        width=width,
+        height=height,
+        original_bytes=len(original),
+        encoded_bytes=len(data)
+    )
+
+
+@lru_cache(maxsize=IMAGE_CACHE_SIZE)
+def _prepare_cached(image_path: str, modified_ns: int, size: int, max_edge: int, quality: int) -> PreparedImage:
+    return _prepare(image_path, max_edge, quality)
+
+
+def prepare_image(image_path: str, max_edge: int = IMAGE_MAX_EDGE, quality: int = IMAGE_QUALITY) -> Optional[PreparedImage]:
+    """Decode, downscale and recompress an image once for all vision requests on it.
+
+    Args:
+        image_path (str): Path of the uploaded image
+        max_edge (int): Longest edge in pixels after downscaling (0 keeps the original size)
+        quality (int): JPEG quality used when recompressing
+
+    Returns:
+        Optional[PreparedImage]: The encoded image with its MIME type, or None if it cannot be read
+    """
+    try:
+        stat = os.stat(image_path)
+        prepared = _prepare_cached(os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size, max_edge, quality)
+    except Exception as e:
+        logger.error(f"Error preparing image {image_path}: {e}")
+        return None
+
+    logger.info(f"Prepared image {image_path}: {prepared.width}x{prepared.height} {prepared.mime_type}, "
+                f"{prepared.original_bytes} -> {prepared.encoded_bytes} bytes")
+    return prepared
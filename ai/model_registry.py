@@ -0,0 +1,123 @@
+from threading import Lock
+from typing import Any, Dict, List
+import hashlib
+import logging
+import time
+
+import openai
+
+from config.settings import VISION_MODEL_RETRY_AFTER
+
+logger = logging.getLogger(__name__)
+
+# Error classes that say the model itself cannot be used with this account
+MODEL_UNAVAILABLE_ERRORS = ("model_not_found", "permission_denied")
+
+
+def account_key(client) -> str:
+    """Identify the account behind a client without keeping its API key."""
+    api_key = getattr(client, "api_key", None)
+    if not api_key:
+        return type(client).__name__
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+def classify_error(error: Exception) -> str:
+    """Reduce an API error to the class the registry remembers."""
+    message = str(error).lower()
+    if isinstance(error, openai.NotFoundError) or "model_not_found" in message or "does not exist" in message:
+        return "model_not_found"
+    if isinstance(error, openai.PermissionDeniedError):
+        return "permission_denied"
+    if isinstance(error, openai.AuthenticationError) or "api key" in message or "authorization" in message:
+        return "authentication"
+    if isinstance(error, openai.RateLimitError):
+        return "rate_limited"
+    return "other"
+
+
+class ModelRegistry:
+    """Remembers which models work for which account.
+
+    A model that failed with an error class from MODEL_UNAVAILABLE_ERRORS is skipped
+    for ``retry_after`` seconds, after which it is probed again. A model that
+    answered is tried first from then on.
+    """
+
+    def __init__(self, retry_after: int = VISION_MODEL_RETRY_AFTER):
+        self.retry_after = retry_after
+        self._lock = Lock()
+        self._models: Dict[tuple, Dict[str, Any]] = {}
+        self._stats = {"skipped": 0, "probes": 0}
+
+    def order(self, account: str, models: List[str]) -> List[str]:
+        """Return ``models`` in the order they should be tried for ``account``.
+
+        Working models come first and models known to be unavailable are left
+        out, unless every model is unavailable, in which case all are tried.
+        """
+        now = time.time()
+        working, unknown, unavailable = [], [], []
+        with self._lock:
+            for model in models:
+                state = self._models.get((account, model))
+                if state is None:
+                    unknown.append(model)
+                elif state["status"] == "available":
+                    working.append(model)
+                elif now - state["checked_at"] >= self.retry_after:
+                    unknown.append(model)
+                    self._stats["probes"] += 1
+                else:
+                    unavailable.append(model)
+            if working or unknown:
+                self._stats["skipped"] += len(unavailable)
+                return working + unknown
+        return models
+
+    def mark_available(self, account: str, model: str) -> None:
+        with self._lock:
+            state = self._models.get((account, model))
+            if state and state["status"] == "available":
+                state["checked_at"] = time.time()
+                return
+            self._models[(account, model)] = {"status": "available", "error_class": None,
+                                              "checked_at": time.time(), "failures": 0}
+        logger.info(f"Model {model} is available")
+
+    def mark_failed(self, account: str, model: str, error: Exception) -> str:
+        """Record a failed call; returns the error class.
+
+        Only errors that mean the model cannot be used mark it unavailable;
+        transient failures leave its state unchanged.
+        """
+        error_class = classify_error(error)
+        if error_class not in MODEL_UNAVAILABLE_ERRORS:
+            return error_class
+        with self._lock:
+            previous = self._models.get((account, model)) or {}
+            self._models[(account, model)] = {
+                "status": "unavailable",
+                "error_class": error_class,
+                "checked_at": time.time(),
+                "failures": previous.get("failures", 0) + 1
+            }
+        logger.warning(f"Model {model} is unavailable ({error_class}), skipping it for {self.retry_after}s")
+        return error_class
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Registry state for diagnostics."""
+        now = time.time()
+        with self._lock:
+            models = []
+            for (account, model), state in self._models.items():
+                entry = {"account": account, "model": model, **state,
+                         "age_seconds": round(now - state["checked_at"], 1)}
+                if state["status"] == "unavailable":
+                    entry["retry_in_seconds"] = round(max(0.0, self.retry_after - (now - state["checked_at"])), 1)
+                models.append(entry)
+            return {"retry_after": self.retry_after, **self._stats, "models": models}
+
+
+# Shared registry of vision model availability
+vision_models = ModelRegistry()
@@ -0,0 +1,217 @@
+"""Clean-up and condensing of Jira/Azure descriptions before they go into prompts."""
+from typing import List, Optional, Tuple
+import logging
+import re
+
+from config.settings import (
+    DESCRIPTION_PREPROCESSING, DESCRIPTION_DIGEST_THRESHOLD, DESCRIPTION_DIGEST_TOKENS,
+    DESCRIPTION_DIGEST_MODEL, DESCRIPTION_MAX_TOKENS, DESCRIPTION_LOG_LINES
+)
+from ai.backends import get_llm_client
+from ai.completion import create_chat_completion
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")
+except Exception:  # tiktoken is optional
+    _encoding = None
+
+# Lines that look like log output or stack trace frames
+_LOG_LINE = re.compile(
+    r"^\s*(?:\[?\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}"
+    r"|at [\w.$<>]+\(.*\)$"
+    r"|(?:DEBUG|INFO|WARN|WARNING|ERROR|TRACE|FATAL)\b"
+    r"|File \".*\", line \d+"
+    r"|Traceback \(most recent call last\))"
+)
+# Table borders and other lines made only of separators
+_SEPARATOR_LINE = re.compile(r"^[\s|+\-=_:*#~]+$")
+# Code/log fences in Markdown and Jira wiki markup
+_FENCE = re.compile(r"^\s*(?:```|\{code(?::[^}]*)?\}|\{noformat\})")
+
+
+def count_tokens(text: str) -> int:
+    """Count prompt tokens with tiktoken when installed, otherwise estimate four characters per token."""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return len(text) // 4
+
+
+def _is_log_block(block: List[str]) -> bool:
+    """A fenced block is treated as log output when at least half of its lines look like log lines."""
+    lines = [line for line in block if line]
+    return bool(lines) and sum(1 for line in lines if _LOG_LINE.match(line)) * 2 >= len(lines)
+
+
+def _squash(line: str) -> str:
+    return re.sub(r"[ \t ]+", " ", line).strip()
+
+
+def _collapse_blocks(lines: List[str], keep: int) -> List[Tuple[str, bool]]:
+    """Shorten logs and stack traces (fenced or not) to their first ``keep`` lines.
+
+    Fenced blocks that do not look like logs (JSON payloads, code samples) are kept
+    verbatim, fences included.
+
+    Returns:
+        List[Tuple[str, bool]]: The lines, each with whether it must be kept verbatim
+    """
+    result: List[Tuple[str, bool]] = []
+    block: List[str] = []
+    in_fence = False
+    fence = ""
+
+    def flush_log():
+        result.extend((_squash(line), False) for line in block[:keep])
+        if len(block) > keep:
+            result.append((f"[... {len(block) - keep} lines omitted]", False))
+        block.clear()
+
+    def flush_fenced(closing: Optional[str]):
+        if _is_log_block([_squash(line) for line in block]):
+            flush_log()
+            return
+        result.append((fence, True))
+        result.extend((line, True) for line in block)
+        if closing is not None:
+            result.append((closing, True))
+        block.clear()
+
+    for line in lines:
+        if _FENCE.match(line):
+            if in_fence:
+                flush_fenced(line)
+            else:
+                if block:
+                    flush_log()
+                fence = line
+            in_fence = not in_fence
+            continue
+        if in_fence or _LOG_LINE.match(line):
+            block.append(line)
+            continue
+        if block:
+            flush_log()
+        result.append((_squash(line), False))
+    if in_fence:
+        flush_fenced(None)  # Unterminated fence
+    elif block:
+        flush_log()
+    return result
+
+
+def normalize_description(text: str, log_lines: int = DESCRIPTION_LOG_LINES) -> str:
+    """Normalise whitespace and drop noise from a description.
+
+    Pasted logs and stack traces are cut to ``log_lines`` lines, table borders and
+    consecutive duplicate lines are dropped and runs of blank lines are collapsed.
+    Lines repeated elsewhere (e.g. shared Given/When/Then steps) and fenced code are kept.
+    """
+    lines = _collapse_blocks(text.replace("\r\n", "\n").split("\n"), log_lines)
+
+    cleaned: List[str] = []
+    for line, verbatim in lines:
+        if verbatim:
+            cleaned.append(line)
+            continue
+        if line and _SEPARATOR_LINE.match(line):
+            continue
+        # Pasted twice in a row
+        if line and cleaned and cleaned[-1] == line:
+            continue
+        if not line and (not cleaned or not cleaned[-1]):
+            continue
+        cleaned.append(line)
+    return "\n".join(cleaned).strip()
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut a text to roughly ``max_tokens`` tokens at a line boundary."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    kept: List[str] = []
+    used = 0
+    for line in text.split("\n"):
+        line_tokens = count_tokens(line) + 1
+        if used + line_tokens > max_tokens:
+            break
+        kept.append(line)
+        used += line_tokens
+    return "\n".join(kept) + "\n[... description truncated]"
+
+
+def _build_digest_request(text: str) -> dict:
+    return dict(
+        model=DESCRIPTION_DIGEST_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": "You condense software requirements for QA engineers without losing testable details."
+            },
+            {
+                "role": "user",
+                "content": (
+                    "Condense the following task description for test case generation. Keep every requirement, "
+                    "acceptance criterion, field, validation rule, limit, role, error message and workflow step. "
+                    "Drop logs, greetings, repeated boilerplate and anything that cannot be tested. "
+                    "Answer with the condensed description only.\n\n" + text
+                )
+            }
+        ],
+        temperature=0,
+        max_tokens=DESCRIPTION_DIGEST_TOKENS
+    )
+
+
+def _digest(text: str, use_cache: bool = True) -> Optional[str]:
+    """Condense a long description; successful digests are reused through the LLM response cache."""
+    try:
+        response = create_chat_completion(get_llm_client(), use_cache=use_cache, **_build_digest_request(text))
+    except Exception as e:
+        logger.error(f"Error condensing description: {str(e)}")
+        return None
+    if not response["content"] or response["finish_reason"] == "length":
+        return None
+    return response["content"]
+
+
+def prepare_description(description: str, digest_threshold: Optional[int] = None, use_cache: bool = True) -> str:
+    """Prepare a description for the generation prompts.
+
+    The description is normalised; when it is still longer than ``digest_threshold``
+    tokens it is replaced by a condensed digest, which the response cache shares
+    between every type and every regeneration. If no digest can be made it is
+    trimmed to DESCRIPTION_MAX_TOKENS instead.
+
+    Args:
+        description (str): Raw Jira/Azure description
+        digest_threshold (Optional[int]): Token count above which a digest is made,
+            defaults to DESCRIPTION_DIGEST_THRESHOLD
+        use_cache (bool): Set to False to bypass the response cache for the digest
+
+    Returns:
+        str: The description to put into prompts
+    """
+    if not DESCRIPTION_PREPROCESSING or not isinstance(description, str) or not description:
+        return description
+
+    threshold = DESCRIPTION_DIGEST_THRESHOLD if digest_threshold is None else digest_threshold
+    original_tokens = count_tokens(description)
+    prepared = normalize_description(description)
+    tokens = count_tokens(prepared)
+
+    if tokens > threshold:
+        digest = _digest(prepared, use_cache)
+        if digest:
+            prepared = digest
+        else:
+            logger.warning("No digest available, trimming the description instead")
+            prepared = trim_to_tokens(prepared, DESCRIPTION_MAX_TOKENS)
+
+    if prepared != description:
+        logger.info(f"Prepared description: {original_tokens} -> {count_tokens(prepared)} tokens")
+    return prepared
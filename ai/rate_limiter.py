@@ -0,0 +1,333 @@
+from threading import Condition
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, TypeVar
+import asyncio
+import logging
+import random
+import re
+import time
+
+import openai
+
+from config.settings import (
+    OPENAI_REQUESTS_PER_MINUTE, OPENAI_TOKENS_PER_MINUTE, RATE_LIMIT_HEADROOM,
+    OPENAI_MAX_RETRIES, OPENAI_BACKOFF_BASE, OPENAI_BACKOFF_MAX
+)
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+# Errors worth retrying: rate limits, timeouts/connection drops and server-side failures
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+# Rough cost of one image in a vision request, in tokens
+IMAGE_TOKEN_ESTIMATE = 1000
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse an OpenAI reset header such as '1s', '6m0s' or '20ms' into seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def estimate_prompt_tokens(request: Dict[str, Any]) -> int:
+    """Estimate the prompt tokens of a chat completion request at four characters per token."""
+    characters = 0
+    images = 0
+    for message in request.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, str):
+            characters += len(content)
+        elif isinstance(content, list):
+            for part in content:
+                if part.get("type") == "text":
+                    characters += len(part.get("text", ""))
+                else:
+                    images += 1
+    return characters // 4 + images * IMAGE_TOKEN_ESTIMATE
+
+
+def estimate_tokens(request: Dict[str, Any]) -> int:
+    """Estimate the tokens a chat completion request counts against the budget.
+
+    OpenAI reserves the prompt size plus ``max_tokens`` when a request is accepted,
+    so that is what we budget.
+    """
+    return estimate_prompt_tokens(request) + int(request.get("max_tokens") or 0)
+
+
+class _Budget:
+    """Continuously refilling allowance of requests or tokens per minute."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+        self.updated_at = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def refill(self, now: float) -> None:
+        if self.enabled:
+            self.available = min(self.capacity, self.available + (now - self.updated_at) * self.capacity / 60)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        if not self.enabled:
+            return 0.0
+        # A request larger than the whole budget only has to wait for a full bucket
+        missing = min(amount, self.capacity) - self.available
+        return max(0.0, missing * 60 / self.capacity)
+
+
+class RateLimiter:
+    """Process-wide request and token budget shared by every OpenAI caller.
+
+    Callers wait in ``acquire`` until both budgets cover their request. Remaining
+    quota reported in the rate limit response headers corrects the local estimate,
+    and a 429 pauses every caller until the reported reset time.
+    """
+
+    def __init__(self, requests_per_minute: int = OPENAI_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: int = OPENAI_TOKENS_PER_MINUTE,
+                 headroom: float = RATE_LIMIT_HEADROOM, max_retries: int = OPENAI_MAX_RETRIES,
+                 backoff_base: float = OPENAI_BACKOFF_BASE, backoff_max: float = OPENAI_BACKOFF_MAX):
+        self.headroom = headroom
+        self.requests = _Budget(int(requests_per_minute * headroom))
+        self.tokens = _Budget(int(tokens_per_minute * headroom))
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._condition = Condition()
+        self._paused_until = 0.0
+        self._waiting = 0
+        self._in_flight = 0
+        self._stats = {"requests": 0, "throttled": 0, "retries": 0, "failures": 0, "wait_seconds": 0.0}
+
+    def _try_reserve(self, tokens: int) -> float:
+        """Reserve the request and ``tokens`` if they fit now; otherwise return the seconds to wait.
+
+        Must be called with the condition held.
+        """
+        now = time.monotonic()
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        wait = max(self._paused_until - now, self.requests.wait_time(1), self.tokens.wait_time(tokens))
+        if wait > 0:
+            return wait
+        self.requests.available -= 1
+        self.tokens.available -= min(tokens, self.tokens.capacity) if self.tokens.enabled else 0
+        self._in_flight += 1
+        self._stats["requests"] += 1
+        return 0.0
+
+    def acquire(self, tokens: int) -> None:
+        """Block until the request and ``tokens`` fit in the budget, then reserve them."""
+        started = time.monotonic()
+        with self._condition:
+            self._waiting += 1
+            try:
+                while True:
+                    wait = self._try_reserve(tokens)
+                    if wait <= 0:
+                        break
+                    self._condition.wait(timeout=wait)
+                self._stats["wait_seconds"] += time.monotonic() - started
+            finally:
+                self._waiting -= 1
+
+    async def acquire_async(self, tokens: int) -> None:
+        """Like ``acquire``, but waits on the event loop instead of blocking the thread."""
+        started = time.monotonic()
+        with self._condition:
+            self._waiting += 1
+        try:
+            while True:
+                with self._condition:
+                    wait = self._try_reserve(tokens)
+                    if wait <= 0:
+                        self._stats["wait_seconds"] += time.monotonic() - started
+                        return
+                # Re-check at least every second, since a release may free the budget early
+                await asyncio.sleep(min(wait, 1.0))
+        finally:
+            with self._condition:
+                self._waiting -= 1
+
+    def release(self, reserved_tokens: int, used_tokens: Optional[int] = None) -> None:
+        """Finish a request, refunding the part of the reservation it did not use."""
+        with self._condition:
+            self._in_flight -= 1
+            if used_tokens is not None and self.tokens.enabled:
+                refund = min(reserved_tokens, self.tokens.capacity) - used_tokens
+                self.tokens.available = min(self.tokens.capacity, self.tokens.available + refund)
+            self._condition.notify_all()
+
+    def update_from_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """Align the local budgets with the x-ratelimit-* headers of a response."""
+        if not headers:
+            return
+        with self._condition:
+            now = time.monotonic()
+            for budget, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+                if not budget.enabled:
+                    continue
+                try:
+                    limit = headers.get(f"x-ratelimit-limit-{kind}")
+                    remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+                    full_limit = float(limit) if limit is not None else budget.capacity / self.headroom
+                    budget.refill(now)
+                    if limit is not None:
+                        # Follow the reported limit both ways (it differs per model and changes with the tier)
+                        budget.capacity = full_limit * self.headroom
+                        budget.available = min(budget.available, budget.capacity)
+                    if remaining is not None:
+                        # Other processes share the quota, so trust the server when it reports less
+                        reported = float(remaining) - full_limit * (1 - self.headroom)
+                        budget.available = max(0.0, min(budget.available, reported))
+                except ValueError:
+                    continue
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for ``seconds`` (after a 429)."""
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._condition.notify_all()
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Jittered exponential backoff, never shorter than the server's retry-after."""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
+
+    def call(self, request: Dict[str, Any], send: Callable[[], Any],
+             on_response: Optional[Callable[[Any], Any]] = None) -> Any:
+        """Send a request within the budget, retrying rate limits and transient errors.
+
+        Args:
+            request (Dict[str, Any]): Chat completion arguments, used to estimate its tokens
+            send (Callable[[], Any]): Performs the request; returns the raw response
+            on_response (Optional[Callable[[Any], Any]]): Turns the raw response into the result
+
+        Returns:
+            Any: The result of ``on_response`` (or the raw response)
+        """
+        tokens = estimate_tokens(request)
+        attempt = 0
+        while True:
+            self.acquire(tokens)
+            used_tokens = None
+            try:
+                response = send()
+                self.update_from_headers(getattr(response, "headers", None))
+                result = on_response(response) if on_response else response
+                usage = getattr(result, "usage", None)
+                used_tokens = getattr(usage, "total_tokens", None)
+                return result
+            except RETRYABLE_ERRORS as e:
+                headers = getattr(getattr(e, "response", None), "headers", None)
+                self.update_from_headers(headers)
+                if attempt >= self.max_retries:
+                    with self._condition:
+                        self._stats["failures"] += 1
+                    logger.error(f"Giving up on {request.get('model')} request after {attempt + 1} attempts: {str(e)}")
+                    raise
+                delay = self.backoff_delay(attempt, self._retry_after(headers))
+                with self._condition:
+                    self._stats["retries"] += 1
+                    if isinstance(e, openai.RateLimitError):
+                        self._stats["throttled"] += 1
+                if isinstance(e, openai.RateLimitError):
+                    self.pause(delay)
+                logger.warning(f"{type(e).__name__} on {request.get('model')} request, retrying in {delay:.1f}s")
+                attempt += 1
+                if not isinstance(e, openai.RateLimitError):
+                    time.sleep(delay)
+            finally:
+                self.release(tokens, used_tokens)
+
+    async def call_async(self, request: Dict[str, Any], send: Callable[[], Awaitable[Any]],
+                         on_response: Optional[Callable[[Any], Any]] = None) -> Any:
+        """Async version of ``call``; ``send`` returns an awaitable of the raw response."""
+        tokens = estimate_tokens(request)
+        attempt = 0
+        while True:
+            await self.acquire_async(tokens)
+            used_tokens = None
+            try:
+                response = await send()
+                self.update_from_headers(getattr(response, "headers", None))
+                result = on_response(response) if on_response else response
+                usage = getattr(result, "usage", None)
+                used_tokens = getattr(usage, "total_tokens", None)
+                return result
+            except RETRYABLE_ERRORS as e:
+                headers = getattr(getattr(e, "response", None), "headers", None)
+                self.update_from_headers(headers)
+                if attempt >= self.max_retries:
+                    with self._condition:
+                        self._stats["failures"] += 1
+                    logger.error(f"Giving up on {request.get('model')} request after {attempt + 1} attempts: {str(e)}")
+                    raise
+                delay = self.backoff_delay(attempt, self._retry_after(headers))
+                with self._condition:
+                    self._stats["retries"] += 1
+                    if isinstance(e, openai.RateLimitError):
+                        self._stats["throttled"] += 1
+                if isinstance(e, openai.RateLimitError):
+                    self.pause(delay)
+                logger.warning(f"{type(e).__name__} on {request.get('model')} request, retrying in {delay:.1f}s")
+                attempt += 1
+                if not isinstance(e, openai.RateLimitError):
+                    await asyncio.sleep(delay)
+            finally:
+                self.release(tokens, used_tokens)
+
+    @staticmethod
+    def _retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+        if not headers:
+            return None
+        if headers.get("retry-after-ms"):
+            try:
+                return float(headers["retry-after-ms"]) / 1000
+            except ValueError:
+                pass
+        for name in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+            seconds = parse_reset_duration(headers.get(name))
+            if seconds is not None:
+                return seconds
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            return {
+                **self._stats,
+                "queue_depth": self._waiting,
+                "in_flight": self._in_flight,
+                "paused_for": max(0.0, self._paused_until - now),
+                "requests_per_minute": self.requests.capacity,
+                "tokens_per_minute": self.tokens.capacity,
+                "requests_available": self.requests.available,
+                "tokens_available": self.tokens.available
+            }
+
+
+# Shared limiter for every OpenAI caller in the process
+rate_limiter = RateLimiter()
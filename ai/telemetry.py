@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationTelemetry:
+    """Token and latency counters of one generation request."""
+
+    def __init__(self, mode: str, selected_types: List[str]):
+        self.mode = mode
+        self.selected_types = list(selected_types)
+        self.started_at = time.monotonic()
+        self._lock = Lock()
+        self.counters = {"requests": 0, "cached_requests": 0, "prompt_tokens": 0,
+                         "completion_tokens": 0, "fallback_types": 0}
+
+    def record_completion(self, prompt_tokens: int, completion_tokens: int, cached: bool) -> None:
+        with self._lock:
+            if cached:
+                self.counters["cached_requests"] += 1
+                return
+            self.counters["requests"] += 1
+            self.counters["prompt_tokens"] += prompt_tokens
+            self.counters["completion_tokens"] += completion_tokens
+
+    def record_fallback(self, count: int = 1) -> None:
+        with self._lock:
+            self.counters["fallback_types"] += count
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "types": len(self.selected_types),
+                **self.counters,
+                "elapsed_seconds": round(time.monotonic() - self.started_at, 3)
+            }
+
+
+class TelemetryStore:
+    """Process-wide totals per generation mode, for comparing modes side by side."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._modes: Dict[str, Dict[str, float]] = {}
+
+    def add(self, summary: Dict[str, Any]) -> None:
+        with self._lock:
+            totals = self._modes.setdefault(summary["mode"], {
+                "generations": 0, "types": 0, "requests": 0, "cached_requests": 0,
+                "prompt_tokens": 0, "completion_tokens": 0, "fallback_types": 0, "elapsed_seconds": 0.0
+            })
+            totals["generations"] += 1
+            for key in totals:
+                if key != "generations":
+                    totals[key] += summary.get(key, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {}
+            for mode, totals in self._modes.items():
+                types = totals["types"] or 1
+                stats[mode] = {
+                    **totals,
+                    "elapsed_seconds": round(totals["elapsed_seconds"], 3),
+                    "requests_per_type": round(totals["requests"] / types, 3),
+                    "prompt_tokens_per_type": round(totals["prompt_tokens"] / types, 1),
+                    "completion_tokens_per_type": round(totals["completion_tokens"] / types, 1),
+                    "seconds_per_generation": round(totals["elapsed_seconds"] / totals["generations"], 3)
+                }
+            return stats
+
+
+telemetry_store = TelemetryStore()
+
+_current: ContextVar[Optional[GenerationTelemetry]] = ContextVar("generation_telemetry", default=None)
+
+
+def current_telemetry() -> Optional[GenerationTelemetry]:
+    """Telemetry collector of the generation running in this context, if any."""
+    return _current.get()
+
+
+@contextmanager
+def track_generation(mode: str, selected_types: List[str]) -> Iterator[GenerationTelemetry]:
+    """Collect the completions made inside the block and add them to ``telemetry_store``."""
+    telemetry = GenerationTelemetry(mode, selected_types)
+    token = _current.set(telemetry)
+    try:
+        yield telemetry
+    finally:
+        _current.reset(token)
+        summary = telemetry.summary()
+        telemetry_store.add(summary)
+        logger.info(f"Generation telemetry: {summary}")
@@ -1,16 +1,29 @@
-from flask import Flask, request, jsonify, send_file, render_template, after_this_request
+from flask import Flask, request, jsonify, send_file, render_template, after_this_request, Response, stream_with_context
 from flask_cors import CORS
-from jira.jira_client import fetch_issue
-from azure_integration.azure_client import AzureClient
-from ai.generator import generate_test_case
-from utils.file_handler import save_test_script, save_excel_report
+from ai.generator import generate_test_case, generate_test_case_records, GENERATION_MODEL, PROMPT_VERSION
+from ai.cache import get_response_cache
+from ai.rate_limiter import rate_limiter
+from ai.telemetry import telemetry_store
+from utils.file_handler import save_test_script, save_excel_report, save_item_files, format_test_cases_for_storage
+from utils.sources import fetch_source_item, iter_source_items, iter_query_items, QuerySourceError
+from utils.source_cache import source_cache
+from utils.item_pipeline import ItemPipeline
+from utils.event_stream import event_broker
+from utils.job_manager import JobManager, JOB_QUEUED, JOB_RUNNING, JOB_FAILED
+from utils.progress import ProgressTracker
+from utils.image_index import ImageHashIndex
+from utils.generation_index import GenerationIndex, compute_input_hash, combine_hashes
+from config.settings import (
+    IMAGE_DEDUP_ENABLED, GENERATION_STRUCTURED_OUTPUT, GENERATION_COMBINE_TYPES, GENERATION_INCREMENTAL,
+    QUERY_MAX_ITEMS
+)
 import os
 import json
 import logging
 # Add at the top of the file
 from utils.mongo_handler import MongoHandler
 import datetime
-import math
+import uuid
 
 app = Flask(__name__)
 CORS(app)
@@ -28,350 +41,484 @@ def results():
     return render_template('results.html')
 
 
-# Add at the top of the file with other imports
-from threading import Lock
+def finish_stream(stream_id, event, data):
+    """Publish the final event of a generation stream and close it"""
+    event_broker.publish(stream_id, event, data)
+    event_broker.close(stream_id)
 
-# Add after app initialization
-generation_status = {
-    'is_generating': False,
-    'completed_types': set(),
-    'total_types': set(),
-    'lock': Lock()
-}
+def is_truthy(value):
+    """Interpret a JSON or form flag such as bypassCache"""
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
 
 # Modify the generate endpoint
-@app.route('/api/generate', methods=['POST'])
-def generate():
-    try:
-        data = request.json if request.is_json else request.form
-        
-        # Get test case types with proper fallback
-        selected_types = []
-        if request.is_json:
-            selected_types = data.get('testCaseTypes[]', data.get('testCaseTypes', []))
-        else:
-            selected_types = data.getlist('testCaseTypes[]')
-            
-        # Ensure selected_types is always a list
-        if isinstance(selected_types, str):
-            selected_types = [selected_types]
-            
-        # Validate test case types
-        if not selected_types:
-            return jsonify({'error': 'Please select at least one test case type'}), 400
+def parse_generation_request():
+    """Read and validate a generation request.
 
-        # Update generation status
-        with generation_status['lock']:
-            generation_status['is_generating'] = True
-            generation_status['completed_types'] = set()
-            generation_status['total_types'] = set(selected_types)
+    Uploaded images are stored right away so the request can be processed
+    outside the HTTP request (e.g. by a job worker).
 
-        # Log the request for debugging
-        logger.info(f"Generation request - Types: {selected_types}")
+    Returns:
+        tuple: (params, None) on success or (None, (error_body, status_code))
+    """
+    data = request.json if request.is_json else request.form
+    
+    # Get test case types with proper fallback
+    selected_types = []
+    if request.is_json:
+        selected_types = data.get('testCaseTypes[]', data.get('testCaseTypes', []))
+    else:
+        selected_types = data.getlist('testCaseTypes[]')
         
-        source_type = request.form.get('sourceType') if request.form else request.json.get('sourceType')
+    # Ensure selected_types is always a list
+    if isinstance(selected_types, str):
+        selected_types = [selected_types]
         
-        if source_type == 'image':
-            # Handle image upload
-            if 'imageFile' not in request.files:
-                return jsonify({'error': 'No image file uploaded'}), 400
-                
-            image_file = request.files['imageFile']
-            if image_file.filename == '':
-                return jsonify({'error': 'No selected file'}), 400
-                
-            # Create unique identifier for the image
-            import uuid
-            import datetime
-            unique_id = f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
-            
-            # Save the uploaded image in a permanent storage
-            image_storage = os.path.join(os.path.dirname(__file__), 'tests', 'images')
-            os.makedirs(image_storage, exist_ok=True)
-            
-            # Get file extension
-            file_ext = os.path.splitext(image_file.filename)[1]
-            stored_filename = f"image_{unique_id}{file_ext}"
-            image_path = os.path.join(image_storage, stored_filename)
+    # Validate test case types
+    if not selected_types:
+        return None, ({'error': 'Please select at least one test case type'}, 400)
+
+    # Log the request for debugging
+    logger.info(f"Generation request - Types: {selected_types}")
+
+    params = {
+        'source_type': data.get('sourceType', 'jira'),
+        'selected_types': selected_types,
+        # Optional id of the Server-Sent Events stream receiving live output
+        'stream_id': data.get('streamId'),
+        # Id used to query /api/generation-status for this request
+        'progress_id': data.get('requestId') or str(uuid.uuid4()),
+        'bypass_cache': is_truthy(data.get('bypassCache')),
+        # Request JSON test case records instead of free text (Jira/Azure only)
+        'structured_output': is_truthy(data.get('structuredOutput', GENERATION_STRUCTURED_OUTPUT)),
+        # Ask for several test types per completion (text mode only)
+        'combine_types': is_truthy(data.get('combineTypes', GENERATION_COMBINE_TYPES)),
+        # Reuse results of items whose inputs are unchanged since their last generation
+        'incremental': is_truthy(data.get('incremental', GENERATION_INCREMENTAL))
+    }
+    
+    if params['source_type'] == 'image':
+        # Handle image upload
+        if 'imageFile' not in request.files:
+            return None, ({'error': 'No image file uploaded'}, 400)
             
-            # Save the image
-            image_file.save(image_path)
+        image_file = request.files['imageFile']
+        if image_file.filename == '':
+            return None, ({'error': 'No selected file'}, 400)
             
+        # Create unique identifier for the image
+        unique_id = f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+        
+        # Save the uploaded image in a permanent storage
+        image_storage = os.path.join(os.path.dirname(__file__), 'tests', 'images')
+        os.makedirs(image_storage, exist_ok=True)
+        
+        # Get file extension
+        file_ext = os.path.splitext(image_file.filename)[1]
+        stored_filename = f"image_{unique_id}{file_ext}"
+        image_path = os.path.join(image_storage, stored_filename)
+        
+        # Save the image
+        image_file.save(image_path)
+        
+        params['image_path'] = image_path
+        params['unique_id'] = unique_id
+    else:
+        item_ids = data.get('itemId', [])
+        if isinstance(item_ids, str):
+            item_ids = [item_ids]
+        # Drop duplicate IDs while keeping the submitted order
+        params['item_ids'] = list(dict.fromkeys(item_ids))
+        params['jira_config'] = data.get('jira_config')
+        params['azure_config'] = data.get('azure_config')
+        # A JQL (Jira) or WIQL (Azure) query whose results are generated as they are paged in
+        params['query'] = (data.get('query') or '').strip() or None
+        if params['query']:
+            if params['source_type'] not in ('jira', 'azure'):
+                return None, ({'error': f"Queries are not supported for source type {params['source_type']}"}, 400)
             try:
-                # Import the image generator
-                from ai.image_generator import generate_test_case_from_image
-                
-                # Get selected test case types
-                selected_types = request.form.getlist('testCaseTypes[]')
-                if not selected_types:
-                    os.remove(image_path)  # Clean up if validation fails
-                    # Reset the generation status
-                    with generation_status['lock']:
-                        generation_status['is_generating'] = False
-                    return jsonify({'error': 'Please select at least one test case type'}), 400
-                
-                # Generate test cases from image - one type at a time
-                test_cases = None
-                all_types_processed = True
-                error_messages = []
-                
-                for test_type in selected_types:
-                    try:
-                        # Generate one type at a time
-                        logger.info(f"Generating {test_type} test cases from image")
-                        type_test_case = generate_test_case_from_image(
-                            image_path,
-                            selected_types=[test_type]
-                        )
-                        
-                        if type_test_case:
-                            if test_cases:
-                                test_cases += "\n\n" + type_test_case
-                            else:
-                                test_cases = type_test_case
-                                
-                            # Mark this type as completed
-                            with generation_status['lock']:
-                                generation_status['completed_types'].add(test_type)
-                        else:
-                            error_messages.append(f"Failed to generate {test_type} test cases from image")
-                            logger.error(f"Failed to generate {test_type} test cases from image")
-                            all_types_processed = False
-                    except Exception as e:
-                        error_messages.append(f"Error generating {test_type} test cases: {str(e)}")
-                        logger.error(f"Error generating {test_type} test cases from image: {str(e)}", exc_info=True)
-                        all_types_processed = False
-                
-                if not test_cases:
-                    os.remove(image_path)  # Clean up if generation fails
-                    # Reset the generation status
-                    with generation_status['lock']:
-                        generation_status['is_generating'] = False
-                    
-                    # Provide better error message
-                    error_message = "Failed to generate test cases from image"
-                    if error_messages:
-                        error_message += f": {error_messages[0]}"
-                        # Check for common error patterns
-                        for msg in error_messages:
-                            if "model_not_found" in msg:
-                                error_message = "The OpenAI model required for image processing is not available or has been deprecated. Please check your OpenAI account access."
-                                break
-                            elif "api key" in msg.lower() or "authorization" in msg.lower():
-                                error_message = "OpenAI API authentication failed. Please check your API key configuration."
-                                break
-                    
-                    return jsonify({'error': error_message}), 400
-                
-                # Save test case files
-                file_base_name = f'test_image_{unique_id}'
-                txt_file = save_test_script(test_cases, file_base_name)
-                excel_file = save_excel_report(test_cases, file_base_name)
-                
-                if txt_file and excel_file:
-                    results = {
-                        'txt': txt_file,
-                        'excel': excel_file
-                    }
-                    
-                    # Inside the image upload handler, before saving to MongoDB
-                    formatted_test_cases = []
-                    for idx, test_case in enumerate(test_cases.split('\n\n')):
-                        if test_case.strip():
-                            # Start test case IDs from 2 instead of 1
-                            test_case_id = f"TC_KAN-1_{idx + 2}"
-                            formatted_test_cases.append({
-                                'test_case_id': test_case_id,
-                                'content': test_case,
-                                'status': ''
-                            })
-                        
-                    # Create MongoDB handler and save test case data
-                    mongo_handler = MongoHandler()
-                    url_key = mongo_handler.save_test_case({
-                        'files': results,
-                        'test_cases': formatted_test_cases,
-                        'source_type': 'image',
-                        'image_id': unique_id
-                    }, unique_id)
-                    
-                    # Mark all test types as completed
-                    with generation_status['lock']:
-                        generation_status['completed_types'] = generation_status['total_types'].copy()
-                        generation_status['is_generating'] = False
-                    
-                    return jsonify({
-                        'success': True,
-                        'url_key': url_key,
-                        'files': results
-                    })
-                else:
-                    os.remove(image_path)  # Clean up if saving fails
-                    # Reset the generation status
-                    with generation_status['lock']:
-                        generation_status['is_generating'] = False
-                    return jsonify({'error': 'Failed to save test case files'}), 400
-                    
-            except Exception as e:
-                if os.path.exists(image_path):
-                    os.remove(image_path)
-                # Reset the generation status
-                with generation_status['lock']:
-                    generation_status['is_generating'] = False
-                return jsonify({'error': str(e)}), 500
-                
-        else:
-            # Existing Jira/Azure logic
-            data = request.json
-            source_type = data.get('sourceType', 'jira')
-            item_ids = data.get('itemId', [])
-            
-            # Fix test case types handling for JSON requests
-            selected_types = data.get('testCaseTypes[]', data.get('testCaseTypes', []))
-            if isinstance(selected_types, str):
-                selected_types = [selected_types]
-            
-            if not selected_types:
-                return jsonify({'error': 'Please select at least one test case type'}), 400
-            
-            if isinstance(item_ids, str):
-                item_ids = [item_ids]
-            
-            results = {}
-            all_types_processed = True
+                params['max_items'] = min(int(data.get('maxItems') or QUERY_MAX_ITEMS), QUERY_MAX_ITEMS)
+            except (TypeError, ValueError):
+                return None, ({'error': 'maxItems must be a number'}, 400)
+    
+    return params, None
+
+def generate_from_image(params):
+    """Generate test cases for an uploaded image. Returns (response_body, status_code)"""
+    image_path = params['image_path']
+    unique_id = params['unique_id']
+    selected_types = params['selected_types']
+    stream_id = params.get('stream_id')
+    
+    try:
+        # Reuse the result of an earlier upload of the same (or a nearly identical) screenshot
+        hashes = image_index.hash_image(image_path) if image_index else None
+        duplicate = None
+        if hashes and not params.get('bypass_cache'):
+            duplicate = image_index.find_duplicate(hashes, selected_types)
+        if duplicate:
+            os.remove(image_path)  # The earlier upload already holds this screenshot
+            for test_type in selected_types:
+                progress_tracker.mark_type_completed(params['progress_id'], test_type, True)
+            finish_stream(stream_id, 'done', {'url_key': duplicate['url_key'], 'files': duplicate['files']})
+            return {
+                'success': True,
+                'url_key': duplicate['url_key'],
+                'files': duplicate['files'],
+                'duplicate': True
+            }, 200
+
+        # Import the image generator
+        from ai.image_generator import generate_test_case_from_image
+        
+        # Generate test cases from image - all types concurrently
+        all_types_processed = True
+        error_messages = []
+        
+        def mark_type_completed(test_type, success):
+            nonlocal all_types_processed
+            event_broker.publish(stream_id, 'type_complete', {'test_type': test_type, 'success': success})
+            progress_tracker.mark_type_completed(params['progress_id'], test_type, success)
+            if not success:
+                error_messages.append(f"Failed to generate {test_type} test cases from image")
+                logger.error(f"Failed to generate {test_type} test cases from image")
+                all_types_processed = False
+        
+        try:
+            logger.info(f"Generating {selected_types} test cases from image")
+            test_cases = generate_test_case_from_image(
+                image_path,
+                selected_types=selected_types,
+                on_type_complete=mark_type_completed,
+                use_cache=not params.get('bypass_cache')
+            )
+        except Exception as e:
+            test_cases = None
+            error_messages.append(f"Error generating test cases: {str(e)}")
+            logger.error(f"Error generating test cases from image: {str(e)}", exc_info=True)
+            all_types_processed = False
+        
+        if not test_cases:
+            os.remove(image_path)  # Clean up if generation fails
             
-            for item_id in item_ids:
-                test_cases = None
-                
-                if source_type == 'jira':
-                    # Get Jira configuration from request data
-                    jira_config = data.get('jira_config')
-                    issue = fetch_issue(item_id, jira_config)
-                    if not issue:
-                        continue
-                    
-                    for test_type in selected_types:
-                        try:
-                            # Generate one type at a time
-                            type_test_case = generate_test_case(
-                                description=issue['fields']['description'],
-                                summary=issue['fields']['summary'],
-                                selected_types=[test_type]
-                            )
-                            
-                            if type_test_case:
-                                if test_cases:
-                                    test_cases += "\n\n" + type_test_case
-                                else:
-                                    test_cases = type_test_case
-                                    
-                                # Mark this type as completed
-                                with generation_status['lock']:
-                                    generation_status['completed_types'].add(test_type)
-                            else:
-                                all_types_processed = False
-                                
-                        except Exception as e:
-                            logger.error(f"Error generating {test_type} test cases: {str(e)}")
-                            all_types_processed = False
-                            
-                elif source_type == 'azure':
-                    # Get Azure configuration from request data
-                    azure_config = data.get('azure_config')
-                    # Only use frontend config if it exists and all required values are present
-                    if azure_config and all(azure_config.values()):
-                        azure_client = AzureClient(azure_config)
-                    else:
-                        azure_client = AzureClient()  # Fall back to environment variables
-                    work_items = azure_client.fetch_azure_work_items([item_id])
-                    
-                    if not work_items or len(work_items) == 0:
-                        continue
-                    
-                    # Define work_item from the fetched items
-                    work_item = work_items[0]
-                    
-                    for test_type in selected_types:
-                        try:
-                            # Generate one type at a time
-                            type_test_case = generate_test_case(
-                                description=work_item['description'],
-                                summary=work_item['title'],
-                                selected_types=[test_type]
-                            )
-                            
-                            if type_test_case:
-                                if test_cases:
-                                    test_cases += "\n\n" + type_test_case
-                                else:
-                                    test_cases = type_test_case
-                                    
-                                # Mark this type as completed
-                                with generation_status['lock']:
-                                    generation_status['completed_types'].add(test_type)
-                            else:
-                                all_types_processed = False
-                                
-                        except Exception as e:
-                            logger.error(f"Error generating {test_type} test cases: {str(e)}")
-                            all_types_processed = False
-                
-                # Only proceed if test cases were generated
-                if not test_cases:
-                    continue
-                    
-                # Save files
-                safe_filename = ''.join(c for c in item_id if c.isalnum() or c in ('-', '_'))
-                file_base_name = f'test_{safe_filename}'
-                
-                txt_file = save_test_script(test_cases, file_base_name)
-                excel_file = save_excel_report(test_cases, file_base_name)
-                
-                if txt_file and excel_file:
-                    results[item_id] = {
-                        'txt': txt_file,
-                        'excel': excel_file
-                    }
+            # Provide better error message
+            error_message = "Failed to generate test cases from image"
+            if error_messages:
+                error_message += f": {error_messages[0]}"
+                # Check for common error patterns
+                for msg in error_messages:
+                    if "model_not_found" in msg:
+                        error_message = "The OpenAI model required for image processing is not available or has been deprecated. Please check your OpenAI account access."
+                        break
+                    elif "api key" in msg.lower() or "authorization" in msg.lower():
+                        error_message = "OpenAI API authentication failed. Please check your API key configuration."
+                        break
             
-            # After all item IDs and types are processed, update generation status
-            with generation_status['lock']:
-                generation_status['is_generating'] = False
+            finish_stream(stream_id, 'error', {'error': error_message})
+            return {'error': error_message}, 400
+        
+        # Save test case files
+        file_base_name = f'test_image_{unique_id}'
+        txt_file = save_test_script(test_cases, file_base_name)
+        excel_file = save_excel_report(test_cases, file_base_name)
+        
+        if txt_file and excel_file:
+            results = {
+                'txt': txt_file,
+                'excel': excel_file
+            }
             
-            if not results:
-                return jsonify({'error': 'Failed to generate test cases for any items'}), 400
+            # Inside the image upload handler, before saving to MongoDB
+            formatted_test_cases = format_test_cases_for_storage(test_cases, "KAN-1")
                 
-            # Before returning the final response in Jira/Azure handler
-            formatted_test_cases = []
-            for idx, test_case in enumerate(test_cases.split('\n\n')):
-                if test_case.strip():
-                    # Start test case IDs from 2 instead of 1
-                    test_case_id = f"TC_{item_ids[0]}_{idx + 2}"
-                    formatted_test_cases.append({
-                        'test_case_id': test_case_id,
-                        'content': test_case,
-                        'status': ''
-                    })
-            
             # Create MongoDB handler and save test case data
             mongo_handler = MongoHandler()
             url_key = mongo_handler.save_test_case({
                 'files': results,
                 'test_cases': formatted_test_cases,
-                'source_type': source_type,
-                'item_ids': item_ids
-            }, item_ids[0] if item_ids else None)
+                'source_type': 'image',
+                'image_id': unique_id
+            }, unique_id)
+            if hashes:
+                image_index.record(hashes, selected_types, url_key, results)
             
-            return jsonify({
+            finish_stream(stream_id, 'done', {'url_key': url_key, 'files': results})
+            return {
                 'success': True,
                 'url_key': url_key,
                 'files': results
+            }, 200
+        else:
+            os.remove(image_path)  # Clean up if saving fails
+            finish_stream(stream_id, 'error', {'error': 'Failed to save test case files'})
+            return {'error': 'Failed to save test case files'}, 400
+            
+    except Exception as e:
+        if os.path.exists(image_path):
+            os.remove(image_path)
+        finish_stream(stream_id, 'error', {'error': str(e)})
+        return {'error': str(e)}, 500
+
+def generate_from_items(params):
+    """Generate test cases for Jira issues or Azure work items. Returns (response_body, status_code)"""
+    source_type = params['source_type']
+    item_ids = list(params['item_ids'])
+    selected_types = params['selected_types']
+    stream_id = params.get('stream_id')
+    query = params.get('query')
+    query_error = None
+    
+    results = {}
+    all_types_processed = True
+    
+    def mark_type_completed(test_type, success):
+        nonlocal all_types_processed
+        event_broker.publish(stream_id, 'type_complete', {'test_type': test_type, 'success': success})
+        progress_tracker.mark_type_completed(params['progress_id'], test_type, success)
+        if not success:
+            all_types_processed = False
+    
+    def generate_item(item_id, source):
+        def publish_test_case(test_type, test_case):
+            event_broker.publish(stream_id, 'test_case', {
+                'item_id': item_id,
+                'test_type': test_type,
+                'test_case': test_case
             })
+        
+        options = dict(
+            description=source['description'],
+            summary=source['summary'],
+            selected_types=selected_types,
+            on_type_complete=mark_type_completed,
+            use_cache=not params.get('bypass_cache'),
+            # Stream test cases to the browser only when someone is listening
+            on_test_case=publish_test_case if stream_id else None
+        )
+        # Structured mode returns records that the file writers and MongoDB take as they are
+        if params.get('structured_output'):
+            return generate_test_case_records(**options)
+        return generate_test_case(combine_types=params.get('combine_types'), **options)
+    
+    # Hash of each item's inputs; items with the hash of their last generation are not regenerated
+    generation = {
+        'model': GENERATION_MODEL,
+        'prompt_version': PROMPT_VERSION,
+        'structured_output': bool(params.get('structured_output')),
+        'combine_types': bool(params.get('combine_types'))
+    }
+    input_hashes = {}
+    reuse = bool(generation_index and params.get('incremental') and not params.get('bypass_cache'))
+    
+    def lookup_item(item_id, source):
+        input_hashes[item_id] = compute_input_hash(source, selected_types, generation)
+        previous = generation_index.find_item(item_id, input_hashes[item_id]) if reuse else None
+        if previous:
+            logger.info(f"Inputs of {item_id} are unchanged, reusing its test cases")
+            for test_type in selected_types:
+                mark_type_completed(test_type, True)
+        return previous
+    
+    def save_item(item_id, test_cases):
+        files = save_item_files(item_id, test_cases)
+        if files and generation_index and item_id in input_hashes:
+            generation_index.record_item(item_id, input_hashes[item_id], test_cases, files)
+        return files
+    
+    # Fetching, generation and file writing overlap across items
+    with ItemPipeline(
+        fetch=lambda item_id: fetch_source_item(source_type, item_id, params),
+        generate=generate_item,
+        save=save_item,
+        lookup=lookup_item if generation_index else None
+    ) as pipeline:
+        if query:
+            queued = set()
+            try:
+                # Query results are generated page by page while later pages are still being fetched
+                for item_id, source in iter_query_items(source_type, query, params, params.get('max_items')):
+                    if item_id in queued:
+                        continue
+                    queued.add(item_id)
+                    item_ids.append(item_id)
+                    pipeline.submit_fetched(item_id, source)
+                    event_broker.publish(stream_id, 'item_queued', {'item_id': item_id, 'count': len(item_ids)})
+                    progress_tracker.set_item_count(params['progress_id'], len(selected_types), len(item_ids))
+            except QuerySourceError as e:
+                # Items queued before a later page failed are still generated
+                logger.error(f"Query failed after {len(item_ids)} items: {str(e)}")
+                query_error = str(e)
+        else:
+            # Bulk-fetched items go straight to generation; the rest are fetched one by one
+            for item_id, source in iter_source_items(source_type, item_ids, params):
+                if source:
+                    pipeline.submit_fetched(item_id, source)
+                else:
+                    pipeline.submit(item_id)
+        outcomes = pipeline.wait()
+    
+    if not item_ids:
+        error = query_error or 'Query returned no items'
+        finish_stream(stream_id, 'error', {'error': error})
+        return {'error': error}, 400
+    
+    test_cases = None
+    for item_id in item_ids:
+        outcome = outcomes[item_id]
+        if outcome['error']:
+            logger.warning(f"Skipping {item_id}: {outcome['error']}")
+            all_types_processed = False
+            continue
+        results[item_id] = outcome['files']
+        test_cases = outcome['test_cases']
+    
+    if not results:
+        finish_stream(stream_id, 'error', {'error': 'Failed to generate test cases for any items'})
+        return {'error': 'Failed to generate test cases for any items'}, 400
+    
+    request_hash = None
+    if generation_index and all(item_id in input_hashes for item_id in item_ids):
+        request_hash = combine_hashes([input_hashes[item_id] for item_id in item_ids])
+    
+    # Nothing changed since an identical request: hand back its document
+    if reuse and request_hash and len(results) == len(item_ids) and all(outcomes[item_id]['reused'] for item_id in item_ids):
+        url_key = generation_index.find_request(request_hash)
+        if url_key:
+            finish_stream(stream_id, 'done', {'url_key': url_key, 'files': results})
+            return {
+                'success': True,
+                'url_key': url_key,
+                'files': results,
+                'reused': True
+            }, 200
+        
+    # Before returning the final response in Jira/Azure handler
+    formatted_test_cases = format_test_cases_for_storage(test_cases, item_ids[0])
+    
+    # Create MongoDB handler and save test case data
+    mongo_handler = MongoHandler()
+    url_key = mongo_handler.save_test_case({
+        'files': results,
+        'test_cases': formatted_test_cases,
+        'source_type': source_type,
+        'item_ids': item_ids
+    }, item_ids[0] if item_ids else None, input_hash=request_hash if len(results) == len(item_ids) else None)
+    
+    finish_stream(stream_id, 'done', {'url_key': url_key, 'files': results})
+    body = {
+        'success': True,
+        'url_key': url_key,
+        'files': results
+    }
+    if query_error:
+        # The query broke off part way; say so next to the items that were generated
+        body['query_error'] = query_error
+    return body, 200
+
+def run_generation(params):
+    """Run a parsed generation request. Returns (response_body, status_code)"""
+    stream_id = params.get('stream_id')
+    progress_id = params['progress_id']
+    event_broker.open(stream_id)
+    try:
+        # Progress is tracked per request so concurrent generations don't interfere
+        progress_tracker.start(progress_id, params['selected_types'], len(params.get('item_ids') or [None]))
+
+        if params['source_type'] == 'image':
+            return generate_from_image(params)
+        return generate_from_items(params)
             
     except Exception as e:
         logger.error(f"Error during generation: {str(e)}", exc_info=True)
-        # Reset the generation status in case of errors
-        with generation_status['lock']:
-            generation_status['is_generating'] = False
+        finish_stream(stream_id, 'error', {'error': str(e)})
+        return {'error': str(e)}, 500
+    finally:
+        progress_tracker.finish(progress_id)
+
+@app.route('/api/generate', methods=['POST'])
+def generate():
+    try:
+        params, error = parse_generation_request()
+        if error:
+            return jsonify(error[0]), error[1]
+    except Exception as e:
+        logger.error(f"Error reading generation request: {str(e)}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+    body, status_code = run_generation(params)
+    body['request_id'] = params['progress_id']
+    return jsonify(body), status_code
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_generation_job():
+    """Queue a generation request and return its job id immediately"""
+    try:
+        params, error = parse_generation_request()
+        if error:
+            return jsonify(error[0]), error[1]
+        
+        # The job id doubles as the id of the job's live event stream
+        job_id = str(uuid.uuid4())
+        params['stream_id'] = job_id
+        params['progress_id'] = job_id
+        event_broker.open(job_id)
+        job_manager.submit(run_generation, params, job_id=job_id, summary={
+            'source_type': params['source_type'],
+            'selected_types': params['selected_types'],
+            'item_ids': params.get('item_ids', []),
+            'query': params.get('query'),
+            'image_id': params.get('unique_id')
+        })
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status_url': f"/api/jobs/{job_id}",
+            'result_url': f"/api/jobs/{job_id}/result",
+            'stream_url': f"/api/generation-stream/{job_id}"
+        }), 202
+    except Exception as e:
+        logger.error(f"Error submitting generation job: {str(e)}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs')
+def list_generation_jobs():
+    """List the most recent generation jobs"""
+    try:
+        limit = min(int(request.args.get('limit', 20)), 100)
+        return jsonify({'jobs': job_manager.store.list_recent(limit)})
+    except Exception as e:
+        logger.error(f"Error listing generation jobs: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>')
+def get_generation_job(job_id):
+    """Return the state of a generation job"""
+    try:
+        job = job_manager.store.get(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        job['progress'] = progress_tracker.get(job_id)
+        return jsonify(job)
+    except Exception as e:
+        logger.error(f"Error retrieving generation job: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>/result')
+def get_generation_job_result(job_id):
+    """Return the url_key and files of a finished generation job"""
+    try:
+        job = job_manager.store.get(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        if job['state'] in (JOB_QUEUED, JOB_RUNNING):
+            return jsonify({'job_id': job_id, 'state': job['state']}), 202
+        if job['state'] == JOB_FAILED:
+            return jsonify({'job_id': job_id, 'state': job['state'], 'error': job.get('error')}), 400
+        return jsonify({'job_id': job_id, 'state': job['state'], **(job.get('result') or {})})
+    except Exception as e:
+        logger.error(f"Error retrieving generation job result: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/download/<path:filename>')
@@ -635,6 +782,23 @@ def update_status():
 # Initialize MongoDB handler
 mongo_handler = MongoHandler()
 
+# Worker pool running queued generation jobs; job state lives in MongoDB
+job_manager = JobManager()
+
+# Per-request generation progress, shared across app processes through MongoDB
+progress_tracker = ProgressTracker()
+
+# Perceptual-hash index of processed screenshots, used to reuse results of duplicate uploads
+image_index = ImageHashIndex() if IMAGE_DEDUP_ENABLED else None
+
+# Last generation of each Jira/Azure item, used to skip regenerating unchanged items.
+# It is always kept up to date; GENERATION_INCREMENTAL only sets the default of the request's 'incremental' flag.
+try:
+    generation_index = GenerationIndex()
+except Exception as e:
+    logger.error(f"Incremental generation unavailable: {str(e)}")
+    generation_index = None
+
 @app.route('/api/share', methods=['POST'])
 def share_test_case():
     try:
@@ -785,34 +949,79 @@ def download_shared_excel(url_key):
         logger.error(f"Error generating Excel file: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/generation-stream/<stream_id>')
+def generation_stream(stream_id):
+    """Server-Sent Events feed of test cases as they are generated"""
+    if not event_broker.exists(stream_id):
+        return jsonify({'error': 'Stream not found'}), 404
+    response = Response(stream_with_context(event_broker.subscribe(stream_id)), mimetype='text/event-stream')
+    response.headers["Cache-Control"] = "no-cache"
+    # Stop reverse proxies (e.g. nginx) from buffering the stream
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
 # Add this after the generate endpoint
 @app.route('/api/generation-status')
 def get_generation_status():
+    """Progress of one generation request or job, selected with ?id="""
     try:
-        with generation_status['lock']:
-            # Calculate progress percentage based on completed types vs total types
-            progress_percentage = 0
-            if generation_status['total_types']:
-                progress_percentage = (len(generation_status['completed_types']) / len(generation_status['total_types'])) * 100
-                
-            # Ensure progress is a valid number between 0-100
-            if math.isnan(progress_percentage) or progress_percentage < 0:
-                progress_percentage = 0
-            elif progress_percentage > 100:
-                progress_percentage = 100
-            
-            response = {
-                'is_generating': generation_status['is_generating'],
-                'completed_types': list(generation_status['completed_types']),
-                'total_types': list(generation_status['total_types']),
-                'progress_percentage': progress_percentage,
-                'files_ready': not generation_status['is_generating']
-            }
-        return jsonify(response)
+        progress_id = request.args.get('id')
+        if not progress_id:
+            return jsonify({'error': 'Missing id parameter', 'progress_percentage': 0, 'is_generating': False, 'files_ready': True}), 400
+        
+        progress = progress_tracker.get(progress_id)
+        if not progress:
+            return jsonify({'error': 'Unknown generation id', 'progress_percentage': 0, 'is_generating': False, 'files_ready': True}), 404
+        return jsonify(progress)
     except Exception as e:
         logger.error(f"Error getting generation status: {str(e)}")
         return jsonify({'error': str(e), 'progress_percentage': 0, 'is_generating': False, 'files_ready': True}), 500
 
+@app.route('/api/cache-stats')
+def get_cache_stats():
+    """Hit/miss counters of the LLM response cache"""
+    cache = get_response_cache()
+    if not cache:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **cache.stats()})
+
+@app.route('/api/source-cache-stats')
+def get_source_cache_stats():
+    """Hit/miss counters of the Jira/Azure source cache"""
+    if not source_cache:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **source_cache.stats()})
+
+@app.route('/api/rate-limit-stats')
+def get_rate_limit_stats():
+    """Queue depth, remaining budget and retry counters of the shared OpenAI rate limiter"""
+    return jsonify(rate_limiter.stats())
+
+@app.route('/api/image-dedup-stats')
+def get_image_dedup_stats():
+    """Lookup/hit counters of the duplicate screenshot index"""
+    if not image_index:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **image_index.stats()})
+
+@app.route('/api/incremental-stats')
+def get_incremental_stats():
+    """Lookup/hit counters of the incremental generation index"""
+    if not generation_index:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, 'default': GENERATION_INCREMENTAL, **generation_index.stats()})
+
+@app.route('/api/vision-models')
+def get_vision_models():
+    """Which vision models are known to work or fail, per account"""
+    from ai.model_registry import vision_models
+    return jsonify(vision_models.snapshot())
+
+@app.route('/api/generation-telemetry')
+def get_generation_telemetry():
+    """Requests, tokens and latency per generation mode, for comparing the modes"""
+    return jsonify(telemetry_store.stats())
+
 @app.route('/api/shared-status', methods=['GET'])
 def get_shared_status():
     try:
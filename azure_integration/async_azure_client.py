@@ -0,0 +1,99 @@
+"""asyncio version of ``AzureClient``."""
+from typing import Dict, List, Optional
+import asyncio
+
+import httpx
+
+from config.settings import AZURE_BATCH_SIZE
+from azure_integration.azure_client import AzureClient, WORK_ITEM_FIELDS, clean_html, clean_html_many
+from utils.async_http import AsyncClientPool, request_with_retries
+
+
+class AsyncAzureClient(AzureClient):
+    """Fetches Azure DevOps work items without blocking the event loop.
+
+    Configuration and results are the same as ``AzureClient``. Single-item fetches
+    run concurrently and HTML cleaning is moved off the event loop.
+    """
+
+    def __init__(self, pool: AsyncClientPool, azure_config=None):
+        super().__init__(azure_config)
+        self.pool = pool
+
+    def _client(self) -> httpx.AsyncClient:
+        return self.pool.get(self.azure_url, headers=self._headers())
+
+    async def _fetch_one(self, client: httpx.AsyncClient, work_item_id: str) -> Optional[Dict[str, str]]:
+        url = f"{self.azure_url}/{self.azure_org}/{self.azure_project}/_apis/wit/workitems/{work_item_id}?api-version=6.0"
+        try:
+            response = await request_with_retries(client, "GET", url)
+            if response.status_code != 200:
+                print(f"❌ Failed to fetch work item {work_item_id}: {response.status_code}")
+                return None
+            work_item = response.json()
+            fields = work_item.get("fields", {})
+            description = await asyncio.to_thread(clean_html, fields.get("System.Description", "No Description Found"))
+            print(f"✅ Successfully fetched work item {work_item_id}")
+            return {
+                "id": work_item_id,
+                "title": fields.get("System.Title", "No Title Found"),
+                "description": description,
+                "rev": work_item.get("rev")
+            }
+        except Exception as e:
+            print(f"❌ Error processing work item {work_item_id}: {str(e)}")
+            return None
+
+    async def fetch_azure_work_items(self, work_item_ids=None, batched=False):
+        """Async version of ``AzureClient.fetch_azure_work_items``; single items are fetched concurrently."""
+        if not work_item_ids:
+            print("⚠️ Work item IDs not found.")
+            return None
+        if not self._validate():
+            return None
+        if batched:
+            return await self.fetch_work_items_batched(work_item_ids)
+
+        client = self._client()
+        results = await asyncio.gather(*(self._fetch_one(client, work_item_id) for work_item_id in work_item_ids))
+        return [result for result in results if result]
+
+    async def fetch_work_items_batched(self, work_item_ids: List[str],
+                                       batch_size: Optional[int] = None) -> List[Dict[str, str]]:
+        """Async version of ``AzureClient.iter_work_items_batched``; all batches are requested concurrently."""
+        if not self._validate():
+            return []
+        ids = [str(work_item_id).strip() for work_item_id in work_item_ids if str(work_item_id).strip().isdigit()]
+        batch_size = max(1, min(200, batch_size or AZURE_BATCH_SIZE))
+        client = self._client()
+        url = f"{self.azure_url}/{self.azure_org}/{self.azure_project}/_apis/wit/workitemsbatch?api-version=6.0"
+
+        async def fetch_batch(chunk: List[str]) -> List[Dict[str, str]]:
+            try:
+                response = await request_with_retries(client, "POST", url, json={
+                    "ids": [int(work_item_id) for work_item_id in chunk],
+                    "fields": WORK_ITEM_FIELDS,
+                    "errorPolicy": "omit"
+                })
+                if response.status_code != 200:
+                    print(f"❌ Failed to fetch work items {chunk[0]}..{chunk[-1]}: {response.status_code}")
+                    return []
+                by_id = {str(item["id"]): item for item in response.json().get("value", []) if item}
+            except Exception as e:
+                print(f"❌ Error fetching work items {chunk[0]}..{chunk[-1]}: {str(e)}")
+                return []
+            found = [work_item_id for work_item_id in chunk if work_item_id in by_id]
+            descriptions = await asyncio.to_thread(clean_html_many, [
+                by_id[work_item_id].get("fields", {}).get("System.Description", "No Description Found")
+                for work_item_id in found
+            ])
+            return [{
+                "id": work_item_id,
+                "title": by_id[work_item_id].get("fields", {}).get("System.Title", "No Title Found"),
+                "description": description,
+                "rev": by_id[work_item_id].get("rev")
+            } for work_item_id, description in zip(found, descriptions)]
+
+        batches = await asyncio.gather(*(fetch_batch(ids[start:start + batch_size])
+                                         for start in range(0, len(ids), batch_size)))
+        return [work_item for batch in batches for work_item in batch]
@@ -1,8 +1,64 @@
 import os
-import requests
 import base64
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Tuple
 from bs4 import BeautifulSoup
-from config.settings import AZURE_DEVOPS_URL, AZURE_DEVOPS_ORG, AZURE_DEVOPS_PROJECT, AZURE_DEVOPS_PAT
+from config.settings import (
+    AZURE_DEVOPS_URL, AZURE_DEVOPS_ORG, AZURE_DEVOPS_PROJECT, AZURE_DEVOPS_PAT,
+    AZURE_BATCH_SIZE, AZURE_HTML_WORKERS, AZURE_HTML_POOL_MIN
+)
+from utils.http_session import get_session
+
+# Fields requested by the batched fetch
+WORK_ITEM_FIELDS = ["System.Id", "System.Rev", "System.Title", "System.Description"]
+
+_html_pool = None
+_html_pool_lock = Lock()
+
+
+def clean_html(text):
+    """Strip the HTML tags of a work item description."""
+    soup = BeautifulSoup(text, "html.parser")
+    return soup.get_text()
+
+
+def _get_html_pool():
+    """Bounded thread pool shared by all clients for cleaning large batches of descriptions.
+
+    Threads rather than processes: spawned or forkserver workers re-import the
+    ``__main__`` script, which for ``python app.py`` repeats the whole app setup
+    (MongoDB connections, job manager, heartbeat thread) in every worker.
+    """
+    global _html_pool
+    with _html_pool_lock:
+        if _html_pool is None:
+            _html_pool = ThreadPoolExecutor(max_workers=AZURE_HTML_WORKERS, thread_name_prefix="azure-html")
+        return _html_pool
+
+
+def shutdown_html_pool() -> None:
+    """Stop the HTML cleaning threads; the pool is created again on next use."""
+    global _html_pool
+    with _html_pool_lock:
+        pool, _html_pool = _html_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def clean_html_many(texts: List[str]) -> List[str]:
+    """Clean many descriptions, in the thread pool when there are enough to be worth it."""
+    if AZURE_HTML_WORKERS <= 1 or len(texts) < AZURE_HTML_POOL_MIN:
+        return [clean_html(text) for text in texts]
+    try:
+        return list(_get_html_pool().map(clean_html, texts))
+    except Exception as e:
+        print(f"⚠️ HTML cleaning pool failed, cleaning inline: {str(e)}")
+        return [clean_html(text) for text in texts]
+
+class AzureQueryError(Exception):
+    """A WIQL query failed: Azure DevOps rejected the query, the credentials or could not be reached."""
+
 
 class AzureClient:
     def __init__(self, azure_config=None):
@@ -21,46 +77,58 @@ class AzureClient:
             # Remove trailing slashes
             self.azure_url = self.azure_url.rstrip('/')
 
-    def fetch_azure_work_items(self, work_item_ids=None):
-        if not work_item_ids:
-            work_item_ids = os.getenv("AZURE_DEVOPS_WORKITEM_IDS", "").split(",")
-            work_item_ids = [id.strip() for id in work_item_ids if id.strip()]
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Accept": "application/json",
+            "Authorization": f"Basic {base64.b64encode(f':{self.azure_pat}'.encode()).decode()}"
+        }
 
-        if not work_item_ids:
-            print("⚠️ Work item IDs not found. Please set AZURE_DEVOPS_WORKITEM_IDS in your .env file.")
-            return None
+    def _session(self):
+        # One pooled keep-alive session per server and PAT, with the auth header built once
+        return get_session(self.azure_url, headers=self._headers())
 
-        # Validate required fields
+    def _validate(self) -> bool:
         if not self.azure_url:
             print("❌ Azure DevOps URL cannot be empty")
-            return None
+            return False
             
         if not self.azure_org:
             print("❌ Azure DevOps organization cannot be empty")
-            return None
+            return False
             
         if not self.azure_project:
             print("❌ Azure DevOps project cannot be empty")
+            return False
+        return True
+
+    def fetch_azure_work_items(self, work_item_ids=None, batched=False):
+        if not work_item_ids:
+            work_item_ids = os.getenv("AZURE_DEVOPS_WORKITEM_IDS", "").split(",")
+            work_item_ids = [id.strip() for id in work_item_ids if id.strip()]
+
+        if not work_item_ids:
+            print("⚠️ Work item IDs not found. Please set AZURE_DEVOPS_WORKITEM_IDS in your .env file.")
             return None
 
+        # Validate required fields
+        if not self._validate():
+            return None
+
+        if batched:
+            return list(self.iter_work_items_batched(work_item_ids))
+
+        session = self._session()
+
         results = []
         for work_item_id in work_item_ids:
             url = f"{self.azure_url}/{self.azure_org}/{self.azure_project}/_apis/wit/workitems/{work_item_id}?api-version=6.0"
-            headers = {
-                "Accept": "application/json",
-                "Authorization": f"Basic {base64.b64encode(f':{self.azure_pat}'.encode()).decode()}"
-            }
 
             try:
-                response = requests.get(url, headers=headers)
+                response = session.get(url)
                 if response.status_code == 200:
                     work_item = response.json()
                     
                     # Clean HTML tags from the description
-                    def clean_html(text):
-                        soup = BeautifulSoup(text, "html.parser")
-                        return soup.get_text()
-
                     description = work_item.get("fields", {}).get("System.Description", "No Description Found")
                     description_cleaned = clean_html(description)
                     title = work_item.get("fields", {}).get("System.Title", "No Title Found")
@@ -68,7 +136,8 @@ class AzureClient:
                     results.append({
                         "id": work_item_id,
                         "title": title,
-                        "description": description_cleaned
+                        "description": description_cleaned,
+                        "rev": work_item.get("rev")
                     })
                     print(f"✅ Successfully fetched work item {work_item_id}")
                 else:
@@ -76,4 +145,121 @@ class AzureClient:
             except Exception as e:
                 print(f"❌ Error processing work item {work_item_id}: {str(e)}")
 
-        return results
\ No newline at end of file
+        return results
+
+    def _iter_batches(self, work_item_ids: List[str], fields: List[str],
+                      batch_size: Optional[int] = None) -> Iterator[Tuple[List[str], Dict[str, Dict]]]:
+        """Post the IDs to the workitemsbatch endpoint in chunks, yielding (chunk, work items by id)."""
+        if not self._validate():
+            return
+        ids = [str(work_item_id).strip() for work_item_id in work_item_ids if str(work_item_id).strip().isdigit()]
+        if not ids:
+            return
+
+        session = self._session()
+        url = f"{self.azure_url}/{self.azure_org}/{self.azure_project}/_apis/wit/workitemsbatch?api-version=6.0"
+        batch_size = max(1, min(200, batch_size or AZURE_BATCH_SIZE))
+
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start:start + batch_size]
+            try:
+                response = session.post(url, json={
+                    "ids": [int(work_item_id) for work_item_id in chunk],
+                    "fields": fields,
+                    "errorPolicy": "omit"  # Missing items come back as null instead of failing the batch
+                })
+                if response.status_code != 200:
+                    print(f"❌ Failed to fetch work items {chunk[0]}..{chunk[-1]}: {response.status_code}")
+                    continue
+                yield chunk, {
+                    str(work_item["id"]): work_item
+                    for work_item in response.json().get("value", []) if work_item
+                }
+            except Exception as e:
+                print(f"❌ Error fetching work items {chunk[0]}..{chunk[-1]}: {str(e)}")
+
+    def iter_work_items_batched(self, work_item_ids: List[str], batch_size: Optional[int] = None) -> Iterator[Dict[str, str]]:
+        """Fetch work items through the workitemsbatch endpoint, yielding them batch by batch.
+
+        Up to ``batch_size`` (at most 200) IDs are fetched per call and only the title
+        and description are requested; the descriptions of a batch are cleaned in a
+        process pool. Items come back in the same shape as ``fetch_azure_work_items``,
+        in the requested order; IDs that do not exist or are not numeric are skipped.
+
+        Args:
+            work_item_ids (List[str]): Work item IDs
+            batch_size (Optional[int]): IDs per call, defaults to AZURE_BATCH_SIZE
+
+        Yields:
+            Dict[str, str]: {'id': ..., 'title': ..., 'description': ..., 'rev': ...}
+        """
+        for chunk, by_id in self._iter_batches(work_item_ids, WORK_ITEM_FIELDS, batch_size):
+            found = [work_item_id for work_item_id in chunk if work_item_id in by_id]
+            descriptions = clean_html_many([
+                by_id[work_item_id].get("fields", {}).get("System.Description", "No Description Found")
+                for work_item_id in found
+            ])
+            print(f"✅ Successfully fetched {len(found)} of {len(chunk)} work items")
+            for work_item_id, description in zip(found, descriptions):
+                work_item = by_id[work_item_id]
+                yield {
+                    "id": work_item_id,
+                    "title": work_item.get("fields", {}).get("System.Title", "No Title Found"),
+                    "description": description,
+                    "rev": work_item.get("rev")
+                }
+
+    def query_work_item_ids(self, wiql: str, top: Optional[int] = None) -> List[str]:
+        """Run a WIQL query and return the IDs of the matching work items, in query order.
+
+        WIQL only returns references, so the IDs of even a large sprint fit in one
+        response; titles and descriptions are fetched afterwards in batches.
+
+        Args:
+            wiql (str): Query, e.g. "SELECT [System.Id] FROM WorkItems WHERE [System.IterationPath] = @CurrentIteration"
+            top (Optional[int]): Return at most this many IDs
+
+        Returns:
+            List[str]: Work item IDs
+
+        Raises:
+            AzureQueryError: If the query fails, with the message Azure DevOps returned
+        """
+        if not wiql:
+            return []
+        if not self._validate():
+            raise AzureQueryError("Azure DevOps connection is not configured")
+        url = f"{self.azure_url}/{self.azure_org}/{self.azure_project}/_apis/wit/wiql?api-version=6.0"
+        if top:
+            url += f"&$top={int(top)}"
+        try:
+            response = self._session().post(url, json={"query": wiql})
+            result = response.json() if response.status_code == 200 else None
+        except Exception as e:
+            raise AzureQueryError(f"Error running WIQL query: {str(e)}") from e
+        if result is None:
+            try:
+                message = response.json().get("message")
+            except ValueError:
+                message = None
+            raise AzureQueryError(f"WIQL query failed with {response.status_code}: {message or response.text[:200]}")
+        # Link queries return pairs of source/target references instead of a flat list
+        references = result.get("workItems") or [
+            relation.get("target") for relation in result.get("workItemRelations", []) if relation.get("target")
+        ]
+        return list(dict.fromkeys(str(reference["id"]) for reference in references))
+
+    def iter_query(self, wiql: str, top: Optional[int] = None) -> Iterator[Dict[str, str]]:
+        """Run a WIQL query and yield its work items batch by batch, like ``iter_work_items_batched``."""
+        yield from self.iter_work_items_batched(self.query_work_item_ids(wiql, top))
+
+    def fetch_revisions(self, work_item_ids: List[str]) -> Dict[str, int]:
+        """Return the current revision (System.Rev) of each work item, without titles or descriptions.
+
+        Items that could not be checked are missing from the result.
+        """
+        revisions = {}
+        for _, by_id in self._iter_batches(work_item_ids, ["System.Id", "System.Rev"]):
+            for work_item_id, work_item in by_id.items():
+                revisions[work_item_id] = work_item.get("rev", work_item.get("fields", {}).get("System.Rev"))
+        return revisions
@@ -1,10 +1,11 @@
-from openai import OpenAI
-from config.settings import OPENAI_API_KEY, BASE_URL
+from config.settings import BASE_URL
+from ai.backends import get_llm_client
+from ai.completion import create_chat_completion
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+client = get_llm_client()
 
 class AzurePipeline:
-    def generate_test_case(self, description, base_url=None):
+    def generate_test_case(self, description, base_url=None, use_cache=True):
         category_prompts = {
             "functional": """
             Generate Functional Test Cases including:
@@ -48,7 +49,9 @@ class AzurePipeline:
             """
 
             try:
-                response = client.chat.completions.create(
+                response = create_chat_completion(
+                    client,
+                    use_cache=use_cache,
                     model="gpt-4",
                     messages=[
                         {
@@ -60,7 +63,7 @@ class AzurePipeline:
                     temperature=0.3,
                     max_tokens=2000
                 )
-                test_cases = response.choices[0].message.content.strip()
+                test_cases = response['content']
                 if test_cases:
                     all_test_cases.append(test_cases)
             except Exception as e:
@@ -3,9 +3,12 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# LLM backend: "openai", or "stub" for a local deterministic stand-in (no network, no API key)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai").lower()
+
 # Only OpenAI API key is required from .env
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
+if not OPENAI_API_KEY and LLM_BACKEND == "openai":
     raise EnvironmentError("⚠️ Missing OPENAI_API_KEY in environment variables")
 
 # Optional environment variables with default values
@@ -43,4 +46,150 @@ if missing_vars:
 
 # MongoDB settings
 MONGODB_URI = os.getenv("MONGODB_URI", "")
-MONGODB_DB = os.getenv("MONGODB_DB", "")
\ No newline at end of file
+MONGODB_DB = os.getenv("MONGODB_DB", "")
+
+# Generation settings
+# Maximum number of per-type LLM requests kept in flight at once
+GENERATION_MAX_WORKERS = int(os.getenv("GENERATION_MAX_WORKERS", "6"))
+
+# Multi-item pipeline settings for Jira/Azure batches
+# Maximum number of items in flight across the fetch, generate and save stages
+PIPELINE_MAX_ITEMS = int(os.getenv("PIPELINE_MAX_ITEMS", "4"))
+PIPELINE_FETCH_WORKERS = int(os.getenv("PIPELINE_FETCH_WORKERS", "4"))
+PIPELINE_SAVE_WORKERS = int(os.getenv("PIPELINE_SAVE_WORKERS", "2"))
+# Maximum number of items a JQL/WIQL query request generates for
+QUERY_MAX_ITEMS = int(os.getenv("QUERY_MAX_ITEMS", "200"))
+
+# LLM response cache settings
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+# Size limit of the in-memory LRU tier in bytes
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Optional persistent tier: "disk", "mongo" or empty for memory only
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "").lower()
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", os.path.join("tests", "cache", "llm"))
+# Lifetime of persistent entries in seconds
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Server-Sent Events settings for live generation output
+# Seconds a finished or idle event stream is kept for late subscribers
+EVENT_STREAM_RETENTION = int(os.getenv("EVENT_STREAM_RETENTION", "600"))
+# Seconds between keep-alive comments on an idle stream
+EVENT_STREAM_HEARTBEAT = int(os.getenv("EVENT_STREAM_HEARTBEAT", "15"))
+
+# Generation job settings
+# Number of generation jobs each app process runs at the same time
+JOB_MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", "4"))
+# Seconds job records are kept in MongoDB
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", str(7 * 24 * 3600)))
+# Seconds between heartbeats a process writes for its queued and running jobs
+JOB_HEARTBEAT_INTERVAL = int(os.getenv("JOB_HEARTBEAT_INTERVAL", "30"))
+# Seconds without a heartbeat after which a queued or running job is marked failed
+JOB_STALE_AFTER = int(os.getenv("JOB_STALE_AFTER", "300"))
+# Seconds per-request generation progress is kept in MongoDB
+PROGRESS_RETENTION = int(os.getenv("PROGRESS_RETENTION", str(24 * 3600)))
+
+# Chunked generation settings
+# Test cases requested per sub-request; types with more cases are split into concurrent chunks.
+# Off by default (0): every chunk re-sends the description and system prompt
+GENERATION_CHUNK_SIZE = int(os.getenv("GENERATION_CHUNK_SIZE", "0"))
+# Follow-up requests allowed when an answer is cut off by the token limit
+GENERATION_MAX_CONTINUATIONS = int(os.getenv("GENERATION_MAX_CONTINUATIONS", "2"))
+# Request test cases as JSON matching a schema instead of free text (per request: "structuredOutput")
+GENERATION_STRUCTURED_OUTPUT = os.getenv("GENERATION_STRUCTURED_OUTPUT", "false").lower() == "true"
+# Ask for several test types in one completion instead of one request per type (per request: "combineTypes")
+GENERATION_COMBINE_TYPES = os.getenv("GENERATION_COMBINE_TYPES", "false").lower() == "true"
+# Output token limit of a combined completion; types that don't fit are requested separately
+GENERATION_COMBINED_MAX_TOKENS = int(os.getenv("GENERATION_COMBINED_MAX_TOKENS", "8000"))
+# Expected output tokens per test case, used to plan combined completions
+GENERATION_TOKENS_PER_TEST_CASE = int(os.getenv("GENERATION_TOKENS_PER_TEST_CASE", "120"))
+# Reuse the stored result of an item whose summary, description, types, model and prompts are unchanged
+GENERATION_INCREMENTAL = os.getenv("GENERATION_INCREMENTAL", "true").lower() == "true"
+GENERATION_INCREMENTAL_RETENTION = int(os.getenv("GENERATION_INCREMENTAL_RETENTION", str(30 * 24 * 3600)))
+
+# Offline batch generation settings
+# Completion window requested when submitting a batch request file
+BATCH_COMPLETION_WINDOW = os.getenv("BATCH_COMPLETION_WINDOW", "24h")
+# Requests answered per round when a batch file is run locally instead of submitted
+BATCH_LOCAL_WINDOW = int(os.getenv("BATCH_LOCAL_WINDOW", "100"))
+
+# OpenAI rate limit settings (shared by every caller in the process)
+# Requests and tokens per minute this process may use; 0 disables that budget
+OPENAI_REQUESTS_PER_MINUTE = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+OPENAI_TOKENS_PER_MINUTE = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "30000"))
+# Fraction of the budget actually used, to stay just under the quota
+RATE_LIMIT_HEADROOM = float(os.getenv("RATE_LIMIT_HEADROOM", "0.9"))
+# Retries of a rate limited or failed request, with jittered exponential backoff
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+OPENAI_BACKOFF_BASE = float(os.getenv("OPENAI_BACKOFF_BASE", "1.0"))
+OPENAI_BACKOFF_MAX = float(os.getenv("OPENAI_BACKOFF_MAX", "60.0"))
+
+# Stub LLM backend settings (LLM_BACKEND=stub)
+# Seconds before the first token of an answer
+STUB_LATENCY = float(os.getenv("STUB_LATENCY", "0.5"))
+# Output tokens generated per second per request (0 returns answers instantly)
+STUB_TOKENS_PER_SECOND = float(os.getenv("STUB_TOKENS_PER_SECOND", "80"))
+# Random variation of the simulated timings, as a fraction (deterministic per prompt)
+STUB_JITTER = float(os.getenv("STUB_JITTER", "0.1"))
+# Requests the simulated server works on at once; further requests queue (0 is unlimited)
+STUB_MAX_CONCURRENCY = int(os.getenv("STUB_MAX_CONCURRENCY", "0"))
+
+# Image preparation settings for vision requests
+# Longest edge in pixels uploaded images are downscaled to (0 keeps the original size)
+IMAGE_MAX_EDGE = int(os.getenv("IMAGE_MAX_EDGE", "2048"))
+# JPEG/WebP quality used when recompressing images
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "85"))
+# Prepared images kept in memory for repeated requests on the same file
+IMAGE_CACHE_SIZE = int(os.getenv("IMAGE_CACHE_SIZE", "16"))
+
+# Duplicate screenshot detection settings
+IMAGE_DEDUP_ENABLED = os.getenv("IMAGE_DEDUP_ENABLED", "true").lower() == "true"
+# Maximum Hamming distance (out of 64 bits) between dHash / aHash values of duplicate images
+IMAGE_DEDUP_DHASH_THRESHOLD = int(os.getenv("IMAGE_DEDUP_DHASH_THRESHOLD", "3"))
+IMAGE_DEDUP_AHASH_THRESHOLD = int(os.getenv("IMAGE_DEDUP_AHASH_THRESHOLD", "6"))
+# Seconds processed images stay in the duplicate index
+IMAGE_DEDUP_RETENTION = int(os.getenv("IMAGE_DEDUP_RETENTION", str(30 * 24 * 3600)))
+
+# Vision model availability settings
+# Seconds a vision model that failed for an account is skipped before it is tried again
+VISION_MODEL_RETRY_AFTER = int(os.getenv("VISION_MODEL_RETRY_AFTER", "3600"))
+
+# Description preprocessing settings
+DESCRIPTION_PREPROCESSING = os.getenv("DESCRIPTION_PREPROCESSING", "true").lower() == "true"
+# Descriptions longer than this many tokens (after clean-up) are condensed into a digest
+DESCRIPTION_DIGEST_THRESHOLD = int(os.getenv("DESCRIPTION_DIGEST_THRESHOLD", "1500"))
+# Output token limit and model of the digest request
+DESCRIPTION_DIGEST_TOKENS = int(os.getenv("DESCRIPTION_DIGEST_TOKENS", "800"))
+DESCRIPTION_DIGEST_MODEL = os.getenv("DESCRIPTION_DIGEST_MODEL", "gpt-4o-mini")
+# Hard token limit used when no digest can be produced
+DESCRIPTION_MAX_TOKENS = int(os.getenv("DESCRIPTION_MAX_TOKENS", "3000"))
+# Lines kept from each pasted log, stack trace or code block
+DESCRIPTION_LOG_LINES = int(os.getenv("DESCRIPTION_LOG_LINES", "5"))
+
+# Jira / Azure DevOps HTTP settings
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+# Retries of connection errors and 429/5xx responses, with exponential backoff
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+# Keep-alive connections per host, and pooled sessions (one per server and credentials)
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", str(max(10, PIPELINE_FETCH_WORKERS))))
+HTTP_MAX_SESSIONS = int(os.getenv("HTTP_MAX_SESSIONS", "16"))
+# Connections per server of the asyncio clients (utils/async_http.py)
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "100"))
+
+# Jira bulk fetch settings
+# Issues per JQL search page (and keys per `key in (...)` query); Jira caps pages at 100
+JIRA_SEARCH_PAGE_SIZE = int(os.getenv("JIRA_SEARCH_PAGE_SIZE", "100"))
+
+# Azure DevOps bulk fetch settings
+# Work items per workitemsbatch call (Azure DevOps allows at most 200)
+AZURE_BATCH_SIZE = int(os.getenv("AZURE_BATCH_SIZE", "200"))
+# Threads cleaning description HTML, used for batches of at least AZURE_HTML_POOL_MIN items
+AZURE_HTML_WORKERS = int(os.getenv("AZURE_HTML_WORKERS", str(min(4, os.cpu_count() or 1))))
+AZURE_HTML_POOL_MIN = int(os.getenv("AZURE_HTML_POOL_MIN", "20"))
+
+# Jira / Azure source cache settings
+# Fetched items are reused while their Jira `updated` / Azure `System.Rev` is unchanged
+SOURCE_CACHE_ENABLED = os.getenv("SOURCE_CACHE_ENABLED", "true").lower() == "true"
+SOURCE_CACHE_TTL = int(os.getenv("SOURCE_CACHE_TTL", str(24 * 3600)))
+SOURCE_CACHE_MAX_ITEMS = int(os.getenv("SOURCE_CACHE_MAX_ITEMS", "1000"))
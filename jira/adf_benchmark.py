@@ -0,0 +1,113 @@
+"""Measure how fast Jira descriptions in Atlassian Document Format are flattened.
+
+Large synthetic documents (headings, nested lists, tables, code blocks, mentions
+and links) are converted with ``adf_to_text`` and nodes and output characters per
+second are reported. Saved ADF documents (e.g. the ``fields.description`` of an
+issue exported with the REST API v3) can be passed as JSON files instead.
+
+Usage:
+    python -m jira.adf_benchmark --sections 500
+    python -m jira.adf_benchmark description.json --repeat 50
+"""
+from typing import Any, Dict, List, Optional
+import argparse
+import json
+import time
+
+from jira.jira_client import adf_to_text
+
+
+def _text(text: str, **extra) -> Dict[str, Any]:
+    return {"type": "text", "text": text, **extra}
+
+
+def _paragraph(*content: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": "paragraph", "content": list(content)}
+
+
+def _list_item(*content: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": "listItem", "content": list(content)}
+
+
+def synthetic_document(sections: int) -> Dict[str, Any]:
+    """Return an ADF document with ``sections`` requirement sections of mixed block types."""
+    content = []
+    for number in range(1, sections + 1):
+        content.extend([
+            {"type": "heading", "attrs": {"level": 2}, "content": [_text(f"Requirement {number}")]},
+            _paragraph(
+                _text("As a "), _text("registered user", marks=[{"type": "strong"}]),
+                _text(" I want to export report "), _text(f"R-{number}", marks=[{"type": "code"}]),
+                _text(". Reviewed by "), {"type": "mention", "attrs": {"id": str(number), "text": "@QA Lead"}},
+                _text(", see "), _text("the spec", marks=[{"type": "link", "attrs": {"href": "https://wiki/spec"}}])
+            ),
+            {"type": "bulletList", "content": [
+                _list_item(_paragraph(_text("Validation rules")), {"type": "orderedList", "content": [
+                    _list_item(_paragraph(_text("Email must be unique"))),
+                    _list_item(_paragraph(_text("Password has at least 12 characters")))
+                ]}),
+                _list_item(_paragraph(_text("Shown to admins only")))
+            ]},
+            {"type": "table", "content": [
+                {"type": "tableRow", "content": [
+                    {"type": "tableHeader", "content": [_paragraph(_text("Field"))]},
+                    {"type": "tableHeader", "content": [_paragraph(_text("Limit"))]}
+                ]},
+                {"type": "tableRow", "content": [
+                    {"type": "tableCell", "content": [_paragraph(_text("name"))]},
+                    {"type": "tableCell", "content": [_paragraph(_text(f"{number} characters"))]}
+                ]}
+            ]},
+            {"type": "codeBlock", "attrs": {"language": "json"},
+             "content": [_text(f'{{\n  "report": {number},\n  "format": "csv"\n}}')]}
+        ])
+    return {"type": "doc", "version": 1, "content": content}
+
+
+def count_nodes(node: Any) -> int:
+    if not isinstance(node, dict):
+        return 0
+    return 1 + sum(count_nodes(child) for child in node.get("content", ()))
+
+
+def benchmark_adf(documents: List[Dict[str, Any]], repeat: int = 10) -> Dict[str, Any]:
+    """Convert every document ``repeat`` times, returning timing and throughput figures."""
+    nodes = sum(count_nodes(document) for document in documents)
+    characters = sum(len(adf_to_text(document)) for document in documents)  # Also warms up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for document in documents:
+            adf_to_text(document)
+    elapsed = time.perf_counter() - started
+    return {
+        "documents": len(documents),
+        "nodes": nodes,
+        "output_characters": characters,
+        "repeat": repeat,
+        "seconds": round(elapsed, 4),
+        "nodes_per_second": round(nodes * repeat / elapsed) if elapsed else None,
+        "characters_per_second": round(characters * repeat / elapsed) if elapsed else None
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m jira.adf_benchmark",
+                                     description="Measure ADF to text conversion throughput")
+    parser.add_argument("files", nargs="*", help="ADF documents as JSON files (default: synthetic document)")
+    parser.add_argument("--sections", type=int, default=200, help="Sections of the synthetic document")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.files:
+        documents = []
+        for path in args.files:
+            with open(path, encoding="utf-8") as f:
+                documents.append(json.load(f))
+    else:
+        documents = [synthetic_document(args.sections)]
+    print(json.dumps(benchmark_adf(documents, args.repeat), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
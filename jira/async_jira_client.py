@@ -0,0 +1,85 @@
+"""asyncio versions of the Jira fetches in ``jira.jira_client``."""
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+from config.settings import JIRA_SEARCH_PAGE_SIZE
+from jira.jira_client import ISSUE_KEY_PATTERN, _resolve_connection
+from utils.async_http import AsyncClientPool, request_with_retries
+
+
+async def fetch_issue(issue_key: str, pool: AsyncClientPool, jira_config: Optional[Dict[str, str]] = None,
+                      fields: Optional[Tuple[str, ...]] = None) -> Optional[Dict[str, Any]]:
+    """Fetch issue details from Jira without blocking the event loop.
+
+    Args:
+        issue_key (str): The Jira issue key
+        pool (AsyncClientPool): Client pool of the running event loop
+        jira_config (Optional[Dict[str, str]]): Optional Jira configuration override
+        fields (Optional[Tuple[str, ...]]): Only return these fields, defaults to all fields
+
+    Returns:
+        Optional[Dict[str, Any]]: Issue details or None if fetch fails
+    """
+    if not issue_key:
+        print("❌ Issue key cannot be empty")
+        return None
+
+    connection = _resolve_connection(jira_config)
+    if not connection:
+        return None
+    jira_url, jira_user, jira_token = connection
+
+    client = pool.get(jira_url, auth=(jira_user, jira_token))
+    params = {"fields": ",".join(fields)} if fields else None
+    try:
+        response = await request_with_retries(client, "GET", f"{jira_url}/rest/api/3/issue/{issue_key}",
+                                              headers={"Accept": "application/json"}, params=params)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPError as e:
+        print(f"❌ Failed to fetch issue: {e}")
+        return None
+    except ValueError as e:
+        print(f"❌ Error decoding JSON: {e}")
+        return None
+
+
+async def search_issues(issue_keys: List[str], pool: AsyncClientPool, jira_config: Optional[Dict[str, str]] = None,
+                        fields: Tuple[str, ...] = ("summary", "description"),
+                        page_size: int = JIRA_SEARCH_PAGE_SIZE) -> AsyncIterator[Dict[str, Any]]:
+    """Async version of ``jira.jira_client.search_issues``, yielding issues as pages arrive."""
+    keys = [key.strip() for key in issue_keys if key and ISSUE_KEY_PATTERN.match(key.strip())]
+    if not keys:
+        return
+    connection = _resolve_connection(jira_config)
+    if not connection:
+        return
+    jira_url, jira_user, jira_token = connection
+
+    client = pool.get(jira_url, auth=(jira_user, jira_token))
+    url = f"{jira_url}/rest/api/3/search/jql"
+    page_size = max(1, page_size)
+
+    for start in range(0, len(keys), page_size):
+        chunk = keys[start:start + page_size]
+        body = {
+            "jql": f"key in ({', '.join(chunk)})",
+            "fields": list(fields),
+            "maxResults": page_size
+        }
+        while True:
+            try:
+                response = await request_with_retries(client, "POST", url, json=body,
+                                                      headers={"Accept": "application/json"})
+                response.raise_for_status()
+                page = response.json()
+            except (httpx.HTTPError, ValueError) as e:
+                print(f"❌ Failed to search issues {chunk[0]}..{chunk[-1]}: {e}")
+                break
+            for issue in page.get("issues", []):
+                yield issue
+            next_token = page.get("nextPageToken")
+            if page.get("isLast", True) or not next_token:
+                break
+            body["nextPageToken"] = next_token
@@ -1,21 +1,19 @@
+import re
 import requests
-from typing import Optional, Dict, Any
-from config.settings import JIRA_URL, JIRA_USER, JIRA_API_TOKEN
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+from config.settings import JIRA_URL, JIRA_USER, JIRA_API_TOKEN, JIRA_SEARCH_PAGE_SIZE
+from utils.http_session import get_session
 
-def fetch_issue(issue_key: str, jira_config: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
-    """Fetch issue details from Jira.
+class JiraSearchError(Exception):
+    """A JQL search failed: Jira rejected the query, the credentials or could not be reached."""
 
-    Args:
-        issue_key (str): The Jira issue key
-        jira_config (Optional[Dict[str, str]]): Optional Jira configuration override
 
-    Returns:
-        Optional[Dict[str, Any]]: Issue details or None if fetch fails
-    """
-    if not issue_key:
-        print("❌ Issue key cannot be empty")
-        return None
+# Issue keys as Jira allows them in JQL (project key, dash, number)
+ISSUE_KEY_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9_]*-\d+$")
 
+def _resolve_connection(jira_config: Optional[Dict[str, str]] = None) -> Optional[Tuple[str, str, str]]:
+    """Return (url, user, token) from the config override or the environment, or None if no URL is set."""
     # Use config values if provided, otherwise fall back to environment variables
     jira_url = jira_config.get('url', JIRA_URL) if jira_config else JIRA_URL
     jira_user = jira_config.get('user', JIRA_USER) if jira_config else JIRA_USER
@@ -31,18 +29,38 @@ def fetch_issue(issue_key: str, jira_config: Optional[Dict[str, str]] = None) ->
         jira_url = 'https://' + jira_url
     
     # Remove trailing slashes
-    jira_url = jira_url.rstrip('/')
+    return jira_url.rstrip('/'), jira_user, jira_token
+
+def fetch_issue(issue_key: str, jira_config: Optional[Dict[str, str]] = None,
+                fields: Optional[Tuple[str, ...]] = None) -> Optional[Dict[str, Any]]:
+    """Fetch issue details from Jira.
+
+    Args:
+        issue_key (str): The Jira issue key
+        jira_config (Optional[Dict[str, str]]): Optional Jira configuration override
+        fields (Optional[Tuple[str, ...]]): Only return these fields (e.g. ('updated',) for a
+            cheap revision check), defaults to all fields
+
+    Returns:
+        Optional[Dict[str, Any]]: Issue details or None if fetch fails
+    """
+    if not issue_key:
+        print("❌ Issue key cannot be empty")
+        return None
+
+    connection = _resolve_connection(jira_config)
+    if not connection:
+        return None
+    jira_url, jira_user, jira_token = connection
 
     url = f"{jira_url}/rest/api/3/issue/{issue_key}"
     headers = {"Accept": "application/json"}
 
     try:
-        response = requests.get(
-            url,
-            auth=(jira_user, jira_token),
-            headers=headers,
-            timeout=30
-        )
+        # Pooled keep-alive session with retries and default timeouts
+        session = get_session(jira_url, auth=(jira_user, jira_token))
+        params = {"fields": ",".join(fields)} if fields else None
+        response = session.get(url, headers=headers, params=params)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -51,3 +69,227 @@ def fetch_issue(issue_key: str, jira_config: Optional[Dict[str, str]] = None) ->
     except requests.exceptions.JSONDecodeError as e:
         print(f"❌ Error decoding JSON: {e}")
         return None
+
+def search_issues(issue_keys: List[str], jira_config: Optional[Dict[str, str]] = None,
+                  fields: Tuple[str, ...] = ("summary", "description"),
+                  page_size: int = JIRA_SEARCH_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """Fetch many issues with paginated JQL searches (``key in (...)``), yielding them as pages arrive.
+
+    Only ``fields`` are requested, so N issues cost a handful of requests instead
+    of N full issue payloads. Issues of a query Jira rejects (for example because
+    one key does not exist) and keys that are not found are not yielded;
+    callers fall back to ``fetch_issue`` for keys they did not receive.
+
+    Args:
+        issue_keys (List[str]): Jira issue keys
+        jira_config (Optional[Dict[str, str]]): Optional Jira configuration override
+        fields (Tuple[str, ...]): Issue fields to return
+        page_size (int): Issues per page, also the number of keys per JQL query
+
+    Yields:
+        Dict[str, Any]: Issues in the same shape as ``fetch_issue`` (with only ``fields``)
+    """
+    # Anything that is not a plain issue key (e.g. a numeric id) is left to fetch_issue
+    keys = [key.strip() for key in issue_keys if key and ISSUE_KEY_PATTERN.match(key.strip())]
+    page_size = max(1, page_size)
+
+    # Long key lists are split so the JQL stays well below URL and query limits
+    for start in range(0, len(keys), page_size):
+        chunk = keys[start:start + page_size]
+        try:
+            yield from search_jql(f"key in ({', '.join(chunk)})", jira_config, fields, page_size)
+        except JiraSearchError as e:
+            print(f"❌ {e}")
+
+def _error_messages(response: requests.Response) -> str:
+    """Return the errorMessages/errors of a Jira error response, or its start as text."""
+    try:
+        payload = response.json()
+        messages = list(payload.get("errorMessages") or []) + list((payload.get("errors") or {}).values())
+    except (ValueError, AttributeError):
+        messages = []
+    return "; ".join(str(message) for message in messages) or response.text[:200] or response.reason or ""
+
+def search_jql(jql: str, jira_config: Optional[Dict[str, str]] = None,
+               fields: Tuple[str, ...] = ("summary", "description"),
+               page_size: int = JIRA_SEARCH_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """Run a JQL search, fetching the next page only once the previous one has been consumed.
+
+    Args:
+        jql (str): JQL query, e.g. 'sprint in openSprints() AND project = KAN'
+        jira_config (Optional[Dict[str, str]]): Optional Jira configuration override
+        fields (Tuple[str, ...]): Issue fields to return
+        page_size (int): Issues per page
+
+    Yields:
+        Dict[str, Any]: Issues in the same shape as ``fetch_issue`` (with only ``fields``)
+
+    Raises:
+        JiraSearchError: If a page cannot be fetched, with Jira's error messages (e.g. for invalid JQL)
+    """
+    if not jql:
+        return
+    connection = _resolve_connection(jira_config)
+    if not connection:
+        raise JiraSearchError("Jira URL is not configured")
+    jira_url, jira_user, jira_token = connection
+
+    session = get_session(jira_url, auth=(jira_user, jira_token))
+    url = f"{jira_url}/rest/api/3/search/jql"
+    headers = {"Accept": "application/json", "Content-Type": "application/json"}
+    body = {
+        "jql": jql,
+        "fields": list(fields),
+        "maxResults": max(1, page_size)
+    }
+    while True:
+        try:
+            response = session.post(url, headers=headers, json=body)
+        except requests.exceptions.RequestException as e:
+            raise JiraSearchError(f"Failed to search issues ({jql[:80]}): {e}") from e
+        if response.status_code != 200:
+            raise JiraSearchError(f"Jira search failed with {response.status_code} ({jql[:80]}): "
+                                  f"{_error_messages(response)}")
+        try:
+            page = response.json()
+        except ValueError as e:
+            raise JiraSearchError(f"Jira returned an invalid search response ({jql[:80]})") from e
+        yield from page.get("issues", [])
+        next_token = page.get("nextPageToken")
+        if page.get("isLast", True) or not next_token:
+            return
+        body["nextPageToken"] = next_token
+
+# ADF inline nodes that carry their text in attrs
+_ADF_INLINE_ATTR = {
+    "mention": "text",
+    "emoji": "text",
+    "status": "text",
+    "inlineCard": "url",
+    "placeholder": "text"
+}
+
+
+def _adf_inline(nodes: List[Dict[str, Any]]) -> str:
+    """Flatten the inline children of a paragraph, heading or cell into one string."""
+    parts = []
+    for node in nodes or ():
+        node_type = node.get("type")
+        if node_type == "text":
+            text = node.get("text", "")
+            for mark in node.get("marks", ()):
+                mark_type = mark.get("type")
+                if mark_type == "code":
+                    text = f"`{text}`"
+                elif mark_type == "link":
+                    href = mark.get("attrs", {}).get("href")
+                    if href and href != text:
+                        text = f"{text} ({href})"
+            parts.append(text)
+        elif node_type == "hardBreak":
+            parts.append("\n")
+        elif node_type in _ADF_INLINE_ATTR:
+            attrs = node.get("attrs", {})
+            parts.append(attrs.get(_ADF_INLINE_ATTR[node_type]) or attrs.get("shortName") or "")
+        elif node_type == "date":
+            try:
+                timestamp = int(node.get("attrs", {}).get("timestamp")) / 1000
+                parts.append(datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d"))
+            except (TypeError, ValueError):
+                pass
+        elif "content" in node:
+            parts.append(_adf_inline(node["content"]))
+    return "".join(parts)
+
+
+def _adf_blocks(nodes: List[Dict[str, Any]], lines: List[str], indent: str = "") -> None:
+    """Append the Markdown lines of a list of ADF block nodes to ``lines``."""
+    for node in nodes or ():
+        node_type = node.get("type")
+        content = node.get("content", ())
+
+        if node_type == "paragraph":
+            text = _adf_inline(content)
+            if text.strip():
+                lines.extend(indent + line for line in text.split("\n"))
+        elif node_type == "heading":
+            level = node.get("attrs", {}).get("level", 1)
+            lines.append(f"{indent}{'#' * level} {_adf_inline(content)}")
+        elif node_type in ("bulletList", "orderedList", "taskList"):
+            number = node.get("attrs", {}).get("order", 1)
+            for item in content:
+                if node_type == "orderedList":
+                    marker = f"{number}. "
+                    number += 1
+                elif node_type == "taskList":
+                    marker = "[x] " if item.get("attrs", {}).get("state") == "DONE" else "[ ] "
+                else:
+                    marker = "- "
+                item_lines: List[str] = []
+                if item.get("type") == "taskItem":
+                    item_lines.append(_adf_inline(item.get("content")))
+                else:
+                    _adf_blocks(item.get("content"), item_lines, "  ")
+                if not item_lines:
+                    continue
+                # The first line carries the marker; nested blocks are already indented
+                lines.append(indent + marker + item_lines[0].lstrip())
+                lines.extend(indent + line for line in item_lines[1:])
+        elif node_type == "codeBlock":
+            language = node.get("attrs", {}).get("language") or ""
+            lines.append(f"{indent}```{language}")
+            lines.extend(indent + line for line in _adf_inline(content).split("\n"))
+            lines.append(f"{indent}```")
+        elif node_type == "table":
+            for row_index, row in enumerate(content):
+                cells = []
+                for cell in row.get("content", ()):
+                    cell_lines: List[str] = []
+                    _adf_blocks(cell.get("content"), cell_lines)
+                    cells.append(" ".join(line.strip() for line in cell_lines).replace("|", "\\|"))
+                lines.append(indent + "| " + " | ".join(cells) + " |")
+                if row_index == 0 and all(cell.get("type") == "tableHeader" for cell in row.get("content", ())):
+                    lines.append(indent + "|" + " --- |" * len(cells))
+        elif node_type == "blockquote":
+            quoted: List[str] = []
+            _adf_blocks(content, quoted)
+            lines.extend(f"{indent}> {line}" for line in quoted)
+        elif node_type == "expand":
+            title = node.get("attrs", {}).get("title")
+            if title:
+                lines.append(indent + title)
+            _adf_blocks(content, lines, indent)
+        elif node_type == "rule":
+            lines.append(indent + "---")
+        elif node_type == "blockCard":
+            url = node.get("attrs", {}).get("url")
+            if url:
+                lines.append(indent + url)
+        elif node_type in ("mediaSingle", "mediaGroup", "media", "extension", "bodiedExtension"):
+            continue  # Attachments and macros carry nothing testable
+        elif node_type in _ADF_INLINE_ATTR or node_type in ("text", "hardBreak", "date"):
+            lines.append(indent + _adf_inline([node]))
+        else:
+            # doc, panel, layoutSection, layoutColumn, nestedExpand and unknown containers
+            _adf_blocks(content, lines, indent)
+
+
+def adf_to_text(document: Any) -> str:
+    """Convert an Atlassian Document Format tree (REST API v3) into compact Markdown.
+
+    Paragraphs, headings, lists, tables, code blocks, quotes, mentions, emoji,
+    dates, statuses and links are kept as text; media and macros are dropped.
+
+    Args:
+        document (Any): ADF document dict; strings (REST API v2) are returned unchanged
+
+    Returns:
+        str: Markdown text, empty for a missing description
+    """
+    if not document:
+        return ""
+    if isinstance(document, str):
+        return document
+    lines: List[str] = []
+    _adf_blocks([document], lines)
+    return "\n".join(lines)
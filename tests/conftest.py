@@ -0,0 +1,89 @@
+import os
+import sys
+import tempfile
+
+# Run against the local stub backend with throwaway cache and log locations
+_scratch = tempfile.mkdtemp(prefix="testcase-generator-")
+os.environ.setdefault("LLM_BACKEND", "stub")
+os.environ.setdefault("STUB_LATENCY", "0")
+os.environ.setdefault("STUB_TOKENS_PER_SECOND", "0")
+os.environ.setdefault("STUB_JITTER", "0")
+os.environ.setdefault("LLM_CACHE_DIR", os.path.join(_scratch, "llm"))
+# Off by default so the tests show that requests can still opt in
+os.environ.setdefault("GENERATION_INCREMENTAL", "false")
+os.environ.setdefault("LOG_FILE", os.path.join(_scratch, "app.log"))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def mongo_client():
+    """One in-memory MongoDB shared by every MongoHandler created during the tests."""
+    mongomock = pytest.importorskip("mongomock")
+    import utils.mongo_handler
+
+    client = mongomock.MongoClient()
+    original = utils.mongo_handler.MongoClient
+    utils.mongo_handler.MongoClient = lambda *args, **kwargs: client
+    yield client
+    utils.mongo_handler.MongoClient = original
+
+
+@pytest.fixture(scope="session")
+def app_module(mongo_client):
+    import app
+    return app
+
+
+@pytest.fixture
+def client(app_module, tmp_path, monkeypatch):
+    # Generated files are written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def stub_server():
+    """Start a local HTTP server answering with ``respond(method, path, body) -> (status, payload)``.
+
+    Returns a function taking ``respond`` and returning (base_url, requests), where
+    ``requests`` collects the (method, path, body) of every request received.
+    """
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    servers = []
+
+    def start(respond):
+        received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                received.append((self.command, self.path, body))
+                status, payload = respond(self.command, self.path, body)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = _handle
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}", received
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
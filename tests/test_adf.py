@@ -0,0 +1,74 @@
+from jira.jira_client import adf_to_text
+
+
+def text(value, **extra):
+    return {'type': 'text', 'text': value, **extra}
+
+
+def paragraph(*content):
+    return {'type': 'paragraph', 'content': list(content)}
+
+
+def item(*content):
+    return {'type': 'listItem', 'content': list(content)}
+
+
+def doc(*content):
+    return {'type': 'doc', 'version': 1, 'content': list(content)}
+
+
+def test_nested_lists_are_indented():
+    document = doc({'type': 'bulletList', 'content': [
+        item(paragraph(text('Roles')), {'type': 'orderedList', 'attrs': {'order': 3}, 'content': [
+            item(paragraph(text('Admin'))),
+            item(paragraph(text('Viewer')), {'type': 'bulletList', 'content': [item(paragraph(text('read only')))]})
+        ]}),
+        item(paragraph(text('Audit log')))
+    ]})
+
+    assert adf_to_text(document) == "\n".join([
+        "- Roles",
+        "  3. Admin",
+        "  4. Viewer",
+        "    - read only",
+        "- Audit log",
+    ])
+
+
+def test_tables_become_markdown_tables():
+    def cell(kind, value):
+        return {'type': kind, 'content': [paragraph(text(value))]}
+
+    document = doc({'type': 'table', 'content': [
+        {'type': 'tableRow', 'content': [cell('tableHeader', 'Field'), cell('tableHeader', 'Rule')]},
+        {'type': 'tableRow', 'content': [cell('tableCell', 'email'), cell('tableCell', 'a|b allowed')]}
+    ]})
+
+    assert adf_to_text(document) == "| Field | Rule |\n| --- | --- |\n| email | a\\|b allowed |"
+
+
+def test_code_blocks_keep_their_lines_and_language():
+    document = doc(
+        paragraph(text('Payload:')),
+        {'type': 'codeBlock', 'attrs': {'language': 'json'}, 'content': [text('{\n  "id": 1\n}')]}
+    )
+
+    assert adf_to_text(document) == 'Payload:\n```json\n{\n  "id": 1\n}\n```'
+
+
+def test_mentions_and_inline_marks():
+    document = doc(paragraph(
+        text('Ask '),
+        {'type': 'mention', 'attrs': {'id': '42', 'text': '@Jane Doe'}},
+        text(' to run '),
+        text('make test', marks=[{'type': 'code'}]),
+        text(', see '),
+        text('docs', marks=[{'type': 'link', 'attrs': {'href': 'https://example.com/docs'}}])
+    ))
+
+    assert adf_to_text(document) == "Ask @Jane Doe to run `make test`, see docs (https://example.com/docs)"
+
+
+def test_plain_strings_and_missing_descriptions():
+    assert adf_to_text("Already text") == "Already text"
+    assert adf_to_text(None) == ""
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+import utils.async_http as async_http  # noqa: E402
+
+
+def _run(handler, monkeypatch):
+    monkeypatch.setattr(async_http, "HTTP_BACKOFF_FACTOR", 0)
+    calls = []
+
+    def counting(request):
+        calls.append(request)
+        return handler(len(calls))
+
+    async def send():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(counting)) as client:
+            return await async_http.request_with_retries(client, "GET", "http://jira.test/rest")
+
+    return asyncio.run(send()), calls
+
+
+def test_connection_errors_are_left_to_the_transport(monkeypatch):
+    calls = []
+
+    def handler(attempt):
+        calls.append(attempt)
+        raise httpx.ConnectError("refused")
+
+    with pytest.raises(httpx.ConnectError):
+        _run(handler, monkeypatch)
+    assert calls == [1]
+
+
+def test_read_timeouts_and_retry_statuses_are_retried(monkeypatch):
+    def handler(attempt):
+        if attempt == 1:
+            raise httpx.ReadTimeout("slow")
+        if attempt == 2:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"ok": True})
+
+    response, calls = _run(handler, monkeypatch)
+
+    assert response.status_code == 200
+    assert len(calls) == 3
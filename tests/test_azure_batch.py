@@ -0,0 +1,100 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import azure_integration.azure_client as azure_client
+from azure_integration.azure_client import AzureClient, WORK_ITEM_FIELDS
+
+BATCH_PATH = '/org/project/_apis/wit/workitemsbatch?api-version=6.0'
+
+
+def _client(base_url):
+    return AzureClient({'url': base_url, 'org': 'org', 'project': 'project', 'pat': 'secret'})
+
+
+def _work_item(work_item_id):
+    return {
+        'id': work_item_id,
+        'rev': 3,
+        'fields': {'System.Title': f"Item {work_item_id}", 'System.Description': f"<p>Do <b>{work_item_id}</b></p>"}
+    }
+
+
+def _batch_server(stub_server, missing=()):
+    def respond(method, path, body):
+        assert (method, path) == ('POST', BATCH_PATH)
+        # errorPolicy=omit answers missing items with null
+        return 200, {'value': [None if work_item_id in missing else _work_item(work_item_id)
+                               for work_item_id in body['ids']]}
+    return stub_server(respond)
+
+
+def test_batches_never_exceed_200_ids(stub_server):
+    base_url, received = _batch_server(stub_server)
+    ids = [str(number) for number in range(1, 451)]
+
+    chunks = [chunk for chunk, _ in _client(base_url)._iter_batches(ids, ['System.Id'], batch_size=500)]
+
+    assert [len(chunk) for chunk in chunks] == [200, 200, 50]
+    assert [len(body['ids']) for _, _, body in received] == [200, 200, 50]
+    assert received[0][2]['ids'][:3] == [1, 2, 3]
+
+
+def test_batch_requests_ask_for_fields_and_omit_missing(stub_server):
+    base_url, received = _batch_server(stub_server)
+
+    list(_client(base_url)._iter_batches(['7', 'abc', ' 8 '], WORK_ITEM_FIELDS, batch_size=10))
+
+    assert received == [('POST', BATCH_PATH, {'ids': [7, 8], 'fields': WORK_ITEM_FIELDS, 'errorPolicy': 'omit'})]
+
+
+def test_work_items_are_yielded_in_order_without_missing_ones(stub_server):
+    base_url, _ = _batch_server(stub_server, missing={2})
+
+    work_items = list(_client(base_url).iter_work_items_batched(['3', '2', '1'], batch_size=2))
+
+    assert work_items == [
+        {'id': '3', 'title': 'Item 3', 'description': 'Do 3', 'rev': 3},
+        {'id': '1', 'title': 'Item 1', 'description': 'Do 1', 'rev': 3},
+    ]
+
+
+def test_failed_batches_are_skipped(stub_server):
+    def respond(method, path, body):
+        if 1 in body['ids']:
+            return 400, {'message': 'TF401232: Work item 1 does not exist'}
+        return 200, {'value': [_work_item(work_item_id) for work_item_id in body['ids']]}
+    base_url, _ = stub_server(respond)
+
+    work_items = list(_client(base_url).iter_work_items_batched(['1', '2'], batch_size=1))
+
+    assert [work_item['id'] for work_item in work_items] == ['2']
+
+
+def test_large_batches_are_cleaned_in_the_thread_pool(monkeypatch):
+    monkeypatch.setattr(azure_client, 'AZURE_HTML_WORKERS', 2)
+    monkeypatch.setattr(azure_client, 'AZURE_HTML_POOL_MIN', 5)
+    cleaned_by = set()
+    clean_html = azure_client.clean_html
+
+    def recording_clean_html(text):
+        cleaned_by.add(threading.current_thread().name)
+        return clean_html(text)
+
+    monkeypatch.setattr(azure_client, 'clean_html', recording_clean_html)
+    texts = [f"<p>Step <i>{number}</i></p>" for number in range(azure_client.AZURE_HTML_POOL_MIN)]
+    try:
+        cleaned = azure_client.clean_html_many(texts)
+        assert isinstance(azure_client._html_pool, ThreadPoolExecutor)
+    finally:
+        azure_client.shutdown_html_pool()
+
+    assert cleaned == [f"Step {number}" for number in range(5)]
+    assert cleaned_by and all(name.startswith('azure-html') for name in cleaned_by)
+    assert azure_client._html_pool is None
+
+
+def test_small_batches_are_cleaned_inline(monkeypatch):
+    monkeypatch.setattr(azure_client, 'AZURE_HTML_POOL_MIN', 5)
+
+    assert azure_client.clean_html_many(["<b>a</b>", "<i>b</i>"]) == ["a", "b"]
+    assert azure_client._html_pool is None
@@ -0,0 +1,29 @@
+import os
+
+from ai.backends import StubClient
+from config.settings import MONGODB_DB
+from ai.batch import ingest_batch_results, load_manifest, manifest_path_for, run_batch_locally, write_batch_requests
+
+ITEMS = [
+    {'item_id': 'KAN-1', 'summary': 'Login', 'description': 'Users log in with their email and password.'},
+    {'item_id': 'KAN-2', 'summary': 'Export', 'description': 'Admins export the monthly report as CSV.'},
+]
+
+
+def test_prepare_answer_and_ingest_end_to_end(tmp_path, monkeypatch, mongo_client):
+    # Test case files are written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    request_path = str(tmp_path / "nightly.jsonl")
+    result_path = str(tmp_path / "nightly.results.jsonl")
+
+    manifest = write_batch_requests(ITEMS, ['dashboard_functional'], request_path, source_type='jira')
+    answered = run_batch_locally(request_path, result_path, answer_client=StubClient(latency=0, tokens_per_second=0))
+    outcomes = ingest_batch_results(result_path, load_manifest(manifest_path_for(request_path)))
+
+    assert manifest['request_count'] == answered > 0
+    assert set(outcomes) == {'KAN-1', 'KAN-2'}
+    for item_id, outcome in outcomes.items():
+        assert outcome['error'] is None and not outcome['missing_types']
+        assert all(os.path.exists(os.path.join('tests', 'generated', name)) for name in outcome['files'].values())
+        record = mongo_client[MONGODB_DB].test_cases.find_one({'url_key': outcome['url_key']})
+        assert record['test_data']['item_ids'] == [item_id] and record['test_data']['test_cases']
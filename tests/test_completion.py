@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import openai
+import pytest
+
+import ai.completion as completion
+from ai.rate_limiter import RateLimiter
+
+
+def _chunk(content=None, finish_reason=None, usage=None):
+    choices = [] if usage else [SimpleNamespace(delta=SimpleNamespace(content=content), finish_reason=finish_reason)]
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+class _StreamingClient:
+    """Rate-limited client whose first stream breaks after one piece of text."""
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+        self.in_flight_while_reading = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.calls = 0
+
+    def create(self, stream=False, **request):
+        self.calls += 1
+        attempt = self.calls
+        assert stream and request["stream_options"] == {"include_usage": True}
+
+        def chunks():
+            yield _chunk("Title: first ")
+            self.in_flight_while_reading.append(self.limiter.stats()["in_flight"])
+            if attempt == 1:
+                raise openai.APIConnectionError(request=None)
+            yield _chunk("answer", "stop")
+            yield _chunk(usage=SimpleNamespace(total_tokens=40, prompt_tokens=30, completion_tokens=10))
+        return chunks()
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=100000, headroom=1.0,
+                          max_retries=2, backoff_base=0, backoff_max=0)
+    monkeypatch.setattr(completion, "rate_limiter", limiter)
+    return limiter
+
+
+def test_stream_holds_its_reservation_and_retries_mid_stream_errors(limiter):
+    client = _StreamingClient(limiter)
+    deltas = []
+    retries = []
+
+    response = completion.stream_chat_completion(
+        client, deltas.append, use_cache=False, on_retry=lambda: retries.append(len(deltas)),
+        model="gpt-4o", messages=[{"role": "user", "content": "x" * 400}], max_tokens=1000
+    )
+
+    assert response["content"] == "Title: first answer"
+    assert client.in_flight_while_reading == [1, 1]
+    assert retries == [1]
+    stats = limiter.stats()
+    assert stats["in_flight"] == 0 and stats["retries"] == 1
+    # The failed attempt keeps its 1100 token reservation (100 prompt + 1000 max tokens);
+    # the successful one is refunded down to the 40 tokens it used
+    assert limiter.tokens.capacity - 1100 - 100 < stats["tokens_available"] < limiter.tokens.capacity - 1100
@@ -0,0 +1,25 @@
+from utils.event_stream import EventBroker
+
+
+def test_subscribing_to_an_unknown_stream_does_not_register_it():
+    broker = EventBroker()
+
+    assert list(broker.subscribe("unknown", heartbeat=0.01)) == []
+    assert not broker.exists("unknown")
+
+
+def test_opened_streams_replay_events_until_closed():
+    broker = EventBroker()
+    broker.open("job-1")
+    broker.publish("job-1", "test_case", {"title": "TC_01"})
+    broker.close("job-1")
+
+    assert list(broker.subscribe("job-1", heartbeat=0.01)) == [
+        'event: test_case\ndata: {"title": "TC_01"}\n\n'
+    ]
+
+
+def test_unknown_streams_return_404(client):
+    response = client.get('/api/generation-stream/does-not-exist')
+
+    assert response.status_code == 404
@@ -0,0 +1,52 @@
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from utils import file_handler
+
+CORPUS = sorted((Path(__file__).parent / 'fixtures' / 'llm_outputs').glob('*.txt'))
+
+
+def _load(path):
+    return path.read_text(encoding='utf-8'), json.loads(path.with_suffix('.json').read_text(encoding='utf-8'))
+
+
+def _feed(text, chunk_sizes):
+    parser = file_handler.TestCaseStreamParser()
+    test_cases, start = [], 0
+    while start < len(text):
+        size = next(chunk_sizes)
+        test_cases.extend(parser.feed(text[start:start + size]))
+        start += size
+    return test_cases + parser.close()
+
+
+@pytest.mark.parametrize('path', CORPUS, ids=lambda path: path.stem)
+def test_whole_text_matches_expected_records(path):
+    text, expected = _load(path)
+
+    assert file_handler.parse_traditional_format(text) == expected
+
+
+@pytest.mark.parametrize('path', CORPUS, ids=lambda path: path.stem)
+def test_chunked_feed_matches_expected_records(path):
+    text, expected = _load(path)
+    rng = random.Random(path.stem)
+
+    assert _feed(text, iter(lambda: 1, None)) == expected
+    for _ in range(50):
+        assert _feed(text, iter(lambda: rng.randint(1, 80), None)) == expected
+
+
+def test_test_case_is_returned_when_the_next_title_starts():
+    parser = file_handler.TestCaseStreamParser(default_section='dashboard_functional')
+
+    assert parser.feed("Title: TC_FUNC_01_First\nScenario: First\nSteps to reproduce:\n1. Open") == []
+    # The title line only counts once its newline arrives
+    assert parser.feed(" the page\nTitle: TC_FUNC_02_Sec") == []
+    assert parser.feed("ond\nScenario: Sec") == [{'Section': 'dashboard_functional', 'Title': 'TC_FUNC_01_First',
+                                                   'Scenario': 'First', 'Steps': ['Open the page']}]
+    assert parser.close() == [{'Section': 'dashboard_functional', 'Title': 'TC_FUNC_02_Second', 'Scenario': 'Sec'}]
+    assert parser.close() == []
@@ -0,0 +1,40 @@
+import re
+
+import ai.generator as generator
+
+
+def _test_case(number):
+    return (f"Title: TC_FUNC_{number:02d}_Check\n"
+            f"Scenario: Scenario {number}\n"
+            f"Steps to reproduce:\n1. Open the page\n"
+            f"Expected Result: Page {number} is shown\n"
+            f"Priority: High")
+
+
+def test_chunking_is_off_by_default():
+    assert generator.GENERATION_CHUNK_SIZE == 0
+    assert generator.plan_chunks(20) == [(20, 1)]
+    assert generator.plan_chunks(20, 10) == [(10, 1), (10, 11)]
+
+
+def test_truncated_answer_is_continued_without_chunking(monkeypatch):
+    requested = []
+
+    def fake_completion(client, use_cache=True, **request):
+        prompt = request['messages'][-1]['content']
+        count = int(re.search(r'EXACTLY (\d+) test cases', prompt).group(1))
+        requested.append(count)
+        if len(requested) == 1:
+            # Cut off by the token limit after 12 complete test cases
+            text = "\n\n".join(_test_case(number) for number in range(1, 13)) + "\n\nTitle: TC_FUNC_13_Ch"
+            return {'content': text, 'finish_reason': 'length'}
+        text = "\n\n".join(_test_case(number) for number in range(13, 21))
+        return {'content': text, 'finish_reason': 'stop'}
+
+    monkeypatch.setattr(generator, 'create_chat_completion', fake_completion)
+
+    result = generator._generate_for_type('dashboard_functional', 'Users log in.', 'Login', use_cache=False)
+
+    assert requested == [20, 8]
+    assert result.count('Title: TC_FUNC_') == 20
+    assert 'TC_FUNC_13_Ch\n' not in result
@@ -0,0 +1,38 @@
+import base64
+from io import BytesIO
+
+from PIL import Image
+
+from ai.image_prep import EXIF_ORIENTATION, prepare_image
+
+
+def _jpeg(path, size, orientation=None):
+    image = Image.effect_noise(size, 80).convert("RGB")
+    options = {}
+    if orientation is not None:
+        exif = Image.Exif()
+        exif[EXIF_ORIENTATION] = orientation
+        options["exif"] = exif.tobytes()
+    image.save(path, format="JPEG", quality=20, **options)
+    return path
+
+
+def _decoded_size(prepared):
+    with Image.open(BytesIO(base64.b64decode(prepared.base64_data))) as image:
+        return image.size
+
+
+def test_rotated_original_is_reencoded_upright(tmp_path):
+    # Orientation 6: stored landscape, displayed rotated 90 degrees to portrait
+    prepared = prepare_image(str(_jpeg(tmp_path / "rotated.jpg", (40, 20), orientation=6)), max_edge=0)
+
+    assert (prepared.width, prepared.height) == (20, 40)
+    assert _decoded_size(prepared) == (20, 40)
+
+
+def test_small_upright_original_is_sent_unchanged(tmp_path):
+    path = _jpeg(tmp_path / "upright.jpg", (40, 20))
+    prepared = prepare_image(str(path), max_edge=0, quality=95)
+
+    assert base64.b64decode(prepared.base64_data) == path.read_bytes()
+    assert _decoded_size(prepared) == (40, 20)
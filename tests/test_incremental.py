@@ -0,0 +1,25 @@
+SOURCE = {'summary': 'Login', 'description': 'Users log in with their email address and password.'}
+
+
+def _generate(client, **extra):
+    response = client.post('/api/generate', json={
+        'sourceType': 'jira',
+        'itemId': ['KAN-1'],
+        'testCaseTypes': ['dashboard_functional'],
+        **extra
+    })
+    assert response.status_code == 200, response.json
+    return response.json
+
+
+def test_request_can_opt_in_when_incremental_is_off_by_default(app_module, client, monkeypatch):
+    assert app_module.GENERATION_INCREMENTAL is False
+    monkeypatch.setattr(app_module, 'iter_source_items',
+                        lambda source_type, item_ids, config: ((item_id, dict(SOURCE)) for item_id in item_ids))
+
+    first = _generate(client, incremental=True)
+    second = _generate(client, incremental=True)
+    default = _generate(client)
+
+    assert second['reused'] and second['url_key'] == first['url_key']
+    assert 'reused' not in default
@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.item_pipeline import ItemPipeline
+
+
+def _wait(pipeline, timeout=5):
+    # Run wait() on a helper thread so a hanging pipeline fails the test instead of blocking it
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(pipeline.wait).result(timeout=timeout)
+
+
+def _pipeline(**stages):
+    options = dict(
+        fetch=lambda item_id: {'summary': item_id, 'description': 'text'},
+        generate=lambda item_id, source: f"Title: {item_id}",
+        save=lambda item_id, test_cases: {'txt': f"{item_id}.txt"},
+        max_items=2
+    )
+    options.update(stages)
+    return ItemPipeline(**options)
+
+
+def test_items_flow_through_all_stages():
+    with _pipeline() as pipeline:
+        for item_id in ("A-1", "A-2", "A-3"):
+            pipeline.submit(item_id)
+        outcomes = _wait(pipeline)
+
+    assert list(outcomes) == ["A-1", "A-2", "A-3"]
+    assert all(outcome['files'] and not outcome['error'] for outcome in outcomes.values())
+
+
+def test_malformed_lookup_result_falls_back_to_generation():
+    with _pipeline(lookup=lambda item_id, source: {'files': {}}) as pipeline:
+        pipeline.submit_fetched("A-1", {'summary': 's', 'description': 'd'})
+        outcome = _wait(pipeline)["A-1"]
+
+    assert outcome['test_cases'] == "Title: A-1"
+    assert not outcome['reused'] and not outcome['error']
+
+
+def test_failed_hand_off_finishes_the_item():
+    pipeline = _pipeline()
+    pipeline._save_pool.shutdown()
+    pipeline.submit("A-1")
+    outcome = _wait(pipeline)["A-1"]
+    pipeline.shutdown()
+
+    assert outcome['error'].startswith("generation failed")
+
+
+def test_submit_to_a_closed_pipeline_releases_its_slot():
+    pipeline = _pipeline(max_items=1)
+    pipeline.shutdown()
+
+    with pytest.raises(RuntimeError):
+        pipeline.submit("A-1")
+
+    assert _wait(pipeline)["A-1"]['error'].startswith("queueing failed")
+    assert pipeline._slots.acquire(timeout=1)
@@ -0,0 +1,93 @@
+import pytest
+
+from jira.jira_client import JiraSearchError, search_issues, search_jql
+
+
+def _config(base_url):
+    return {'url': base_url, 'user': 'qa@example.com', 'token': 'secret'}
+
+
+def _issue(number):
+    return {'key': f"KAN-{number}", 'fields': {'summary': f"Issue {number}", 'updated': '2024-05-01T10:00:00.000+0000'}}
+
+
+def _paged_search(total, page_size):
+    def respond(method, path, body):
+        assert (method, path) == ('POST', '/rest/api/3/search/jql')
+        start = int(body.get('nextPageToken') or 0)
+        end = min(total, start + body['maxResults'])
+        page = {'issues': [_issue(number) for number in range(start, end)], 'isLast': end >= total}
+        if end < total:
+            page['nextPageToken'] = str(end)
+        return 200, page
+    return respond
+
+
+def test_pages_are_followed_with_next_page_token(stub_server):
+    base_url, received = stub_server(_paged_search(total=5, page_size=2))
+
+    issues = list(search_jql("project = KAN", _config(base_url), page_size=2))
+
+    assert [issue['key'] for issue in issues] == [f"KAN-{number}" for number in range(5)]
+    assert [body.get('nextPageToken') for _, _, body in received] == [None, '2', '4']
+    assert all(body['jql'] == "project = KAN" and body['maxResults'] == 2 for _, _, body in received)
+
+
+def test_pages_are_fetched_lazily(stub_server):
+    base_url, received = stub_server(_paged_search(total=10, page_size=2))
+
+    results = search_jql("project = KAN", _config(base_url), page_size=2)
+    next(results)
+    next(results)
+
+    assert len(received) == 1
+
+
+def test_only_requested_fields_are_asked_for(stub_server):
+    base_url, received = stub_server(_paged_search(total=1, page_size=5))
+
+    list(search_jql("project = KAN", _config(base_url), fields=('updated',)))
+
+    assert received[0][2]['fields'] == ['updated']
+
+
+def test_rejected_query_raises_with_jiras_message(stub_server):
+    base_url, _ = stub_server(lambda method, path, body: (
+        400, {'errorMessages': ["Field 'sprnt' does not exist or you do not have permission to view it."]}
+    ))
+
+    with pytest.raises(JiraSearchError, match="sprnt"):
+        list(search_jql("sprnt = 1", _config(base_url)))
+
+
+def test_authentication_errors_raise(stub_server):
+    base_url, _ = stub_server(lambda method, path, body: (401, {'errorMessages': ["Unauthorized"]}))
+
+    with pytest.raises(JiraSearchError, match="401"):
+        list(search_jql("project = KAN", _config(base_url)))
+
+
+def test_key_searches_skip_rejected_chunks(stub_server):
+    def respond(method, path, body):
+        if 'KAN-404' in body['jql']:
+            return 400, {'errorMessages': ["An issue with key 'KAN-404' does not exist."]}
+        return 200, {'issues': [_issue(1)], 'isLast': True}
+    base_url, _ = stub_server(respond)
+
+    issues = list(search_issues(['KAN-404', 'KAN-1'], _config(base_url), page_size=1))
+
+    assert [issue['key'] for issue in issues] == ['KAN-1']
+
+
+def test_query_errors_reach_the_generate_response(client, stub_server):
+    base_url, _ = stub_server(lambda method, path, body: (400, {'errorMessages': ["Error in the JQL Query"]}))
+
+    response = client.post('/api/generate', json={
+        'sourceType': 'jira',
+        'query': 'project = = KAN',
+        'testCaseTypes': ['dashboard_functional'],
+        'jira_config': _config(base_url)
+    })
+
+    assert response.status_code == 400
+    assert "Error in the JQL Query" in response.json['error']
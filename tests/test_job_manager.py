@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+import threading
+import time
+import uuid
+
+from utils.job_manager import JobManager, JobStore, JOB_FAILED, JOB_RUNNING, JOB_SUCCEEDED
+
+
+def _age(store, job_id, seconds):
+    store.collection.update_one({"_id": job_id},
+                                {"$set": {"updated_at": datetime.utcnow() - timedelta(seconds=seconds)}})
+
+
+def test_running_job_without_heartbeat_is_failed_on_read(mongo_client):
+    store = JobStore(stale_after=60)
+    job_id = str(uuid.uuid4())
+    store.create(job_id, {})
+    store.mark_running(job_id)
+    _age(store, job_id, 120)
+
+    job = store.get(job_id)
+
+    assert job["state"] == JOB_FAILED
+    assert "heartbeat" in job["error"]
+
+
+def test_stale_jobs_are_failed_at_startup(mongo_client):
+    store = JobStore(stale_after=60)
+    job_id = str(uuid.uuid4())
+    store.create(job_id, {})
+    _age(store, job_id, 120)
+
+    manager = JobManager(store=store, max_workers=1, heartbeat_interval=3600)
+    manager.shutdown()
+
+    assert store.collection.find_one({"_id": job_id})["state"] == JOB_FAILED
+
+
+def test_heartbeat_keeps_long_running_job_alive(mongo_client):
+    store = JobStore(stale_after=60)
+    manager = JobManager(store=store, max_workers=1, heartbeat_interval=0.01)
+    release = threading.Event()
+    started = threading.Event()
+
+    def runner(params):
+        started.set()
+        release.wait(5)
+        return {"url_key": "key", "files": []}, 200
+
+    job_id = manager.submit(runner, {})
+    assert started.wait(5)
+    _age(store, job_id, 120)
+    deadline = datetime.utcnow() + timedelta(seconds=5)
+    while store.collection.find_one({"_id": job_id})["updated_at"] < datetime.utcnow() - timedelta(seconds=60):
+        assert datetime.utcnow() < deadline
+        time.sleep(0.01)
+
+    assert store.get(job_id)["state"] == JOB_RUNNING
+    release.set()
+    manager.shutdown()
+    assert store.get(job_id)["state"] == JOB_SUCCEEDED
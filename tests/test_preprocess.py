@@ -0,0 +1,64 @@
+import ai.preprocess as preprocess
+from ai.preprocess import normalize_description
+
+
+def test_repeated_gherkin_steps_are_kept():
+    description = "\n".join([
+        "Scenario: admin login",
+        "Given the user is on the login page with valid credentials",
+        "When the user submits the login form",
+        "Then the dashboard is shown to the user",
+        "",
+        "Scenario: viewer login",
+        "Given the user is on the login page with valid credentials",
+        "When the user submits the login form",
+        "Then the dashboard is shown to the user",
+    ])
+
+    lines = normalize_description(description).split("\n")
+
+    assert lines.count("Given the user is on the login page with valid credentials") == 2
+    assert lines.count("When the user submits the login form") == 2
+    assert lines[-1] == "Then the dashboard is shown to the user"
+
+
+def test_consecutive_duplicates_and_separators_are_dropped():
+    description = "The export must include the header row\nThe export must include the header row\n|---|---|\n\n\n\nDone"
+
+    assert normalize_description(description) == "The export must include the header row\n\nDone"
+
+
+def test_fenced_json_is_kept_whole():
+    payload = ["{", '  "name": "Jane",', '  "roles": ["admin"],', '  "active": true,',
+               '  "limits": {"daily": 10},', '  "tags": []', "}"]
+    description = "\n".join(["Request body:", "```json", *payload, "```"])
+
+    assert normalize_description(description, log_lines=2) == description
+
+
+def test_fenced_logs_are_truncated():
+    logs = [f"2024-05-01 10:00:0{idx} ERROR request failed" for idx in range(8)]
+    description = "\n".join(["Seen in production:", "```", *logs, "```", "Fix it"])
+
+    result = normalize_description(description, log_lines=2).split("\n")
+
+    assert result == ["Seen in production:", logs[0], logs[1], "[... 6 lines omitted]", "Fix it"]
+
+
+def test_failed_digest_is_retried_and_respects_use_cache(monkeypatch):
+    calls = []
+    answers = [RuntimeError("temporary outage"), {"content": "Condensed", "finish_reason": "stop"}]
+
+    def fake_completion(client, use_cache=True, **request):
+        calls.append(use_cache)
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    monkeypatch.setattr(preprocess, "create_chat_completion", fake_completion)
+    description = "Requirement details for the report export. " * 50
+
+    assert preprocess.prepare_description(description, digest_threshold=10) != "Condensed"
+    assert preprocess.prepare_description(description, digest_threshold=10, use_cache=False) == "Condensed"
+    assert calls == [True, False]
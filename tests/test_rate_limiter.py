@@ -0,0 +1,32 @@
+from ai.rate_limiter import RateLimiter, parse_reset_duration
+
+
+def _limiter():
+    return RateLimiter(requests_per_minute=1000, tokens_per_minute=10000, headroom=1.0)
+
+
+def test_capacity_follows_the_reported_limit_both_ways():
+    limiter = _limiter()
+
+    limiter.update_from_headers({"x-ratelimit-limit-tokens": "2000"})
+    assert limiter.tokens.capacity == 2000
+    assert limiter.tokens.available <= 2000
+
+    limiter.update_from_headers({"x-ratelimit-limit-tokens": "50000"})
+    assert limiter.tokens.capacity == 50000
+
+
+def test_available_is_never_negative():
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=10000, headroom=0.5)
+
+    limiter.update_from_headers({"x-ratelimit-limit-tokens": "10000", "x-ratelimit-remaining-tokens": "1000"})
+
+    assert limiter.tokens.available == 0
+    # Waiting for the reservation never takes longer than one full window
+    assert limiter.tokens.wait_time(10 ** 6) <= 60
+
+
+def test_parse_reset_duration():
+    assert parse_reset_duration("6m0s") == 360
+    assert parse_reset_duration("20ms") == 0.02
+    assert parse_reset_duration(None) is None
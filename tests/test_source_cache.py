@@ -0,0 +1,128 @@
+from types import SimpleNamespace
+
+import pytest
+
+import utils.source_cache
+import utils.sources
+from utils.source_cache import SourceCache
+from utils.sources import fetch_source_item
+
+BATCH_PATH = '/org/project/_apis/wit/workitemsbatch?api-version=6.0'
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = SourceCache(ttl=60, max_items=2)
+    monkeypatch.setattr(utils.sources, 'source_cache', cache)
+    return cache
+
+
+@pytest.fixture
+def azure(stub_server):
+    """Azure DevOps stub whose work item revisions can be bumped; returns (config, revisions, received)."""
+    revisions = {7: 1, 8: 1, 9: 1}
+
+    def respond(method, path, body):
+        if method == 'POST' and path == BATCH_PATH:
+            assert body['fields'] == ['System.Id', 'System.Rev']
+            return 200, {'value': [{'id': work_item_id, 'rev': revisions[work_item_id]} for work_item_id in body['ids']]}
+        work_item_id = int(path.split('/workitems/')[1].split('?')[0])
+        rev = revisions[work_item_id]
+        return 200, {'id': work_item_id, 'rev': rev, 'fields': {
+            'System.Title': f"Work item {work_item_id}",
+            'System.Description': f"<p>Revision <b>{rev}</b></p>"
+        }}
+
+    base_url, received = stub_server(respond)
+    config = {'azure_config': {'url': base_url, 'org': 'org', 'project': 'project', 'pat': 'secret'}}
+    return config, revisions, received
+
+
+def _requests(received):
+    """Return and forget the requests made so far: revision checks and full fetches."""
+    requests = ['check' if path == BATCH_PATH else 'fetch' for _, path, _ in received]
+    received.clear()
+    return requests
+
+
+def test_unchanged_revision_is_a_hit(cache, azure):
+    config, _, received = azure
+
+    first = fetch_source_item('azure', '7', config)
+    assert _requests(received) == ['fetch']
+    second = fetch_source_item('azure', '7', config)
+
+    assert second == first == {'summary': 'Work item 7', 'description': 'Revision 1'}
+    assert _requests(received) == ['check']
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['stores']) == (1, 1, 1)
+    assert stats['hit_rate'] == 0.5
+
+
+def test_changed_revision_is_fetched_again(cache, azure):
+    config, revisions, received = azure
+    fetch_source_item('azure', '7', config)
+    received.clear()
+
+    revisions[7] = 2
+    source = fetch_source_item('azure', '7', config)
+
+    assert source['description'] == 'Revision 2'
+    assert _requests(received) == ['check', 'fetch']
+    assert cache.stats()['changed'] == 1
+    assert cache.get(SourceCache.make_key('azure', '7', config['azure_config']))['revision'] == '2'
+
+
+def test_changed_jira_updated_is_fetched_again(cache, stub_server):
+    issue = {'updated': '2024-05-01T10:00:00.000+0000', 'summary': 'Login'}
+
+    def respond(method, path, body):
+        assert path.startswith('/rest/api/3/issue/KAN-1')
+        if path.endswith('?fields=updated'):
+            return 200, {'key': 'KAN-1', 'fields': {'updated': issue['updated']}}
+        return 200, {'key': 'KAN-1', 'fields': {'summary': issue['summary'], 'description': None,
+                                                 'updated': issue['updated']}}
+
+    base_url, received = stub_server(respond)
+    config = {'jira_config': {'url': base_url, 'user': 'qa@example.com', 'token': 'secret'}}
+    fetch_source_item('jira', 'KAN-1', config)
+    assert fetch_source_item('jira', 'KAN-1', config)['summary'] == 'Login'
+
+    issue.update(updated='2024-05-02T09:00:00.000+0000', summary='Login with SSO')
+    received.clear()
+
+    assert fetch_source_item('jira', 'KAN-1', config)['summary'] == 'Login with SSO'
+    assert [path for _, path, _ in received] == ['/rest/api/3/issue/KAN-1?fields=updated', '/rest/api/3/issue/KAN-1']
+    assert (cache.stats()['hits'], cache.stats()['changed']) == (1, 1)
+
+
+def test_entries_expire_after_the_ttl(cache, azure, monkeypatch):
+    config, _, received = azure
+    now = [1000.0]
+    monkeypatch.setattr(utils.source_cache, 'time', SimpleNamespace(time=lambda: now[0]))
+    fetch_source_item('azure', '7', config)
+    received.clear()
+
+    now[0] += cache.ttl + 1
+    fetch_source_item('azure', '7', config)
+
+    # The expired entry is not revision-checked, the item is downloaded again
+    assert _requests(received) == ['fetch']
+    stats = cache.stats()
+    assert (stats['expired'], stats['misses'], stats['hits']) == (1, 2, 0)
+    assert stats['entries'] == 1
+
+
+def test_least_recently_used_entry_is_evicted_at_max_items(cache, azure):
+    config, _, received = azure
+    fetch_source_item('azure', '7', config)
+    fetch_source_item('azure', '8', config)
+    fetch_source_item('azure', '7', config)  # 8 is now the least recently used
+    fetch_source_item('azure', '9', config)
+    received.clear()
+
+    assert cache.stats()['entries'] == cache.max_items == 2
+    fetch_source_item('azure', '7', config)
+    assert _requests(received) == ['check']
+    fetch_source_item('azure', '8', config)
+    assert _requests(received) == ['fetch']
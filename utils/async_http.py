@@ -0,0 +1,109 @@
+"""Pooled ``httpx.AsyncClient`` instances for the asyncio Jira and Azure DevOps clients.
+
+The async counterpart of ``utils.http_session``: one client per server and
+credentials, with bounded keep-alive pools, default timeouts and retries of
+connection errors, read timeouts and 429/5xx responses. Clients belong to the event loop they
+are used on, so a pool is opened per loop with ``async with AsyncClientPool()``.
+"""
+from typing import Dict, Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import random
+
+import httpx
+
+from config.settings import (
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR, ASYNC_HTTP_MAX_CONNECTIONS
+)
+from utils.http_session import RETRY_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# Failures after the connection was made; connection failures are retried by the transport
+RETRY_TIMEOUTS = (httpx.ReadTimeout, httpx.WriteTimeout, httpx.PoolTimeout)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+async def request_with_retries(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request, retrying read/write/pool timeouts and 429/5xx responses with exponential backoff.
+
+    Connection failures are not retried here, since the pooled clients' transport
+    already retries them.
+
+    The last response is returned once the retries are used up, like the sync
+    sessions do, so callers check the status code themselves.
+    """
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        try:
+            response = await client.request(method, url, **kwargs)
+        except RETRY_TIMEOUTS as e:
+            if attempt >= HTTP_MAX_RETRIES:
+                raise
+            logger.warning(f"{type(e).__name__} on {method} {url}, retrying")
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt >= HTTP_MAX_RETRIES:
+                return response
+            await response.aclose()
+            delay = _retry_after(response)
+            if delay is not None:
+                await asyncio.sleep(delay)
+                continue
+        delay = HTTP_BACKOFF_FACTOR * (2 ** attempt)
+        await asyncio.sleep(delay / 2 + random.uniform(0, delay / 2))
+    raise RuntimeError("unreachable")
+
+
+class AsyncClientPool:
+    """Async HTTP clients shared per server and credentials within one event loop."""
+
+    def __init__(self, max_connections: int = ASYNC_HTTP_MAX_CONNECTIONS):
+        self.max_connections = max_connections
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def get(self, base_url: str, auth: Optional[Tuple[str, str]] = None,
+            headers: Optional[Dict[str, str]] = None) -> httpx.AsyncClient:
+        """Return the pooled client for ``base_url`` and the given credentials.
+
+        Args:
+            base_url (str): Server URL the client is used for
+            auth (Optional[Tuple[str, str]]): Basic auth (user, password) sent with every request
+            headers (Optional[Dict[str, str]]): Headers sent with every request
+
+        Returns:
+            httpx.AsyncClient: Client with default timeouts and a bounded connection pool
+        """
+        raw = repr((base_url.rstrip("/"), auth, sorted((headers or {}).items())))
+        key = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+        client = self._clients.get(key)
+        if client is None:
+            client = httpx.AsyncClient(
+                auth=auth,
+                headers=headers,
+                timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+                # Connection failures are retried by the transport, statuses by request_with_retries
+                transport=httpx.AsyncHTTPTransport(retries=HTTP_MAX_RETRIES)
+            )
+            self._clients[key] = client
+            logger.info(f"Opened async HTTP client for {base_url}")
+        return client
+
+    async def close(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
@@ -0,0 +1,101 @@
+from threading import Condition
+from typing import Any, Dict, Iterator
+import json
+import logging
+import time
+
+from config.settings import EVENT_STREAM_RETENTION, EVENT_STREAM_HEARTBEAT
+
+logger = logging.getLogger(__name__)
+
+
+class EventBroker:
+    """In-process publish/subscribe hub backing the Server-Sent Events endpoint.
+
+    Events are kept per stream id so a subscriber that connects late (for example
+    after a page redirect) first receives everything published so far. Streams are
+    registered with ``open`` (or their first event) and dropped ``retention`` seconds
+    after their last event; subscribing never creates one.
+    """
+
+    def __init__(self, retention: int = EVENT_STREAM_RETENTION):
+        self.retention = retention
+        self._streams: Dict[str, Dict[str, Any]] = {}
+        self._condition = Condition()
+
+    def open(self, stream_id: str) -> None:
+        """Register a stream so it can be subscribed to before its first event."""
+        if not stream_id:
+            return
+        with self._condition:
+            self._expire()
+            self._get_or_create(stream_id)
+
+    def exists(self, stream_id: str) -> bool:
+        with self._condition:
+            self._expire()
+            return stream_id in self._streams
+
+    def publish(self, stream_id: str, event: str, data: Dict[str, Any]) -> None:
+        if not stream_id:
+            return
+        with self._condition:
+            self._expire()
+            stream = self._get_or_create(stream_id)
+            stream['events'].append((event, data))
+            stream['updated_at'] = time.time()
+            self._condition.notify_all()
+
+    def close(self, stream_id: str) -> None:
+        """Mark a stream as finished; subscribers stop after replaying its events."""
+        if not stream_id:
+            return
+        with self._condition:
+            stream = self._get_or_create(stream_id)
+            stream['closed'] = True
+            stream['updated_at'] = time.time()
+            self._condition.notify_all()
+
+    def subscribe(self, stream_id: str, heartbeat: int = EVENT_STREAM_HEARTBEAT) -> Iterator[str]:
+        """Yield SSE-formatted messages for a stream until it is closed.
+
+        A comment line is sent every ``heartbeat`` seconds without events so proxies
+        keep the connection open. Unknown streams end right away; the subscription
+        also ends once the stream has been idle for ``retention``.
+        """
+        position = 0
+        while True:
+            with self._condition:
+                stream = self._streams.get(stream_id)
+                if stream is None:
+                    return  # Unknown, or expired while we were reading it
+                if time.time() - stream['updated_at'] > self.retention:
+                    return
+                if position >= len(stream['events']) and not stream['closed']:
+                    self._condition.wait(timeout=heartbeat)
+                events = stream['events'][position:]
+                position += len(events)
+                closed = stream['closed'] and position >= len(stream['events'])
+
+            if not events and not closed:
+                yield ": keep-alive\n\n"
+            for event, data in events:
+                yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+            if closed:
+                return
+
+    def _get_or_create(self, stream_id: str) -> Dict[str, Any]:
+        stream = self._streams.get(stream_id)
+        if stream is None:
+            stream = {'events': [], 'closed': False, 'updated_at': time.time()}
+            self._streams[stream_id] = stream
+        return stream
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.retention
+        for stream_id in [key for key, stream in self._streams.items() if stream['updated_at'] < cutoff]:
+            del self._streams[stream_id]
+
+
+# Shared broker for the application
+event_broker = EventBroker()
@@ -1,5 +1,5 @@
 import os
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Union
 import logging
 import pandas as pd
 import re
@@ -39,11 +39,12 @@ def save_test_script(content: str, base_name: str) -> Optional[str]:
         print(f"❌ Error saving file {filename}: {e}")
         return None
 
-def save_excel_report(test_cases: str, base_name: str) -> Optional[str]:
+def save_excel_report(test_cases: Union[str, List[Dict]], base_name: str) -> Optional[str]:
     """Save test cases to Excel file.
 
     Args:
-        test_cases (str): Test cases content to write to Excel
+        test_cases (Union[str, List[Dict]]): Test cases content to write to Excel, or
+            already structured test case records
         base_name (str): Base name for the file
 
     Returns:
@@ -60,20 +61,8 @@ def save_excel_report(test_cases: str, base_name: str) -> Optional[str]:
     filepath = os.path.join(output_dir, filename)
 
     try:
-        # First, check for TEST TYPE section markers
-        sections = extract_test_type_sections(test_cases)
-        
-        # If no explicit TEST TYPE sections found, use traditional parsing
-        if not sections:
-            logger.info("No TEST TYPE sections found, using traditional parsing")
-            test_data = parse_traditional_format(test_cases)
-        else:
-            # Parse each section separately
-            logger.info(f"Found {len(sections)} TEST TYPE sections")
-            test_data = []
-            for section_name, section_content in sections.items():
-                section_data = parse_traditional_format(section_content, default_section=section_name)
-                test_data.extend(section_data)
+        # Structured records are written as they are, text is parsed first
+        test_data = test_cases if isinstance(test_cases, list) else parse_test_cases(test_cases)
 
         # Convert to DataFrame
         df = pd.DataFrame(test_data) if test_data else pd.DataFrame()
@@ -142,6 +131,110 @@ def save_excel_report(test_cases: str, base_name: str) -> Optional[str]:
         print(f"❌ Error saving Excel report: {e}")
         return None
 
+def save_item_files(item_id: str, test_cases: Union[str, List[Dict]]) -> Optional[Dict[str, str]]:
+    """Save the TXT and Excel files for one item.
+
+    Args:
+        item_id (str): Jira issue key or Azure work item ID used in the file names
+        test_cases (Union[str, List[Dict]]): Generated test cases content or structured records
+
+    Returns:
+        Optional[Dict[str, str]]: {'txt': ..., 'excel': ...} file names, or None if saving failed
+    """
+    safe_filename = ''.join(c for c in item_id if c.isalnum() or c in ('-', '_'))
+    file_base_name = f'test_{safe_filename}'
+    
+    text = records_to_text(test_cases) if isinstance(test_cases, list) else test_cases
+    txt_file = save_test_script(text, file_base_name)
+    excel_file = save_excel_report(test_cases, file_base_name)
+    
+    if txt_file and excel_file:
+        return {
+            'txt': txt_file,
+            'excel': excel_file
+        }
+    return None
+
+def format_test_cases_for_storage(test_cases: Union[str, List[Dict]], item_id: str) -> List[Dict]:
+    """Split generated test cases into the documents stored with a MongoDB test case record.
+
+    Args:
+        test_cases (Union[str, List[Dict]]): Generated test cases content or structured records
+        item_id (str): Item ID used in the generated test case IDs
+
+    Returns:
+        List[Dict]: One {'test_case_id', 'content', 'status'} entry per test case block
+    """
+    if isinstance(test_cases, list):
+        # Records are already split, no need to look for blank lines
+        return [{
+            'test_case_id': f"TC_{item_id}_{idx + 2}",
+            'content': format_test_case_text(record),
+            'status': ''
+        } for idx, record in enumerate(test_cases)]
+
+    formatted_test_cases = []
+    for idx, test_case in enumerate(test_cases.split('\n\n')):
+        if test_case.strip():
+            # Start test case IDs from 2 instead of 1
+            test_case_id = f"TC_{item_id}_{idx + 2}"
+            formatted_test_cases.append({
+                'test_case_id': test_case_id,
+                'content': test_case,
+                'status': ''
+            })
+    return formatted_test_cases
+
+def format_test_case_text(record: Dict) -> str:
+    """Render a structured test case record in the plain text format the parsers read."""
+    steps = record.get('Steps') or []
+    if isinstance(steps, str):
+        steps = [step for step in steps.split('\n') if step.strip()]
+    lines = [f"Title: {record.get('Title', '')}"]
+    if record.get('Scenario'):
+        lines.append(f"Scenario: {record['Scenario']}")
+    lines.append("Steps to reproduce:")
+    lines.extend(f"{idx + 1}. {step}" for idx, step in enumerate(steps))
+    lines.append(f"Expected Result: {record.get('Expected Result', '')}")
+    lines.append(f"Actual Result: {record.get('Actual Result') or '[To be filled during execution]'}")
+    if record.get('Priority'):
+        lines.append(f"Priority: {record['Priority']}")
+    return '\n'.join(lines)
+
+def records_to_text(records: List[Dict]) -> str:
+    """Render structured test case records as text with a TEST TYPE header per section."""
+    sections: Dict[str, List[str]] = {}
+    for record in records:
+        sections.setdefault(record.get('Section') or 'General', []).append(format_test_case_text(record))
+    return "\n\n" + "\n\n".join(
+        f"TEST TYPE: {section}\n\n" + "\n\n".join(blocks) for section, blocks in sections.items()
+    )
+
+def parse_test_cases(test_cases: str) -> List[Dict]:
+    """Parse generated test cases text into records, section by section.
+
+    Args:
+        test_cases (str): The full test cases content
+
+    Returns:
+        List[Dict]: List of test case dictionaries
+    """
+    # First, check for TEST TYPE section markers
+    sections = extract_test_type_sections(test_cases)
+    
+    # If no explicit TEST TYPE sections found, use traditional parsing
+    if not sections:
+        logger.info("No TEST TYPE sections found, using traditional parsing")
+        return parse_traditional_format(test_cases)
+
+    # Parse each section separately
+    logger.info(f"Found {len(sections)} TEST TYPE sections")
+    test_data = []
+    for section_name, section_content in sections.items():
+        section_data = parse_traditional_format(section_content, default_section=section_name)
+        test_data.extend(section_data)
+    return test_data
+
 def extract_test_type_sections(test_cases: str) -> Dict[str, str]:
     """Extract sections from test cases content based on TEST TYPE markers.
     
@@ -183,96 +276,106 @@ def parse_traditional_format(test_cases: str, default_section: str = "General")
     Returns:
         List[Dict]: List of test case dictionaries
     """
-    test_data = []
-    current_test = {}
-    current_section = default_section
-    collecting_steps = False
-    current_steps = []
-
-    # Split by lines for easier processing
-    lines = test_cases.split('\n')
-    i = 0
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        i += 1
-        
-        if not line:
-            continue
-            
-        # Check for section headers (both markdown and plain text)
-        if line.startswith('###'):
-            current_section = line.replace('#', '').strip() or default_section
-            continue
-            
-        # Handle various title formats
-        title_match = re.match(r'^(?:\d+\.\s*)?(?:\*\*)?Title:(?:\*\*)?\s*(.*?)$', line)
-        if title_match:
-            # Save previous test case if exists
-            if current_test:
-                if collecting_steps:
-                    current_test['Steps'] = current_steps
-                test_data.append(current_test)
-                
-            # Start a new test case
-            current_test = {
-                'Section': current_section,
-                'Title': title_match.group(1).strip()
-            }
-            collecting_steps = False
-            current_steps = []
-            continue
-            
-        # Handle scenario
-        scenario_match = re.match(r'^(?:\*\*)?Scenario:(?:\*\*)?\s*(.*?)$', line)
-        if scenario_match and current_test:
-            current_test['Scenario'] = scenario_match.group(1).strip()
-            continue
-            
-        # Handle steps header - support multiple variations
-        steps_match = re.match(r'^(?:\*\*)?Steps(?: to reproduce)?:(?:\*\*)?', line)
-        if steps_match and current_test:
-            collecting_steps = True
-            current_steps = []
-            continue
+    parser = TestCaseStreamParser(default_section=default_section)
+    return parser.feed(test_cases) + parser.close()
+
+class TestCaseStreamParser:
+    """Single-pass state machine parsing LLM output into test case dictionaries.
+
+    Each line is classified by one anchored pattern on its field prefix, so a line
+    costs at most two regex matches. Text can be fed chunk by chunk as it streams
+    in: a test case is returned as soon as the next ``Title:`` line starts, and
+    ``close`` returns the last one. ``parse_traditional_format`` feeds the whole
+    text at once, so streamed and saved output use the same grammar.
+    """
+
+    TITLE_PATTERN = re.compile(r'^(?:\d+\.\s*)?(?:\*\*)?Title:(?:\*\*)?\s*(.*?)$')
+    # Optional "1." title numbering, optional bold markers, the field name and its value
+    FIELD_PATTERN = re.compile(
+        r'(\d+\.\s*)?(?:\*\*)?'
+        r'(Title|Scenario|Steps(?: to reproduce)?|Expected Result|Actual Result|Status|Priority)'
+        r':(?:\*\*)?\s*(.*)'
+    )
+    # "1. Step", "- Step" or "* Step"
+    STEP_PATTERN = re.compile(r'(?:\d+\.|-|\*)\s*(.*)')
+    VALUE_FIELDS = frozenset(('Expected Result', 'Actual Result', 'Status', 'Priority'))
+
+    def __init__(self, default_section: str = "General"):
+        self.default_section = default_section
+        self.section = default_section
+        self._partial_line = ""
+        self._current: Optional[Dict] = None
+        # Steps of the current test case, or None until its steps header is seen
+        self._steps: Optional[List[str]] = None
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """Add a chunk of text and return the test cases completed by it."""
+        lines = (self._partial_line + chunk).split('\n')
+        # The last element is an unfinished line until the next newline arrives
+        self._partial_line = lines.pop()
+        return self._parse_lines(lines)
+
+    def close(self) -> List[Dict]:
+        """Flush the remaining text and return the final test case, if any."""
+        completed = self._parse_lines([self._partial_line]) if self._partial_line else []
+        self._partial_line = ""
+        if self._current is not None:
+            completed.append(self._finish())
+        return completed
+
+    def _parse_lines(self, lines: List[str]) -> List[Dict]:
+        completed = []
+        match_field = self.FIELD_PATTERN.match
+        match_step = self.STEP_PATTERN.match
+        value_fields = self.VALUE_FIELDS
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
             
-        # Collect steps
-        if collecting_steps:
-            # Support various step formats (1. Step, - Step, * Step, etc.)
-            step_match = re.match(r'^(?:(\d+)\.|\-|\*)\s*(.*?)$', line)
-            if step_match:
-                step_text = step_match.group(2) if step_match.groups()[-1] else line
-                current_steps.append(step_text.strip())
+            # Section headers (markdown) only change the section of the following test cases
+            if line.startswith('###'):
+                self.section = line.replace('#', '').strip() or self.default_section
                 continue
-                
-        # Handle expected result
-        expected_match = re.match(r'^(?:\*\*)?Expected Result:(?:\*\*)?\s*(.*?)$', line)
-        if expected_match and current_test:
-            current_test['Expected Result'] = expected_match.group(1).strip()
-            continue
             
-        # Handle actual result
-        actual_match = re.match(r'^(?:\*\*)?Actual Result:(?:\*\*)?\s*(.*?)$', line)
-        if actual_match and current_test:
-            current_test['Actual Result'] = actual_match.group(1).strip()
-            continue
+            field = value = None
+            match = match_field(line)
+            if match:
+                numbered, field, value = match.groups()
+                if field == 'Title':
+                    if self._current is not None:
+                        completed.append(self._finish())
+                    self._current = {'Section': self.section, 'Title': value.strip()}
+                    continue
+                if numbered:
+                    # Only titles may be numbered; "1. Status: ..." is an ordinary line
+                    field = None
             
-        # Handle status
-        status_match = re.match(r'^(?:\*\*)?Status:(?:\*\*)?\s*(.*?)$', line)
-        if status_match and current_test:
-            current_test['Status'] = status_match.group(1).strip()
-            continue
+            current = self._current
+            if current is None:
+                continue
+            if field == 'Scenario':
+                current['Scenario'] = value.strip()
+                continue
+            if field and field.startswith('Steps'):
+                self._steps = []
+                continue
             
-        # Handle priority
-        priority_match = re.match(r'^(?:\*\*)?Priority:(?:\*\*)?\s*(.*?)$', line)
-        if priority_match and current_test:
-            current_test['Priority'] = priority_match.group(1).strip()
-            continue
+            # Once the steps header is seen, list items are steps (including bold "**Field:**" lines)
+            if self._steps is not None:
+                step_match = match_step(line)
+                if step_match:
+                    self._steps.append((step_match.group(1) or line).strip())
+                    continue
             
-    # Add the last test case if exists
-    if current_test:
-        if collecting_steps:
-            current_test['Steps'] = current_steps
-        test_data.append(current_test)
-        
-    return test_data
\ No newline at end of file
+            if field in value_fields:
+                current[field] = value.strip()
+        return completed
+
+    def _finish(self) -> Dict:
+        test_case = self._current
+        if self._steps is not None:
+            test_case['Steps'] = self._steps
+        self._current = None
+        self._steps = None
+        return test_case
@@ -0,0 +1,122 @@
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, List, Optional, Union
+import hashlib
+import json
+import logging
+import os
+
+from config.settings import GENERATION_INCREMENTAL_RETENTION
+from utils.mongo_handler import MongoHandler
+
+logger = logging.getLogger(__name__)
+
+
+def compute_input_hash(source: Dict[str, str], selected_types: List[str], generation: Dict[str, Any]) -> str:
+    """Hash everything that determines the test cases generated for one item.
+
+    Args:
+        source (Dict[str, str]): Item with 'summary' and 'description'
+        selected_types (List[str]): Requested test types, in order
+        generation (Dict[str, Any]): Model, prompt version and output mode of the request
+
+    Returns:
+        str: Hex SHA-256 of the inputs
+    """
+    canonical = json.dumps({
+        "summary": source.get("summary") or "",
+        "description": source.get("description") or "",
+        "types": list(selected_types),
+        "generation": generation
+    }, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def combine_hashes(input_hashes: List[str]) -> str:
+    """Hash of a whole request, from the input hashes of its items in order."""
+    return hashlib.sha256("\n".join(input_hashes).encode("utf-8")).hexdigest()
+
+
+class GenerationIndex:
+    """Latest generation result of each Jira/Azure item, keyed by the hash of its inputs.
+
+    The TXT/Excel files of an item are overwritten by every generation, so one entry
+    per item is kept, describing the files currently on disk. When an item comes back
+    with the same input hash its stored test cases and files are reused instead of
+    calling the model again. Saved test case documents carry the hash of the whole
+    request, so an identical request can return the existing ``url_key``.
+    """
+
+    def __init__(self):
+        mongo_handler = MongoHandler()
+        self.test_cases = mongo_handler.collection
+        self.collection = mongo_handler.db.item_generations
+        self.collection.create_index("created_at", expireAfterSeconds=GENERATION_INCREMENTAL_RETENTION)
+        self.test_cases.create_index("input_hash", sparse=True)
+        self._lock = Lock()
+        self._stats = {"item_lookups": 0, "item_hits": 0, "request_hits": 0, "stale": 0, "recorded": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def find_item(self, item_id: str, input_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the stored {'test_cases', 'files'} of an item generated from the same inputs, or None."""
+        self._count("item_lookups")
+        try:
+            entry = self.collection.find_one({"_id": item_id, "input_hash": input_hash})
+        except Exception as e:
+            logger.error(f"Error reading the generation index for {item_id}: {str(e)}")
+            return None
+        if not entry:
+            return None
+
+        # The files must still be on disk to be reused
+        if not all(os.path.exists(os.path.join("tests", "generated", name)) for name in entry["files"].values()):
+            logger.info(f"Dropping stale generation index entry for {item_id}")
+            self.collection.delete_one({"_id": item_id})
+            self._count("stale")
+            return None
+
+        self._count("item_hits")
+        return {"test_cases": entry["test_cases"], "files": entry["files"]}
+
+    def record_item(self, item_id: str, input_hash: str, test_cases: Union[str, List[Dict]],
+                    files: Dict[str, str]) -> None:
+        """Remember the result just saved for an item, replacing the previous one."""
+        try:
+            self.collection.replace_one(
+                {"_id": item_id},
+                {
+                    "_id": item_id,
+                    "input_hash": input_hash,
+                    "test_cases": test_cases,
+                    "files": files,
+                    "created_at": datetime.utcnow()
+                },
+                upsert=True
+            )
+            self._count("recorded")
+        except Exception as e:
+            logger.error(f"Error recording generation of {item_id}: {str(e)}")
+
+    def find_request(self, request_hash: str) -> Optional[str]:
+        """Return the url_key of the latest test case document saved for the same request, or None."""
+        try:
+            docs = self.test_cases.find({"input_hash": request_hash}, {"url_key": 1}).sort("created_at", -1).limit(1)
+            doc = next(iter(docs), None)
+        except Exception as e:
+            logger.error(f"Error looking up an earlier request: {str(e)}")
+            return None
+        if not doc:
+            return None
+        self._count("request_hits")
+        return doc["url_key"]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["item_lookups"]
+            return {
+                **self._stats,
+                "item_hit_rate": (self._stats["item_hits"] / lookups) if lookups else 0.0
+            }
@@ -0,0 +1,118 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.settings import (
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR,
+    HTTP_POOL_MAXSIZE, HTTP_MAX_SESSIONS
+)
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: throttling and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class _TimeoutAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout to requests sent without one."""
+
+    def __init__(self, timeout: Tuple[float, float], **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def _create_session(auth: Optional[Tuple[str, str]], headers: Optional[Dict[str, str]]) -> requests.Session:
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "POST"]),
+        respect_retry_after_header=True,
+        raise_on_status=False  # Hand the last response to the caller, which reports the status
+    )
+    adapter = _TimeoutAdapter(
+        (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+        pool_connections=1,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.auth = auth
+    session.headers.update(headers or {})
+    return session
+
+
+class SessionPool:
+    """Keep-alive ``requests`` sessions shared per server and credentials.
+
+    Every Jira or Azure DevOps call for the same base URL and credentials goes
+    through one session, so fetching many items reuses its TCP/TLS connections
+    instead of paying a handshake per request. The least recently used session
+    is closed once more than ``max_sessions`` are open.
+    """
+
+    def __init__(self, max_sessions: int = HTTP_MAX_SESSIONS):
+        self.max_sessions = max(1, max_sessions)
+        self._sessions: "OrderedDict[str, requests.Session]" = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def _key(base_url: str, auth: Any, headers: Optional[Dict[str, str]]) -> str:
+        # Credentials are only kept hashed in the key
+        raw = repr((base_url.rstrip("/"), auth, sorted((headers or {}).items())))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, base_url: str, auth: Optional[Tuple[str, str]] = None,
+            headers: Optional[Dict[str, str]] = None) -> requests.Session:
+        """Return the pooled session for ``base_url`` and the given credentials.
+
+        Args:
+            base_url (str): Server URL the session is used for
+            auth (Optional[Tuple[str, str]]): Basic auth (user, password) sent with every request
+            headers (Optional[Dict[str, str]]): Headers sent with every request
+
+        Returns:
+            requests.Session: Session with retries, default timeouts and a bounded connection pool
+        """
+        key = self._key(base_url, auth, headers)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                return session
+            session = _create_session(auth, headers)
+            self._sessions[key] = session
+            while len(self._sessions) > self.max_sessions:
+                _, evicted = self._sessions.popitem(last=False)
+                evicted.close()
+            logger.info(f"Opened HTTP session for {base_url}")
+            return session
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+# Shared pool for the Jira and Azure DevOps clients
+session_pool = SessionPool()
+
+
+def get_session(base_url: str, auth: Optional[Tuple[str, str]] = None,
+                headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """Shortcut for ``session_pool.get``."""
+    return session_pool.get(base_url, auth, headers)
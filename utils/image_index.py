@@ -0,0 +1,171 @@
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, List, Optional
+import logging
+import os
+
+from PIL import Image, ImageOps
+
+from config.settings import (
+    IMAGE_DEDUP_DHASH_THRESHOLD, IMAGE_DEDUP_AHASH_THRESHOLD, IMAGE_DEDUP_RETENTION
+)
+from utils.mongo_handler import MongoHandler
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8
+# The 64-bit dHash is split into bands of 16 bits for candidate lookup
+BAND_COUNT = 4
+BAND_BITS = 64 // BAND_COUNT
+
+
+def compute_image_hashes(image_path: str) -> Optional[Dict[str, int]]:
+    """Compute the 64-bit average hash (aHash) and difference hash (dHash) of an image.
+
+    Returns:
+        Optional[Dict[str, int]]: {'ahash': ..., 'dhash': ...} or None if the image cannot be read
+    """
+    try:
+        with Image.open(image_path) as image:
+            image = ImageOps.exif_transpose(image).convert("L")
+            small = list(image.resize((HASH_SIZE, HASH_SIZE), Image.LANCZOS).getdata())
+            wide = list(image.resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS).getdata())
+    except Exception as e:
+        logger.warning(f"Could not hash image {image_path}: {str(e)}")
+        return None
+
+    average = sum(small) / len(small)
+    ahash = 0
+    for pixel in small:
+        ahash = (ahash << 1) | (pixel > average)
+
+    dhash = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            left = wide[row * (HASH_SIZE + 1) + col]
+            right = wide[row * (HASH_SIZE + 1) + col + 1]
+            dhash = (dhash << 1) | (left > right)
+
+    return {"ahash": ahash, "dhash": dhash}
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _bands(dhash: int) -> List[str]:
+    mask = (1 << BAND_BITS) - 1
+    return [f"{index}:{(dhash >> (index * BAND_BITS)) & mask:04x}" for index in range(BAND_COUNT)]
+
+
+def _types_key(selected_types: List[str]) -> str:
+    return ",".join(sorted(set(selected_types)))
+
+
+class ImageHashIndex:
+    """Perceptual-hash index of processed screenshots stored in MongoDB.
+
+    An upload is a duplicate of an indexed image when both its dHash and aHash are
+    within the configured Hamming distances and the same test types were requested.
+    With a dHash threshold below the number of bands, two duplicates always share at
+    least one 16-bit band exactly, so candidates are found with an indexed lookup
+    instead of scanning every entry.
+    """
+
+    def __init__(self, dhash_threshold: int = IMAGE_DEDUP_DHASH_THRESHOLD,
+                 ahash_threshold: int = IMAGE_DEDUP_AHASH_THRESHOLD):
+        self.dhash_threshold = dhash_threshold
+        self.ahash_threshold = ahash_threshold
+        mongo_handler = MongoHandler()
+        self.test_cases = mongo_handler.collection
+        self.collection = mongo_handler.db.image_hashes
+        self.collection.create_index("created_at", expireAfterSeconds=IMAGE_DEDUP_RETENTION)
+        self.collection.create_index([("types_key", 1), ("bands", 1)])
+        self._lock = Lock()
+        self._stats = {"lookups": 0, "hits": 0, "misses": 0, "stale": 0, "recorded": 0, "unhashable": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def hash_image(self, image_path: str) -> Optional[Dict[str, int]]:
+        hashes = compute_image_hashes(image_path)
+        if hashes is None:
+            self._count("unhashable")
+        return hashes
+
+    def find_duplicate(self, hashes: Dict[str, int], selected_types: List[str]) -> Optional[Dict[str, Any]]:
+        """Return the closest stored result for an image with these hashes, or None.
+
+        Returns:
+            Optional[Dict[str, Any]]: {'url_key', 'files', 'dhash_distance', 'ahash_distance'}
+        """
+        self._count("lookups")
+        query: Dict[str, Any] = {"types_key": _types_key(selected_types)}
+        if self.dhash_threshold < BAND_COUNT:
+            query["bands"] = {"$in": _bands(hashes["dhash"])}
+
+        best = None
+        try:
+            for entry in self.collection.find(query, {"ahash": 1, "dhash": 1, "url_key": 1, "files": 1}):
+                dhash_distance = hamming_distance(hashes["dhash"], int(entry["dhash"], 16))
+                ahash_distance = hamming_distance(hashes["ahash"], int(entry["ahash"], 16))
+                if dhash_distance > self.dhash_threshold or ahash_distance > self.ahash_threshold:
+                    continue
+                if best is None or (dhash_distance, ahash_distance) < (best["dhash_distance"], best["ahash_distance"]):
+                    best = {
+                        "_id": entry["_id"],
+                        "url_key": entry["url_key"],
+                        "files": entry["files"],
+                        "dhash_distance": dhash_distance,
+                        "ahash_distance": ahash_distance
+                    }
+        except Exception as e:
+            logger.error(f"Error searching the image index: {str(e)}")
+            best = None
+
+        if best is None:
+            self._count("misses")
+            return None
+
+        # The stored result must still exist to be reused
+        files_exist = all(os.path.exists(os.path.join("tests", "generated", name)) for name in best["files"].values())
+        if not files_exist or not self.test_cases.find_one({"url_key": best["url_key"]}, {"_id": 1}):
+            logger.info(f"Dropping stale image index entry {best['_id']}")
+            self.collection.delete_one({"_id": best["_id"]})
+            self._count("stale")
+            self._count("misses")
+            return None
+
+        self.collection.update_one({"_id": best.pop("_id")},
+                                   {"$inc": {"hits": 1}, "$set": {"last_hit_at": datetime.utcnow()}})
+        self._count("hits")
+        logger.info(f"Duplicate image found: {best['url_key']} (dHash distance {best['dhash_distance']}, "
+                    f"aHash distance {best['ahash_distance']})")
+        return best
+
+    def record(self, hashes: Dict[str, int], selected_types: List[str], url_key: str, files: Dict[str, str]) -> None:
+        """Add a processed image and the location of its result to the index."""
+        try:
+            self.collection.insert_one({
+                "ahash": f"{hashes['ahash']:016x}",
+                "dhash": f"{hashes['dhash']:016x}",
+                "bands": _bands(hashes["dhash"]),
+                "types_key": _types_key(selected_types),
+                "url_key": url_key,
+                "files": files,
+                "hits": 0,
+                "created_at": datetime.utcnow()
+            })
+            self._count("recorded")
+        except Exception as e:
+            logger.error(f"Error recording image in the index: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "hit_rate": (self._stats["hits"] / self._stats["lookups"]) if self._stats["lookups"] else 0.0,
+                "dhash_threshold": self.dhash_threshold,
+                "ahash_threshold": self.ahash_threshold
+            }
@@ -0,0 +1,176 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore, Condition
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+from config.settings import PIPELINE_FETCH_WORKERS, PIPELINE_MAX_ITEMS, PIPELINE_SAVE_WORKERS
+
+logger = logging.getLogger(__name__)
+
+
+class ItemPipeline:
+    """Staged fetch -> generate -> save pipeline for batches of Jira/Azure items.
+
+    Every stage has its own bounded worker pool, so one item can be fetched while
+    another is being generated and a third is being written to disk. The number of
+    items in flight across all stages is capped by ``max_items``; ``submit`` blocks
+    once that limit is reached. A failure in any stage only affects its own item.
+
+    Each stage callable returns None to drop the item without treating it as an error:
+        fetch(item_id) -> source item (e.g. {'summary': ..., 'description': ...})
+        generate(item_id, source) -> test cases text (or structured test case records)
+        save(item_id, test_cases) -> files dict (e.g. {'txt': ..., 'excel': ...})
+
+    An optional ``lookup(item_id, source)`` runs before generation and may return an
+    earlier {'test_cases': ..., 'files': ...} result; the item then skips generation
+    and saving and its outcome is marked as 'reused'.
+    """
+
+    def __init__(self,
+                 fetch: Callable[[str], Optional[Dict[str, Any]]],
+                 generate: Callable[[str, Dict[str, Any]], Optional[str]],
+                 save: Callable[[str, str], Optional[Dict[str, str]]],
+                 max_items: Optional[int] = None,
+                 fetch_workers: Optional[int] = None,
+                 save_workers: Optional[int] = None,
+                 lookup: Optional[Callable[[str, Dict[str, Any]], Optional[Dict[str, Any]]]] = None):
+        self._fetch = fetch
+        self._generate = generate
+        self._save = save
+        self._lookup = lookup
+
+        max_items = max(1, max_items or PIPELINE_MAX_ITEMS)
+        self._slots = BoundedSemaphore(max_items)
+        self._fetch_pool = ThreadPoolExecutor(max_workers=fetch_workers or PIPELINE_FETCH_WORKERS,
+                                              thread_name_prefix="pipeline-fetch")
+        self._generate_pool = ThreadPoolExecutor(max_workers=max_items,
+                                                 thread_name_prefix="pipeline-generate")
+        self._save_pool = ThreadPoolExecutor(max_workers=save_workers or PIPELINE_SAVE_WORKERS,
+                                             thread_name_prefix="pipeline-save")
+
+        self._order: List[str] = []
+        self._outcomes: Dict[str, Dict[str, Any]] = {}
+        self._pending = 0
+        self._done = Condition()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+    def submit(self, item_id: str) -> None:
+        """Queue an item starting from the fetch stage."""
+        self._start(item_id)
+        self._hand_off(self._fetch_pool, self._run_fetch, item_id)
+
+    def submit_fetched(self, item_id: str, source: Dict[str, Any]) -> None:
+        """Queue an item whose source has already been fetched."""
+        self._start(item_id)
+        self._outcomes[item_id]['source'] = source
+        self._hand_off(self._generate_pool, self._run_generate, item_id, source)
+
+    def wait(self) -> Dict[str, Dict[str, Any]]:
+        """Block until every submitted item has left the pipeline.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Outcome per item in submission order, with the keys
+            'source', 'test_cases', 'files' and 'error' (None when a stage did not run or failed)
+            and 'reused' (True when the result came from ``lookup``)
+        """
+        with self._done:
+            self._done.wait_for(lambda: self._pending == 0)
+        return {item_id: self._outcomes[item_id] for item_id in self._order}
+
+    def shutdown(self) -> None:
+        self._fetch_pool.shutdown(wait=True)
+        self._generate_pool.shutdown(wait=True)
+        self._save_pool.shutdown(wait=True)
+
+    def _start(self, item_id: str) -> None:
+        self._slots.acquire()
+        with self._done:
+            if item_id not in self._outcomes:
+                self._order.append(item_id)
+            self._outcomes[item_id] = {'source': None, 'test_cases': None, 'files': None, 'error': None,
+                                       'reused': False}
+            self._pending += 1
+
+    def _finish(self, item_id: str, error: Optional[str] = None) -> None:
+        if error:
+            self._outcomes[item_id]['error'] = error
+        self._slots.release()
+        with self._done:
+            self._pending -= 1
+            self._done.notify_all()
+
+    def _hand_off(self, pool: ThreadPoolExecutor, stage: Callable, item_id: str, *args) -> None:
+        """Queue the next stage of an item, finishing the item if it cannot be queued."""
+        try:
+            pool.submit(stage, item_id, *args)
+        except Exception as e:
+            logger.error(f"Error queueing {item_id}: {str(e)}")
+            self._finish(item_id, f"queueing failed: {str(e)}")
+            raise
+
+    # Each stage either hands the item to the next stage or finishes it, even when it fails unexpectedly
+
+    def _run_fetch(self, item_id: str) -> None:
+        handed_off = False
+        error = None
+        try:
+            source = self._fetch(item_id)
+            if not source:
+                error = "no source data"
+                return
+            self._outcomes[item_id]['source'] = source
+            self._generate_pool.submit(self._run_generate, item_id, source)
+            handed_off = True
+        except Exception as e:
+            logger.error(f"Error fetching {item_id}: {str(e)}")
+            error = f"fetch failed: {str(e)}"
+        finally:
+            if not handed_off:
+                self._finish(item_id, error)
+
+    def _run_generate(self, item_id: str, source: Dict[str, Any]) -> None:
+        handed_off = False
+        error = None
+        try:
+            if self._lookup:
+                try:
+                    previous = self._lookup(item_id, source)
+                    if previous:
+                        self._outcomes[item_id].update(test_cases=previous['test_cases'], files=previous['files'],
+                                                       reused=True)
+                        return
+                except Exception as e:
+                    logger.warning(f"Error looking up an earlier result for {item_id}: {str(e)}")
+
+            test_cases = self._generate(item_id, source)
+            if not test_cases:
+                error = "no test cases generated"
+                return
+            self._outcomes[item_id]['test_cases'] = test_cases
+            self._save_pool.submit(self._run_save, item_id, test_cases)
+            handed_off = True
+        except Exception as e:
+            logger.error(f"Error generating test cases for {item_id}: {str(e)}")
+            error = f"generation failed: {str(e)}"
+        finally:
+            if not handed_off:
+                self._finish(item_id, error)
+
+    def _run_save(self, item_id: str, test_cases: str) -> None:
+        error = None
+        try:
+            files = self._save(item_id, test_cases)
+            if not files:
+                error = "failed to save files"
+                return
+            self._outcomes[item_id]['files'] = files
+        except Exception as e:
+            logger.error(f"Error saving test cases for {item_id}: {str(e)}")
+            error = f"save failed: {str(e)}"
+        finally:
+            self._finish(item_id, error)
@@ -0,0 +1,186 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+import os
+import socket
+import threading
+import uuid
+
+from config.settings import JOB_MAX_WORKERS, JOB_RETENTION, JOB_HEARTBEAT_INTERVAL, JOB_STALE_AFTER
+from utils.mongo_handler import MongoHandler
+
+logger = logging.getLogger(__name__)
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+ACTIVE_STATES = [JOB_QUEUED, JOB_RUNNING]
+
+
+class JobStore:
+    """MongoDB-backed store for generation job state, shared by all app processes."""
+
+    def __init__(self, stale_after: int = JOB_STALE_AFTER):
+        self.collection = MongoHandler().db.generation_jobs
+        self.collection.create_index("created_at", expireAfterSeconds=JOB_RETENTION)
+        self.stale_after = stale_after
+
+    def create(self, job_id: str, summary: Dict[str, Any]) -> None:
+        now = datetime.utcnow()
+        self.collection.insert_one({
+            "_id": job_id,
+            "job_id": job_id,
+            "state": JOB_QUEUED,
+            "request": summary,
+            "created_at": now,
+            "updated_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+            "worker": f"{socket.gethostname()}:{os.getpid()}"
+        })
+
+    def mark_running(self, job_id: str) -> None:
+        now = datetime.utcnow()
+        self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {"state": JOB_RUNNING, "started_at": now, "updated_at": now}}
+        )
+
+    def mark_finished(self, job_id: str, succeeded: bool, result: Optional[Dict[str, Any]] = None,
+                      error: Optional[str] = None) -> None:
+        now = datetime.utcnow()
+        self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {
+                "state": JOB_SUCCEEDED if succeeded else JOB_FAILED,
+                "result": result,
+                "error": error,
+                "finished_at": now,
+                "updated_at": now
+            }}
+        )
+
+    def heartbeat(self, job_ids: Iterable[str]) -> None:
+        """Record that the jobs are still alive in this process."""
+        job_ids = list(job_ids)
+        if job_ids:
+            self.collection.update_many(
+                {"_id": {"$in": job_ids}, "state": {"$in": ACTIVE_STATES}},
+                {"$set": {"updated_at": datetime.utcnow()}}
+            )
+
+    def fail_stale(self) -> int:
+        """Mark queued or running jobs whose process stopped sending heartbeats as failed.
+
+        Returns:
+            int: Number of jobs marked as failed
+        """
+        if self.stale_after <= 0:
+            return 0
+        now = datetime.utcnow()
+        result = self.collection.update_many(
+            {"state": {"$in": ACTIVE_STATES}, "updated_at": {"$lt": now - timedelta(seconds=self.stale_after)}},
+            {"$set": {
+                "state": JOB_FAILED,
+                "error": f"Job stopped without finishing: no heartbeat for over {self.stale_after} seconds",
+                "finished_at": now,
+                "updated_at": now
+            }}
+        )
+        if result.modified_count:
+            logger.warning(f"Marked {result.modified_count} stale generation job(s) as failed")
+        return result.modified_count
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self.fail_stale()
+        return self.collection.find_one({"_id": job_id}, {"_id": 0})
+
+    def list_recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        self.fail_stale()
+        cursor = self.collection.find({}, {"_id": 0}).sort("created_at", -1).limit(limit)
+        return list(cursor)
+
+
+class JobManager:
+    """Runs generation jobs on a bounded worker pool and records their state in a JobStore."""
+
+    def __init__(self, store: Optional[JobStore] = None, max_workers: Optional[int] = None,
+                 heartbeat_interval: float = JOB_HEARTBEAT_INTERVAL):
+        self.store = store or JobStore()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or JOB_MAX_WORKERS,
+                                            thread_name_prefix="generation-job")
+        # Jobs left behind by processes that died before this one started
+        self.store.fail_stale()
+
+        # Queued and running jobs of this process, kept fresh by the heartbeat thread
+        self._active: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._heartbeat_interval = heartbeat_interval
+        threading.Thread(target=self._heartbeat, name="generation-job-heartbeat", daemon=True).start()
+
+    def _heartbeat(self) -> None:
+        while not self._stopped.wait(self._heartbeat_interval):
+            with self._lock:
+                job_ids = list(self._active)
+            try:
+                self.store.heartbeat(job_ids)
+            except Exception as e:
+                logger.warning(f"Could not record generation job heartbeat: {str(e)}")
+
+    def shutdown(self) -> None:
+        """Stop the heartbeat thread and wait for running jobs to finish."""
+        self._stopped.set()
+        self._executor.shutdown(wait=True)
+
+    def submit(self, runner: Callable[[Dict[str, Any]], Tuple[Dict[str, Any], int]], params: Dict[str, Any],
+               summary: Optional[Dict[str, Any]] = None, job_id: Optional[str] = None) -> str:
+        """Queue ``runner(params)`` and return the job id.
+
+        ``runner`` returns a (response_body, status_code) pair like the HTTP handlers;
+        a 200 status marks the job as succeeded, anything else as failed.
+        """
+        job_id = job_id or str(uuid.uuid4())
+        self.store.create(job_id, summary or {})
+        with self._lock:
+            self._active.add(job_id)
+        try:
+            self._executor.submit(self._run, job_id, runner, params)
+        except Exception:
+            with self._lock:
+                self._active.discard(job_id)
+            raise
+        logger.info(f"Queued generation job {job_id}")
+        return job_id
+
+    def _run(self, job_id: str, runner, params: Dict[str, Any]) -> None:
+        try:
+            self._execute(job_id, runner, params)
+        finally:
+            with self._lock:
+                self._active.discard(job_id)
+
+    def _execute(self, job_id: str, runner, params: Dict[str, Any]) -> None:
+        try:
+            self.store.mark_running(job_id)
+            logger.info(f"Started generation job {job_id}")
+            body, status_code = runner(params)
+        except Exception as e:
+            logger.error(f"Generation job {job_id} crashed: {str(e)}", exc_info=True)
+            self.store.mark_finished(job_id, False, error=str(e))
+            return
+
+        if status_code == 200:
+            self.store.mark_finished(job_id, True, result={
+                "url_key": body.get("url_key"),
+                "files": body.get("files")
+            })
+            logger.info(f"Generation job {job_id} succeeded")
+        else:
+            self.store.mark_finished(job_id, False, error=body.get("error"))
+            logger.warning(f"Generation job {job_id} failed: {body.get('error')}")
@@ -20,8 +20,13 @@ class MongoHandler:
             logger.error(f"Failed to connect to MongoDB: {str(e)}")
             raise Exception("Could not connect to MongoDB. Please check your connection settings.")
 
-    def save_test_case(self, test_data, item_id=None):
-        """Save test case data and generate unique URL"""
+    def save_test_case(self, test_data, item_id=None, input_hash=None):
+        """Save test case data and generate unique URL
+
+        Args:
+            input_hash: Optional hash of the generation inputs, used to find this document
+                again when the same request is repeated
+        """
         try:
             unique_id = str(uuid.uuid4())
             document = {
@@ -32,6 +37,8 @@ class MongoHandler:
                 "item_id": item_id,
                 "status": {}  # Initialize empty status dictionary for test cases
             }
+            if input_hash:
+                document["input_hash"] = input_hash
             self.collection.insert_one(document)
             logger.info(f"Successfully saved test case with ID: {unique_id}")
             return unique_id
@@ -0,0 +1,99 @@
+"""Measure how fast generated test case text is parsed.
+
+The whole text is parsed once with ``parse_traditional_format`` (as done for
+Excel reports and shared exports) and once fed chunk by chunk to a
+``TestCaseStreamParser`` (as done while streaming), and lines per second are
+reported for each. Saved TXT outputs can be passed as the corpus; otherwise a
+synthetic one mixing the formats LLMs produce (bold fields, numbered titles,
+section headers, "-" steps) is used.
+
+Usage:
+    python -m utils.parser_benchmark --cases 5000
+    python -m utils.parser_benchmark tests/*.txt --repeat 20 --chunk-size 16
+"""
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import json
+import time
+
+from utils.file_handler import TestCaseStreamParser, parse_traditional_format
+
+
+def synthetic_corpus(cases: int) -> str:
+    """Return ``cases`` test cases in varying markdown styles, split into sections."""
+    blocks = []
+    for number in range(1, cases + 1):
+        if number % 50 == 1:
+            blocks.append(f"### Section {number // 50 + 1}")
+        bold = "**" if number % 3 == 0 else ""
+        title_prefix = f"{number}. " if number % 4 == 0 else ""
+        bullet = "-" if number % 5 == 0 else None
+        steps = "\n".join(
+            f"{bullet or f'{idx}.'} Step {idx} of test case {number}" for idx in range(1, 5)
+        )
+        blocks.append(
+            f"{title_prefix}{bold}Title:{bold} TC_FUNC_{number:04d}_Check_Login\n"
+            f"{bold}Scenario:{bold} Verify the login form for user {number}\n"
+            f"{bold}Steps to reproduce:{bold}\n{steps}\n"
+            f"Expected Result: The dashboard is shown\n"
+            f"Actual Result: [To be filled during execution]\n"
+            f"Priority: {('High', 'Medium', 'Low')[number % 3]}"
+        )
+    return "\n\n".join(blocks)
+
+
+def _measure(run: Callable[[], List[Dict]], lines: int, repeat: int) -> Dict[str, Any]:
+    run()  # Warm up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        test_cases = run()
+    elapsed = time.perf_counter() - started
+    return {
+        "seconds": round(elapsed, 4),
+        "lines_per_second": round(lines * repeat / elapsed) if elapsed else None,
+        "test_cases": len(test_cases)
+    }
+
+
+def benchmark_parser(text: str, repeat: int = 10, chunk_size: int = 32) -> Dict[str, Any]:
+    """Parse ``text`` ``repeat`` times in one pass and streamed in ``chunk_size`` character chunks."""
+    lines = text.count("\n") + 1
+
+    def streamed() -> List[Dict]:
+        parser = TestCaseStreamParser()
+        test_cases = []
+        for start in range(0, len(text), chunk_size):
+            test_cases.extend(parser.feed(text[start:start + chunk_size]))
+        return test_cases + parser.close()
+
+    return {
+        "lines": lines,
+        "repeat": repeat,
+        "parse_traditional_format": _measure(lambda: parse_traditional_format(text), lines, repeat),
+        "stream": _measure(streamed, lines, repeat)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m utils.parser_benchmark",
+                                     description="Measure test case parsing throughput")
+    parser.add_argument("files", nargs="*", help="Saved test case TXT files (default: synthetic corpus)")
+    parser.add_argument("--cases", type=int, default=2000, help="Test cases in the synthetic corpus")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--chunk-size", type=int, default=32, help="Characters per fed chunk when streaming")
+    args = parser.parse_args(argv)
+
+    if args.files:
+        texts = []
+        for path in args.files:
+            with open(path, encoding="utf-8") as f:
+                texts.append(f.read())
+        text = "\n\n".join(texts)
+    else:
+        text = synthetic_corpus(args.cases)
+    print(json.dumps(benchmark_parser(text, args.repeat, args.chunk_size), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
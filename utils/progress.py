@@ -0,0 +1,95 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import logging
+
+from config.settings import PROGRESS_RETENTION
+from utils.mongo_handler import MongoHandler
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressTracker:
+    """Per-request generation progress stored in MongoDB.
+
+    Each generation request (or job) gets its own document keyed by its id, and
+    type completions are recorded with atomic updates, so concurrent requests and
+    multiple app processes never overwrite each other's progress.
+    """
+
+    def __init__(self):
+        self.collection = MongoHandler().db.generation_progress
+        self.collection.create_index("created_at", expireAfterSeconds=PROGRESS_RETENTION)
+
+    def start(self, progress_id: str, selected_types: List[str], item_count: int = 1) -> None:
+        """Reset progress for a request about to generate ``selected_types`` for ``item_count`` items."""
+        now = datetime.utcnow()
+        try:
+            self.collection.replace_one(
+                {"_id": progress_id},
+                {
+                    "_id": progress_id,
+                    "is_generating": True,
+                    "total_types": list(selected_types),
+                    "completed_types": [],
+                    "failed_types": [],
+                    "completed_count": 0,
+                    "expected_count": max(1, len(selected_types) * max(1, item_count)),
+                    "created_at": now,
+                    "updated_at": now
+                },
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Error starting progress for {progress_id}: {str(e)}")
+
+    def mark_type_completed(self, progress_id: str, test_type: str, success: bool = True) -> None:
+        """Atomically record that one type of one item has finished."""
+        update = {
+            "$inc": {"completed_count": 1},
+            "$set": {"updated_at": datetime.utcnow()}
+        }
+        update["$addToSet"] = {"completed_types" if success else "failed_types": test_type}
+        try:
+            self.collection.update_one({"_id": progress_id}, update)
+        except Exception as e:
+            logger.error(f"Error updating progress for {progress_id}: {str(e)}")
+
+    def set_item_count(self, progress_id: str, type_count: int, item_count: int) -> None:
+        """Update the expected work when the items are only known as they arrive (query sources)."""
+        try:
+            self.collection.update_one(
+                {"_id": progress_id},
+                {"$set": {"expected_count": max(1, type_count * item_count), "updated_at": datetime.utcnow()}}
+            )
+        except Exception as e:
+            logger.error(f"Error updating progress for {progress_id}: {str(e)}")
+
+    def finish(self, progress_id: str) -> None:
+        try:
+            self.collection.update_one(
+                {"_id": progress_id},
+                {"$set": {"is_generating": False, "updated_at": datetime.utcnow()}}
+            )
+        except Exception as e:
+            logger.error(f"Error finishing progress for {progress_id}: {str(e)}")
+
+    def get(self, progress_id: str) -> Optional[Dict[str, Any]]:
+        """Return the progress of one request, or None if the id is unknown."""
+        doc = self.collection.find_one({"_id": progress_id})
+        if not doc:
+            return None
+
+        progress_percentage = (doc["completed_count"] / doc["expected_count"]) * 100 if doc["expected_count"] else 0
+        # Ensure progress is a valid number between 0-100
+        progress_percentage = min(100, max(0, progress_percentage))
+        return {
+            "id": progress_id,
+            "is_generating": doc["is_generating"],
+            "completed_types": doc["completed_types"],
+            "failed_types": doc.get("failed_types", []),
+            "total_types": doc["total_types"],
+            "completed_count": doc["completed_count"],
+            "expected_count": doc["expected_count"],
+            "progress_percentage": progress_percentage,
+            "files_ready": not doc["is_generating"]
+        }
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import logging
+import time
+
+from config.settings import SOURCE_CACHE_ENABLED, SOURCE_CACHE_TTL, SOURCE_CACHE_MAX_ITEMS
+
+logger = logging.getLogger(__name__)
+
+
+class SourceCache:
+    """In-memory LRU of fetched Jira issues / Azure work items with their revision.
+
+    Entries hold the cleaned summary and description together with the revision
+    they were fetched at (Jira ``fields.updated``, Azure ``System.Rev``). A caller
+    compares that revision with a cheap revision-only request and only downloads
+    and cleans the item again when it changed. Entries expire after ``ttl``
+    seconds and the least recently used ones are dropped above ``max_items``.
+    """
+
+    def __init__(self, ttl: int = SOURCE_CACHE_TTL, max_items: int = SOURCE_CACHE_MAX_ITEMS):
+        self.ttl = ttl
+        self.max_items = max(1, max_items)
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = Lock()
+        self._stats = {"hits": 0, "misses": 0, "changed": 0, "expired": 0, "stores": 0}
+
+    @staticmethod
+    def make_key(source_type: str, item_id: str, connection: Optional[Dict[str, Any]] = None) -> str:
+        """Key an item by source, id and connection config, so servers and accounts never share entries."""
+        raw = json.dumps([source_type, str(item_id).upper(), connection or {}], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry ({'source', 'revision'}) or None when missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            if time.time() - entry["cached_at"] > self.ttl:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def record(self, unchanged: bool) -> None:
+        """Count the outcome of a revision check of an entry returned by ``get``."""
+        with self._lock:
+            self._stats["hits" if unchanged else "changed"] += 1
+
+    def set(self, key: str, source: Dict[str, str], revision: Any) -> None:
+        if revision is None:
+            return  # Without a revision the entry could never be validated
+        with self._lock:
+            self._entries[key] = {"source": source, "revision": str(revision), "cached_at": time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+            self._stats["stores"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["changed"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": (self._stats["hits"] / lookups) if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_items": self.max_items,
+                "ttl": self.ttl
+            }
+
+
+# Shared cache for the application (None when disabled)
+source_cache = SourceCache() if SOURCE_CACHE_ENABLED else None
@@ -0,0 +1,229 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import logging
+
+from jira.jira_client import fetch_issue, search_issues, search_jql, adf_to_text, JiraSearchError
+from azure_integration.azure_client import AzureClient, AzureQueryError
+from utils.source_cache import SourceCache, source_cache
+
+logger = logging.getLogger(__name__)
+
+
+class QuerySourceError(Exception):
+    """A JQL/WIQL query source failed; the message says why (e.g. Jira's error for invalid JQL)."""
+
+
+def _jira_source(issue: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        'summary': issue['fields']['summary'],
+        # REST API v3 returns the description as an ADF tree
+        'description': adf_to_text(issue['fields']['description'])
+    }
+
+
+def _azure_client(config: Dict[str, Any]) -> AzureClient:
+    # Get Azure configuration from request data
+    azure_config = config.get('azure_config')
+    # Only use frontend config if it exists and all required values are present
+    if azure_config and all(azure_config.values()):
+        return AzureClient(azure_config)
+    return AzureClient()  # Fall back to environment variables
+
+
+def _cache_key(source_type: str, item_id: str, config: Dict[str, Any]) -> str:
+    connection = config.get('jira_config') if source_type == 'jira' else config.get('azure_config')
+    return SourceCache.make_key(source_type, item_id, connection)
+
+
+def _current_revisions(source_type: str, item_ids: List[str], config: Dict[str, Any]) -> Dict[str, str]:
+    """Look up the current revisions of items (upper-cased id -> revision) without fetching their content."""
+    if source_type == 'jira':
+        if len(item_ids) == 1:
+            issue = fetch_issue(item_ids[0], config.get('jira_config'), fields=('updated',))
+            return {item_ids[0].upper(): issue['fields'].get('updated')} if issue else {}
+        return {
+            str(issue.get('key', '')).upper(): issue['fields'].get('updated')
+            for issue in search_issues(item_ids, config.get('jira_config'), fields=('updated',))
+        }
+    return {str(work_item_id): rev for work_item_id, rev in _azure_client(config).fetch_revisions(item_ids).items()}
+
+
+def _cached_source(source_type: str, item_ids: List[str], config: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+    """Return the cached sources (by upper-cased id) of the items whose revision has not changed."""
+    if not source_cache or source_type not in ('jira', 'azure'):
+        return {}
+    entries = {}
+    for item_id in item_ids:
+        entry = source_cache.get(_cache_key(source_type, item_id, config))
+        if entry:
+            entries[item_id.upper()] = (item_id, entry)
+    if not entries:
+        return {}
+
+    revisions = _current_revisions(source_type, [item_id for item_id, _ in entries.values()], config)
+    unchanged = {}
+    for upper_id, (_, entry) in entries.items():
+        revision = revisions.get(upper_id)
+        is_unchanged = revision is not None and str(revision) == entry['revision']
+        source_cache.record(is_unchanged)
+        if is_unchanged:
+            unchanged[upper_id] = dict(entry['source'])
+    return unchanged
+
+
+def _store_source(source_type: str, item_id: str, config: Dict[str, Any], source: Dict[str, str], revision: Any) -> None:
+    if source_cache and source:
+        source_cache.set(_cache_key(source_type, item_id, config), source, revision)
+
+
+def fetch_source_item(source_type: str, item_id: str, config: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, str]]:
+    """Fetch the summary and description of a Jira issue or Azure work item.
+
+    A cached copy is returned when a revision-only request shows that the item
+    has not changed since it was cached.
+
+    Args:
+        source_type (str): 'jira' or 'azure'
+        item_id (str): Jira issue key or Azure work item ID
+        config (Optional[Dict[str, Any]]): Request data holding optional 'jira_config' / 'azure_config'
+
+    Returns:
+        Optional[Dict[str, str]]: {'summary': ..., 'description': ...} or None if the item could not be fetched
+    """
+    config = config or {}
+
+    cached = _cached_source(source_type, [item_id], config).get(item_id.upper())
+    if cached:
+        return cached
+
+    if source_type == 'jira':
+        # Get Jira configuration from request data
+        jira_config = config.get('jira_config')
+        issue = fetch_issue(item_id, jira_config)
+        if not issue:
+            return None
+        source = _jira_source(issue)
+        _store_source(source_type, item_id, config, source, issue['fields'].get('updated'))
+        return source
+    
+    if source_type == 'azure':
+        work_items = _azure_client(config).fetch_azure_work_items([item_id])
+        
+        if not work_items or len(work_items) == 0:
+            return None
+        
+        work_item = work_items[0]
+        source = {
+            'summary': work_item['title'],
+            'description': work_item['description']
+        }
+        _store_source(source_type, item_id, config, source, work_item.get('rev'))
+        return source
+    
+    logger.error(f"Unsupported source type: {source_type}")
+    return None
+
+
+def iter_source_items(source_type: str, item_ids: List[str],
+                      config: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[str, Optional[Dict[str, str]]]]:
+    """Bulk-fetch items, yielding (item_id, source) pairs as results arrive.
+
+    Cached items whose revision is unchanged come first. The rest are fetched with
+    paginated JQL searches (Jira) or the workitemsbatch endpoint (Azure), so the
+    first items can be processed while later pages are still loading. Items the
+    bulk fetch did not return are yielded last with a None source; callers fetch
+    those one by one with ``fetch_source_item``, which also reports why an item
+    is missing.
+
+    Args:
+        source_type (str): 'jira' or 'azure'
+        item_ids (List[str]): Jira issue keys or Azure work item IDs
+        config (Optional[Dict[str, Any]]): Request data holding optional 'jira_config' / 'azure_config'
+
+    Yields:
+        Tuple[str, Optional[Dict[str, str]]]: Item id as requested and its source, or None
+    """
+    config = config or {}
+    # Jira keys are case-insensitive, so "abc-1" and "ABC-1" are the same issue
+    remaining: Dict[str, List[str]] = {}
+    for item_id in item_ids:
+        remaining.setdefault(item_id.upper(), []).append(item_id)
+
+    # Single items take the fetch_source_item path, which checks the cache itself
+    if len(item_ids) > 1:
+        for upper_id, source in _cached_source(source_type, item_ids, config).items():
+            for item_id in remaining.pop(upper_id, []):
+                yield item_id, dict(source)
+
+    if source_type == 'jira' and len(item_ids) > 1 and remaining:
+        pending = [ids[0] for ids in remaining.values()]
+        for issue in search_issues(pending, config.get('jira_config'), fields=('summary', 'description', 'updated')):
+            # Moved issues come back under their new key; those are left to the single fetch
+            ids = remaining.pop(str(issue.get('key', '')).upper(), [])
+            if not ids:
+                continue
+            source = _jira_source(issue)
+            _store_source(source_type, ids[0], config, source, issue['fields'].get('updated'))
+            for item_id in ids:
+                yield item_id, dict(source)
+
+    if source_type == 'azure' and len(item_ids) > 1 and remaining:
+        pending = [ids[0] for ids in remaining.values()]
+        for work_item in _azure_client(config).iter_work_items_batched(pending):
+            ids = remaining.pop(str(work_item['id']).upper(), [])
+            if not ids:
+                continue
+            source = {'summary': work_item['title'], 'description': work_item['description']}
+            _store_source(source_type, ids[0], config, source, work_item.get('rev'))
+            for item_id in ids:
+                yield item_id, dict(source)
+
+    for ids in remaining.values():
+        for item_id in ids:
+            yield item_id, None
+
+
+def iter_query_items(source_type: str, query: str, config: Optional[Dict[str, Any]] = None,
+                     max_items: Optional[int] = None) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """Yield the (item_id, source) pairs matching a Jira JQL or Azure WIQL query as pages arrive.
+
+    Results are paged lazily: the next page is only requested once the caller has
+    taken the items of the previous one, and nothing beyond ``max_items`` is fetched.
+
+    Args:
+        source_type (str): 'jira' (JQL) or 'azure' (WIQL)
+        query (str): The query
+        config (Optional[Dict[str, Any]]): Request data holding optional 'jira_config' / 'azure_config'
+        max_items (Optional[int]): Stop after this many items
+
+    Yields:
+        Tuple[str, Dict[str, str]]: Item id and its {'summary': ..., 'description': ...}
+
+    Raises:
+        QuerySourceError: If the query fails, possibly after some items were yielded
+    """
+    config = config or {}
+    if source_type == 'jira':
+        results = (
+            (issue['key'], _jira_source(issue), issue['fields'].get('updated'))
+            for issue in search_jql(query, config.get('jira_config'), fields=('summary', 'description', 'updated'))
+        )
+    elif source_type == 'azure':
+        results = (
+            (work_item['id'], {'summary': work_item['title'], 'description': work_item['description']}, work_item.get('rev'))
+            for work_item in _azure_client(config).iter_query(query, max_items)
+        )
+    else:
+        logger.error(f"Unsupported source type for queries: {source_type}")
+        return
+
+    count = 0
+    try:
+        for item_id, source, revision in results:
+            _store_source(source_type, item_id, config, source, revision)
+            yield item_id, source
+            count += 1
+            if max_items and count >= max_items:
+                logger.info(f"Stopping {source_type} query after {max_items} items")
+                return
+    except (JiraSearchError, AzureQueryError) as e:
+        raise QuerySourceError(str(e)) from e